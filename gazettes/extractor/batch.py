@@ -0,0 +1,159 @@
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+MANIFEST_NAME = "manifest.json"
+
+
+def find_pdfs(input_path: str) -> list[Path]:
+    """
+    Resolve a directory (searched recursively) or a glob pattern to a sorted list of PDFs.
+    """
+    path = Path(input_path)
+    if path.is_dir():
+        pdfs = [p for p in path.rglob("*") if p.suffix.lower() == ".pdf"]
+    else:
+        pdfs = [Path(p) for p in glob.glob(input_path, recursive=True) if p.lower().endswith(".pdf")]
+    return sorted(pdfs)
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def manifest_key(gazette_type: str, sha256: str) -> str:
+    """One entry per PDF and gazette type, so the same PDF can be extracted as several types into one output."""
+    return f"{gazette_type}:{sha256}"
+
+
+def output_name(pdf: Path, sha256: str) -> str:
+    """
+    Output file stem of a PDF in a batch. The hash from its manifest key keeps
+    PDFs with the same name in different folders from overwriting each other.
+    """
+    return f"{pdf.stem}-{sha256[:12]}"
+
+
+def load_manifest(manifest_path: Path) -> dict:
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest_path: Path, manifest: dict):
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def _process_pdf(gazette_type: str, pdf_path: str, output_path: str, name: str, options: dict) -> dict:
+    # Imported here so each worker process pays the LangChain import once.
+    from langchain_community.callbacks import get_openai_callback
+    from main import run_pipeline
+
+    start = time.perf_counter()
+    with get_openai_callback() as cb:
+        output_file = run_pipeline(gazette_type=gazette_type, pdf_path=pdf_path, output_path=output_path,
+                                   output_name=name, **options)
+    return {
+        "output": output_file,
+        "tokens": {"prompt": cb.prompt_tokens, "completion": cb.completion_tokens, "total": cb.total_tokens},
+        "requests": cb.successful_requests,
+        "cost_usd": round(cb.total_cost, 6),
+        "duration_s": round(time.perf_counter() - start, 2),
+    }
+
+
+def run_batch(gazette_type: str, input_path: str, output_path: str = "outputs/", workers: int = 4,
+              manifest_path: str | None = None, **options) -> dict:
+    """
+    Extract every PDF matched by `input_path` using a pool of `workers` processes.
+
+    Progress is recorded in a manifest keyed by "<gazette_type>:<sha256 of the PDF>":
+    {status, gazette_type, pdf, output, tokens, requests, cost_usd, duration_s, error}.
+    Outputs are named "<gazette_type>-<PDF stem>-<first 12 hex digits of the sha256>.json".
+    PDFs already marked "done" for this type with an existing output are
+    skipped, so an interrupted batch resumes where it stopped. `options` are passed to
+    run_pipeline (max_concurrency, requests_per_minute, use_cache, token_budget);
+    the requests per minute limit is shared evenly between the workers.
+    Returns the aggregate report.
+    """
+    workers = max(1, workers)
+    if options.get("requests_per_minute"):
+        options["requests_per_minute"] = options["requests_per_minute"] / workers
+
+    output_dir = Path(output_path or "outputs/")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = Path(manifest_path) if manifest_path else output_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+
+    pending = {}
+    skipped = 0
+    for pdf in find_pdfs(input_path):
+        sha256 = file_hash(pdf)
+        key = manifest_key(gazette_type, sha256)
+        entry = manifest.get(key, {})
+        if entry.get("status") == "done" and entry.get("output") and Path(entry["output"]).exists():
+            skipped += 1
+            continue
+        if key not in pending:
+            pending[key] = (pdf, output_name(pdf, sha256))
+
+    print(f"{len(pending)} PDF(s) to process, {skipped} already done.")
+
+    start = time.perf_counter()
+    completed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_process_pdf, gazette_type, str(pdf), str(output_dir) + os.sep, name, options): (key, pdf)
+            for key, (pdf, name) in pending.items()
+        }
+        for future in as_completed(futures):
+            key, pdf = futures[future]
+            try:
+                entry = {"status": "done", "gazette_type": gazette_type, "pdf": str(pdf), **future.result()}
+                completed.append(entry)
+                print(f"✅ {pdf} ({entry['duration_s']}s, {entry['tokens']['total']} tokens)")
+            except Exception as e:
+                entry = {"status": "failed", "gazette_type": gazette_type, "pdf": str(pdf), "error": str(e)}
+                print(f"❌ {pdf}: {e}")
+            manifest[key] = entry
+            save_manifest(manifest_path, manifest)
+
+    report = _report(completed, len(pending) - len(completed), skipped, time.perf_counter() - start)
+    print_report(report)
+    return report
+
+
+def _report(completed: list[dict], failed: int, skipped: int, elapsed: float) -> dict:
+    tokens = sum(entry["tokens"]["total"] for entry in completed)
+    return {
+        "processed": len(completed),
+        "failed": failed,
+        "skipped": skipped,
+        "elapsed_s": round(elapsed, 2),
+        "pdfs_per_minute": round(len(completed) / elapsed * 60, 2) if elapsed else 0.0,
+        "requests": sum(entry["requests"] for entry in completed),
+        "tokens": tokens,
+        "tokens_per_second": round(tokens / elapsed, 1) if elapsed else 0.0,
+        "cost_usd": round(sum(entry["cost_usd"] for entry in completed), 4),
+    }
+
+
+def print_report(report: dict):
+    print(
+        f"Processed {report['processed']} PDF(s) ({report['failed']} failed, {report['skipped']} skipped) "
+        f"in {report['elapsed_s']}s: {report['pdfs_per_minute']} PDFs/min, "
+        f"{report['requests']} LLM requests, {report['tokens']} tokens ({report['tokens_per_second']} tokens/s), "
+        f"${report['cost_usd']:.4f}"
+    )
@@ -0,0 +1,68 @@
+"""
+Benchmark the full load → extract → merge pipeline offline.
+
+Runs run_pipeline on each PDF with the local LLM provider, which serves
+recorded fixtures (EXTRACTOR_FIXTURES) or rule-generated responses after a
+simulated latency, and reports pages/second, the share of LLM responses that
+parsed as JSON, and the time spent in each stage.
+
+Usage (from gazettes/extractor):
+    python -m benchmarks.bench_pipeline --type ministry-amendment [PDF ...]
+        [--latency lognormal:-0.7,0.5] [--concurrency 8] [--token-budget 3000]
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+STAGES = ("load", "extract", "merge", "write")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", default=sorted(glob.glob("assets/pdf/*.pdf")), help="PDFs to process")
+    parser.add_argument("--type", default="ministry-amendment",
+                        choices=["ministry-initial", "ministry-amendment", "ministry-amendment-table", "persons"])
+    parser.add_argument("--latency", default="lognormal:-0.7,0.5", help="Simulated LLM latency distribution")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum LLM requests in flight")
+    parser.add_argument("--token-budget", type=int, default=None, help="Maximum page-text tokens per LLM request")
+    args = parser.parse_args()
+
+    # Read when the local model is created, so set it before importing the pipeline.
+    os.environ["EXTRACTOR_LOCAL_LATENCY"] = args.latency
+    from main import run_pipeline
+
+    options = dict(max_concurrency=args.concurrency, use_cache=False, llm_provider="local")
+    if args.token_budget:
+        options["token_budget"] = args.token_budget
+
+    totals = {"pages": 0, "chunks": 0, "responses": 0, "parsed": 0, **{stage: 0.0 for stage in STAGES}}
+    rows = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        for pdf in args.pdfs:
+            stats = {}
+            run_pipeline(args.type, pdf, output_dir + os.sep, stats=stats, **options)
+            rows.append((os.path.basename(pdf), stats))
+            for key in ("pages", "chunks", "responses", "parsed"):
+                totals[key] += stats[key]
+            for stage in STAGES:
+                totals[stage] += stats["timings"][stage]
+        elapsed = time.perf_counter() - start
+
+    print(f"\n{args.type}, latency {args.latency}, concurrency {args.concurrency}")
+    print(f"{'pdf':32} {'pages':>5} {'chunks':>6} {'parsed':>9} " + " ".join(f"{stage:>8}" for stage in STAGES))
+    for name, stats in rows:
+        parsed = f"{stats['parsed']}/{stats['responses']}"
+        print(f"{name[:32]:32} {stats['pages']:5} {stats['chunks']:6} {parsed:>9} "
+              + " ".join(f"{stats['timings'][stage]:7.2f}s" for stage in STAGES))
+
+    success = totals["parsed"] / totals["responses"] * 100 if totals["responses"] else 100.0
+    print(f"\n{totals['pages']} pages in {elapsed:.2f}s: {totals['pages'] / elapsed:.1f} pages/s, "
+          f"{success:.1f}% of {totals['responses']} LLM responses parsed")
+    print("stage totals: " + ", ".join(f"{stage} {totals[stage]:.2f}s" for stage in STAGES))
+
+
+if __name__ == "__main__":
+    main()
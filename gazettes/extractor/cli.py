@@ -1,19 +1,39 @@
 import argparse
+import logging
 from yaspin import yaspin
 
+from extractors.page_runner import DEFAULT_MAX_CONCURRENCY, DEFAULT_REQUESTS_PER_MINUTE
+from loaders.pdf_loader import DEFAULT_TOKEN_BUDGET
+from batch import run_batch
 from main import run_pipeline
 
 def main():
     parser = argparse.ArgumentParser(description="Gazette PDF Extractor CLI")
     parser.add_argument('--type', required=True, choices=['ministry-initial','ministry-amendment','ministry-amendment-table','persons'], help="Type of gazette to process")
-    parser.add_argument('--pdf', required=True, help="Input PDF file path")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--pdf', help="Input PDF file path")
+    source.add_argument('--input', help="Directory or glob of PDFs to process as a batch")
+    parser.add_argument('--workers', type=int, default=4, help="Worker processes for --input batches")
     parser.add_argument('--output', required=False, default='outputs/', help="Path to save the JSON output")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY, help="Maximum LLM requests in flight")
+    parser.add_argument('--rpm', type=float, default=DEFAULT_REQUESTS_PER_MINUTE, help="LLM requests per minute limit (default: unlimited)")
+    parser.add_argument('--token-budget', type=int, default=DEFAULT_TOKEN_BUDGET, help="Maximum page-text tokens per LLM request")
+    parser.add_argument('--debug', action='store_true', help="Log loaded pages and chunks")
+    parser.add_argument('--llm', choices=['openai', 'local'], default='openai', help="LLM provider; 'local' serves fixture or rule-generated responses offline")
+    parser.add_argument('--no-cache', action='store_true', help="Ignore cached LLM responses and call the LLM for every page")
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    options = dict(max_concurrency=args.concurrency, requests_per_minute=args.rpm,
+                   use_cache=not args.no_cache, token_budget=args.token_budget, llm_provider=args.llm)
+
+    if args.input:
+        run_batch(gazette_type=args.type, input_path=args.input, output_path=args.output, workers=args.workers, **options)
+        return
 
     with yaspin(text="Processing Gazette PDF...", color="cyan") as spinner:
         try:
-            run_pipeline(gazette_type=args.type, pdf_path=args.pdf, output_path=args.output)
+            run_pipeline(gazette_type=args.type, pdf_path=args.pdf, output_path=args.output, **options)
             spinner.ok("✅")
         except Exception as e:
             spinner.fail("❌")
@@ -0,0 +1,223 @@
+"""
+Rule-based parser for amendment gazettes written in the standard legal template:
+
+    (1) With reference to the Heading, “No. 06. Minister of Investment Promotion”
+        of the said notification, as follows:-
+        (a) In Column I thereof, by omitting item 7;
+        (b) In Column I thereof, re-numbering of items 8 to 13 respectively, as numbers 7 to 12;
+        (c) In Column II thereof, by insertion of the following items immediately after item 4;
+            5. Sri Lanka Export Development Board
+        (d) In Column III thereof, by omitting the following items;
+            • Citizenship Act, No. 18 of 1948
+
+Each clause is turned into the same ADD/OMIT/RENUMBER records the amendment
+prompt asks the LLM for. Clauses or headings that do not match the template
+are returned as text so the caller can send only those to the LLM.
+"""
+import re
+from bisect import bisect_right
+
+HEADER_LINE = re.compile(r"GAZETTE\s+EXTRAORDINARY\s+OF\s+THE\s+DEMOCRATIC\s+SOCIALIST\s+REPUBLIC", re.IGNORECASE)
+PAGE_NUMBER_LINE = re.compile(r"^\d+\s*A$")
+FOOTER_LINE = re.compile(
+    r"^(PRINTED AT THE DEPARTMENT OF GOVERNMENT PRINTING.*|EOG[\s\d-]*|Government Notifications"
+    r"|\d+A\s*-\s*G\s+\d+.*|This Gazette Extraordinary can be downloaded from.*)$",
+    re.IGNORECASE,
+)
+SCHEDULE_LINE = re.compile(r"^\s*SCHEDULE\s*$", re.IGNORECASE | re.MULTILINE)
+
+BLOCK_START = re.compile(r"^\s*\(\d+\)\s", re.MULTILINE)
+HEADING = re.compile(
+    r"^\s*\(\d+\)\s*With reference to the Heading,?\s*(?:No\.\s*)?[“\"]\s*(?:No\.\s*)?\d+\s*\.?\s*(?P<ministry>.+?)\s*[”“\"]"
+    r"\s*of the said\s+notification,?\s*as follows\s*:?-?",
+    re.IGNORECASE | re.DOTALL,
+)
+CLAUSE_START = re.compile(r"^\s*\([a-z]{1,2}\)\s", re.MULTILINE)
+CLAUSE = re.compile(r"^\s*\([a-z]{1,2}\)\s*In\s+Column\s+(?P<column>III|II|I)\s+thereof,?\s*(?P<action>.*)$", re.DOTALL)
+# A list clause is "<instruction>;" followed by the list on the next lines.
+LIST_SPLIT = re.compile(r"[;:][\s·]*\n")
+
+NUMBERS = r"\d+(?:\s*(?:,|and|to|&)\s*\d+)*"
+OMIT_ITEMS = re.compile(rf"^by omitting items?\s+(?P<numbers>{NUMBERS})\s*[;.]?$", re.IGNORECASE)
+OMIT_LIST = re.compile(r"^by omitting the following items?$", re.IGNORECASE)
+INSERT_LIST = re.compile(
+    r"^by (?:the\s+)?insert(?:ion|ing)\s+(?:of\s+)?the following (?:new\s+)?items?"
+    r"(?:\s+immediately after item\s*(?:No\.\s*)?(?P<after_number>\d+)|\s+(?:immediately\s+)?after the item\s*[“\"](?P<after_name>.+?)[”“\"])?$",
+    re.IGNORECASE,
+)
+RENUMBER = re.compile(
+    r"^(?:by\s+)?re-?numbering\s+(?:of\s+)?items?\s+(?P<old>.+?)\s+respectively,?\s*as\s+(?:numbers?\s+)?(?P<new>.+?)\s*[;.]?$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+LIST_ITEM = re.compile(r"^(?:[•·]\s*|(?P<number>\d+)\s*\.\s+)(?P<text>.*)$")
+WHITESPACE = re.compile(r"\s+")
+
+
+def _squash(text: str) -> str:
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def _expand_numbers(text: str) -> list[int]:
+    numbers = []
+    for part in re.split(r"\s*(?:,|and|&)\s*", text):
+        bounds = [int(n) for n in re.findall(r"\d+", part)]
+        if " to " in f" {part} " and len(bounds) == 2 and bounds[0] <= bounds[1]:
+            numbers.extend(range(bounds[0], bounds[1] + 1))
+        else:
+            numbers.extend(bounds)
+    return numbers
+
+
+def _parse_list(text: str) -> list[tuple[str | None, str]] | None:
+    """
+    Parse bullet or numbered list lines into (number, text) pairs, joining
+    wrapped lines. Returns None if any text precedes the first list marker.
+    """
+    items = []
+    for line in text.splitlines():
+        line = line.strip(" \t·;")
+        if not line:
+            continue
+        match = LIST_ITEM.match(line)
+        if match:
+            items.append([match.group("number"), match.group("text")])
+        elif items:
+            items[-1][1] += " " + line
+        else:
+            return None
+    items = [(number, _squash(item_text).strip(" ·;")) for number, item_text in items]
+    return items if items and all(item_text for _, item_text in items) else None
+
+
+def _parse_clause(clause: str) -> tuple[str, str, list[str]] | None:
+    """
+    Return (change_type, column, details) for a template clause, or None.
+    """
+    match = CLAUSE.match(clause)
+    if not match:
+        return None
+    column = match.group("column")
+    action = match.group("action").strip()
+    flat_action = _squash(action)
+
+    omit = OMIT_ITEMS.match(flat_action)
+    if omit:
+        return "OMIT", column, [f"Omitted: item {n}" for n in _expand_numbers(omit.group("numbers"))]
+
+    renumber = RENUMBER.match(flat_action)
+    if renumber:
+        old = re.sub(r"^(?:items?\s+)?(?:numbers?\s+)?", "", renumber.group("old"))
+        return "RENUMBER", column, [f"Renumbered: items {old} as {renumber.group('new')}"]
+
+    split = LIST_SPLIT.search(action)
+    if not split:
+        return None
+    instruction, list_text = _squash(action[:split.start()]), action[split.end():]
+
+    if OMIT_LIST.match(instruction):
+        items = _parse_list(list_text)
+        if items is None:
+            return None
+        return "OMIT", column, [f"Omitted: {text}" for _, text in items]
+
+    insert = INSERT_LIST.match(instruction)
+    if insert:
+        items = _parse_list(list_text)
+        if items is None:
+            return None
+        details = []
+        if insert.group("after_name"):
+            details.append(f"after: {_squash(insert.group('after_name'))}")
+        for number, text in items:
+            details.append(f"Inserted: item {number} — {text}" if number else f"Inserted: {text}")
+        return "ADD", column, details
+
+    return None
+
+
+def clean_gazette_text(pages: list[str]) -> tuple[str, list[int]]:
+    """
+    Join page texts, dropping running headers, page numbers and printer footers,
+    and keep only the schedule if one is marked. Also returns the offset at
+    which each page starts in the joined text (negative if before the schedule).
+    """
+    lines = []
+    page_starts = []
+    offset = 0
+    for page in pages:
+        page_starts.append(offset)
+        page_lines = page.replace("\xa0", " ").splitlines()
+        for idx, line in enumerate(page_lines[:6]):
+            if HEADER_LINE.search(line):
+                page_lines = page_lines[idx + 1:]
+                if page_lines and PAGE_NUMBER_LINE.match(page_lines[0].strip()):
+                    page_lines = page_lines[1:]
+                break
+        kept = [line for line in page_lines if not FOOTER_LINE.match(line.strip())]
+        lines.extend(kept)
+        offset += sum(len(line) + 1 for line in kept)
+    text = "\n".join(lines)
+    schedule = SCHEDULE_LINE.search(text)
+    if not schedule:
+        return text, page_starts
+    return text[schedule.end():], [start - schedule.end() for start in page_starts]
+
+
+def parse_amendment_text(pages: list[str]) -> tuple[list[dict], list[tuple[str, int]], dict]:
+    """
+    Parse amendment gazette page texts.
+
+    Returns (changes, unparsed, stats): `changes` are records in the LLM output
+    format, `unparsed` are (text, 1-based page) fragments that still need the
+    LLM, each clause prefixed with its ministry heading, and `stats` counts
+    template clauses and how many were parsed. If no template heading is
+    found, the whole gazette is returned as unparsed pages.
+    """
+    text, page_starts = clean_gazette_text(pages)
+    starts = [m.start() for m in BLOCK_START.finditer(text)]
+    blocks = [(start, text[start:end]) for start, end in zip(starts, starts[1:] + [len(text)])]
+
+    grouped: dict[tuple[str, str, str], list[str]] = {}
+    unparsed = []
+    stats = {"clauses": 0, "parsed": 0}
+
+    def page_of(offset: int) -> int:
+        return max(1, bisect_right(page_starts, offset))
+
+    if not any(HEADING.match(block) for _, block in blocks):
+        return [], [(page, idx + 1) for idx, page in enumerate(pages) if page.strip()], stats
+
+    for block_start, block in blocks:
+        heading = HEADING.match(block)
+        if not heading:
+            stats["clauses"] += 1
+            unparsed.append((block.strip(), page_of(block_start)))
+            continue
+        ministry = _squash(heading.group("ministry"))
+        heading_text = _squash(heading.group(0))
+        body_start = block_start + heading.end()
+        body = block[heading.end():]
+
+        clause_starts = [m.start() for m in CLAUSE_START.finditer(body)]
+        if not clause_starts or body[:clause_starts[0]].strip(" \t\n·"):
+            stats["clauses"] += 1
+            unparsed.append((block.strip(), page_of(block_start)))
+            continue
+
+        for start, end in zip(clause_starts, clause_starts[1:] + [len(body)]):
+            clause = body[start:end]
+            stats["clauses"] += 1
+            parsed = _parse_clause(clause)
+            if parsed is None:
+                unparsed.append((f"{heading_text}\n{clause.strip()}", page_of(body_start + start)))
+                continue
+            stats["parsed"] += 1
+            change_type, column, details = parsed
+            grouped.setdefault((ministry, change_type, column), []).extend(details)
+
+    changes = [
+        {"ministry_name": ministry, "change_type": change_type, "affected_column": column, "details": details}
+        for (ministry, change_type, column), details in grouped.items()
+    ]
+    return changes, unparsed, stats
@@ -1,6 +1,86 @@
 from abc import ABC,abstractmethod
+import json
+
+from langchain_openai import ChatOpenAI
+
+from extractors.local_llm import DEFAULT_RECORD_PATH, FixtureRecorder, FixtureStore, LocalChatModel
+from extractors.page_runner import PageRunner
+from extractors.response_cache import ResponseCache, cache_key
+
+def describe_chunk(document, idx):
+    pages = document.metadata.get("pages", [idx + 1])
+    if len(pages) == 1:
+        return f"page {pages[0]}"
+    return f"pages {pages[0]}-{pages[-1]}"
+
+def make_llm(provider: str = "openai"):
+    """
+    The chat model extractors run their prompts on: "openai", or "local" to serve
+    fixture or rule-generated responses offline (see extractors.local_llm).
+    """
+    if provider == "local":
+        return LocalChatModel()
+    if provider != "openai":
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    callbacks = [FixtureRecorder(FixtureStore(DEFAULT_RECORD_PATH))] if DEFAULT_RECORD_PATH else None
+    return ChatOpenAI(temperature=0, max_tokens = 2048, max_retries=0, callbacks=callbacks)
 
 class BaseExtractor(ABC):
+    def __init__(self, runner: PageRunner | None = None, cache: ResponseCache | None = None, llm=None):
+        self.runner = runner or PageRunner()
+        self.cache = cache
+        self.llm = llm or make_llm()
+        self.stats = {"responses": 0, "parsed": 0}
+
     @abstractmethod
     def extract(self, documents):
-        pass
\ No newline at end of file
+        pass
+
+    def run_pages(self, chain, documents):
+        """
+        Run `chain` over every chunk concurrently and return (chunk index, output)
+        pairs in page order. Failed chunks are reported and left out.
+        Retries live in the runner, so extractor LLMs use max_retries=0.
+        Chunks answered by the response cache are not sent to the LLM.
+        """
+        for idx, page in enumerate(documents):
+            print(f"Processing {describe_chunk(page, idx)} (length: {len(page.page_content)})")
+
+        outputs = [None] * len(documents)
+        keys = []
+        if self.cache is not None:
+            template = chain.first.template
+            keys = [cache_key(self.llm.model_name, self.llm.temperature, template, page.page_content) for page in documents]
+            cached = self.cache.get_many(keys)
+            outputs = [cached.get(key) for key in keys]
+
+        missing = [idx for idx, output in enumerate(outputs) if output is None]
+        fresh = self.runner.run(chain, [{"docs": documents[idx].page_content} for idx in missing])
+        for idx, output in zip(missing, fresh):
+            outputs[idx] = output
+
+        if self.cache is not None:
+            self.cache.put_many({
+                keys[idx]: output for idx, output in zip(missing, fresh) if not isinstance(output, Exception)
+            })
+
+        results = []
+        for idx, output in enumerate(outputs):
+            if isinstance(output, Exception):
+                print(f"Error on {describe_chunk(documents[idx], idx)}: {output}")
+            else:
+                results.append((idx, output.replace("\n","")))
+        self.stats["responses"] += len(results)
+        return results
+
+    def parse_response(self, documents, idx, result):
+        """
+        Parse a chunk's JSON output, or report the error and return None.
+        """
+        try:
+            parsed = json.loads(result)
+        except Exception as e:
+            print(f"Error on {describe_chunk(documents[idx], idx)}: {e}")
+            return None
+        self.stats["parsed"] += 1
+        return parsed
@@ -0,0 +1,196 @@
+"""
+`--llm local`: a langchain chat model that answers the extractor prompts
+without calling OpenAI, for offline runs and benchmarks/bench_pipeline.py.
+
+Answers are looked up in EXTRACTOR_FIXTURES, a JSON lines file of
+{"messages_sha256": ..., "response": ...} that FixtureRecorder appends to when
+ChatOpenAI runs with EXTRACTOR_RECORD_FIXTURES set. Anything not recorded is
+answered by the amendment, ministry or person rule for the prompt, built from
+the page text with the same parsers the pipeline uses. Each call waits for a
+delay drawn from the model's `latency` spec.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import field_validator
+
+from extractors.amendment_rule_parser import parse_amendment_text
+
+DEFAULT_FIXTURES_PATH = os.environ.get("EXTRACTOR_FIXTURES")
+DEFAULT_RECORD_PATH = os.environ.get("EXTRACTOR_RECORD_FIXTURES")
+DEFAULT_LATENCY = os.environ.get("EXTRACTOR_LOCAL_LATENCY", "fixed:0")
+
+MINISTER_HEADING = re.compile(r"^\s*(?:No\.\s*)?\d+\s*\.\s*((?:State\s+)?Minister\s+of\s+.+?)\s*$", re.MULTILINE)
+APPOINTMENT = re.compile(
+    r"(?:Hon\.\s*)?(?P<name>[A-Z][A-Za-z.]+(?:\s+[A-Z][A-Za-z.]+)+),\s*(?:M\.?\s*P\.?,\s*)?"
+    r"(?P<position>Prime Minister|State Minister|Deputy Minister|Minister)\s+of\s+(?P<ministry>[^\n;]+?)\s*[.;\n]"
+)
+DATE = re.compile(r"\b(\d{4})[./-](\d{2})[./-](\d{2})\b")
+
+
+def messages_key(messages) -> str:
+    """Fixture key of a chat call: the sha256 of every message's type and content, in order."""
+    payload = json.dumps([[message.type, message.content] for message in messages], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Latency spec name -> draw from a seeded random.Random with the spec's parameters.
+LATENCY_DISTRIBUTIONS = {
+    "fixed": lambda rng, seconds: seconds,
+    "uniform": random.Random.uniform,
+    "normal": random.Random.gauss,
+    "lognormal": random.Random.lognormvariate,
+}
+
+
+def parse_latency(spec: str) -> tuple[str, list[float]]:
+    """("uniform", [0.2, 1.5]) for "uniform:0.2,1.5"; raises ValueError for unknown distributions."""
+    name, _, params = spec.partition(":")
+    if name not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"Unsupported latency distribution: {name}")
+    return name, [float(p) for p in params.split(",") if p]
+
+
+def _amendment_response(docs: str) -> str:
+    changes, _, _ = parse_amendment_text([docs])
+    return json.dumps(changes, ensure_ascii=False)
+
+
+def _ministry_response(docs: str) -> str:
+    names = list(dict.fromkeys(MINISTER_HEADING.findall(docs)))
+    return json.dumps({"ministers": [
+        {"name": name, "subjects_and_functions": [], "departments": [], "laws_and_ordinances": []} for name in names
+    ]}, ensure_ascii=False)
+
+
+def _person_response(docs: str) -> str:
+    date = DATE.search(docs)
+    records = [
+        {
+            "name": match.group("name"),
+            "Ministry": match.group("ministry"),
+            "date": "-".join(date.groups()) if date else "",
+            "position": match.group("position"),
+        }
+        for match in APPOINTMENT.finditer(docs)
+    ]
+    return json.dumps({"ADD": records, "TERMINATE": [], "RENAME": []}, ensure_ascii=False)
+
+
+# (marker found in the prompt, text just before the page content, generator), checked in order by rule_response.
+RULES = [
+    ('"change_type"', "TEXT:", _amendment_response),
+    ('"ministers"', "document content:", _ministry_response),
+    ('"TERMINATE"', "gazette text:", _person_response),
+]
+
+
+class FixtureStore:
+    """Recorded responses by messages_key, read from and appended to one JSON lines file."""
+
+    def __init__(self, path: str | None = DEFAULT_FIXTURES_PATH):
+        self.path = path
+        self.responses: dict[str, str] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                records = (json.loads(line) for line in f if line.strip())
+                self.responses = {record["messages_sha256"]: record["response"] for record in records}
+
+    def get(self, messages) -> str | None:
+        return self.responses.get(messages_key(messages))
+
+    def record(self, messages, response: str):
+        key = messages_key(messages)
+        with self._lock:
+            self.responses[key] = response
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"messages_sha256": key, "response": response}, ensure_ascii=False) + "\n")
+
+
+def rule_response(prompt: str) -> str:
+    """Response of the first rule whose marker is in `prompt`, applied to the page text after its separator."""
+    for marker, separator, rule in RULES:
+        if marker in prompt:
+            return rule(prompt.rsplit(separator, 1)[-1])
+    return ""
+
+
+class LocalChatModel(BaseChatModel):
+    """Chat model answering from a FixtureStore, or by rule, after a delay drawn from `latency`."""
+    model_name: str = "local-fixtures"
+    temperature: float = 0
+    fixtures: Any = None
+    latency: str = DEFAULT_LATENCY
+    seed: int = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures = self.fixtures or FixtureStore()
+
+    @field_validator("latency")
+    @classmethod
+    def _check_latency(cls, spec: str) -> str:
+        parse_latency(spec)
+        return spec
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-fixtures"
+
+    def _delay(self, key: str) -> float:
+        # Seeded per call, so the benchmark sees the same delays however the page runner orders its calls.
+        name, params = parse_latency(self.latency)
+        return max(0.0, LATENCY_DISTRIBUTIONS[name](random.Random(f"{self.seed}:{key}"), *params))
+
+    def _respond(self, messages):
+        content = self.fixtures.get(messages)
+        if content is None:
+            content = rule_response(messages[-1].content)
+        # usage_metadata feeds the pipeline's token counts; 4 characters a token is close enough offline.
+        prompt_chars = sum(len(message.content) for message in messages)
+        usage = {"input_tokens": prompt_chars // 4, "output_tokens": len(content) // 4}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message = AIMessage(content=content, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)]), self._delay(messages_key(messages))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        result, delay = self._respond(messages)
+        time.sleep(delay)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        result, delay = self._respond(messages)
+        await asyncio.sleep(delay)
+        return result
+
+
+class FixtureRecorder(BaseCallbackHandler):
+    """Callback that records every call of a chat model, with its response, into a FixtureStore."""
+
+    def __init__(self, fixtures: FixtureStore):
+        self.fixtures = fixtures
+        self._calls = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._calls[run_id] = messages[0]
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        messages = self._calls.pop(run_id, None)
+        if messages is not None:
+            self.fixtures.record(messages, response.generations[0][0].text)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._calls.pop(run_id, None)
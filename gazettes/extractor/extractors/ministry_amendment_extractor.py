@@ -1,33 +1,49 @@
-import json
+from extractors.amendment_rule_parser import parse_amendment_text
 from extractors.base_extractor import BaseExtractor
+from loaders.pdf_loader import DEFAULT_TOKEN_BUDGET, chunk_documents
 from prompts.ministry_amendment_prompts import INITIAL_PROMPT
-from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
+from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 
 
 class MinistryAmendmentExtractor(BaseExtractor):
-    def __init__(self):
-        self.llm = ChatOpenAI(temperature=0, max_tokens = 2048)
+    def __init__(self, runner=None, cache=None, token_budget=DEFAULT_TOKEN_BUDGET, use_rules=True, llm=None):
+        super().__init__(runner, cache, llm)
+        self.token_budget = token_budget
+        self.use_rules = use_rules
         
     def extract(self, documents):
+        """
+        Extract changes from amendment gazette pages. Clauses that follow the
+        standard amendment template are parsed by rules; only the rest is sent
+        to the LLM.
+        """
         all_result = []
-        
+
+        if self.use_rules:
+            changes, unparsed, stats = parse_amendment_text([doc.page_content for doc in documents])
+            if changes:
+                all_result.append(changes)
+            fallback = [Document(page_content=text, metadata={"page": page - 1}) for text, page in unparsed]
+            documents = chunk_documents(fallback, token_budget=self.token_budget) if fallback else []
+            if stats["clauses"]:
+                fallback_rate = (stats["clauses"] - stats["parsed"]) / stats["clauses"] * 100
+                print(f"Rule parser: {stats['parsed']}/{stats['clauses']} clauses parsed, "
+                      f"{fallback_rate:.0f}% sent to the LLM in {len(documents)} request(s).")
+            else:
+                print(f"Rule parser: no amendment template found, {len(documents)} LLM request(s).")
+
+        if not documents:
+            return all_result
+
         prompt = PromptTemplate(input_variables=["docs"], template=INITIAL_PROMPT)
         chain = prompt | self.llm | StrOutputParser()
         
-        for idx, page in enumerate(documents):
-            print(f"Processing page {idx+1} (length: {len(page.page_content)})")
-
-            if len(page.page_content) < 12000:
-                try:
-                    result = chain.invoke({"docs": page.page_content})
-                    result = result.replace("\n","")
-                    all_result.append(json.loads(result))
-                except Exception as e:
-                    print(f"Error on page {idx+1}: {e}")
-            else:
-                print(f"Skipped page {idx+1} due to length.")
+        for idx, result in self.run_pages(chain, documents):
+            parsed = self.parse_response(documents, idx, result)
+            if parsed is not None:
+                all_result.append(parsed)
         
         return all_result
         
\ No newline at end of file
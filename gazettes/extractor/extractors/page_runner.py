@@ -0,0 +1,116 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("EXTRACTOR_MAX_CONCURRENCY", 8))
+DEFAULT_REQUESTS_PER_MINUTE = float(os.environ.get("EXTRACTOR_RPM", 0)) or None
+
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError, openai.InternalServerError)
+
+
+class RateLimiter:
+    """
+    Spaces request starts evenly to stay under a requests-per-minute budget.
+    Thread safe and not tied to an event loop, so one instance can be shared
+    by every extractor that talks to the same provider.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_rate_limiters: dict[tuple[str, float], RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, requests_per_minute: float | None) -> RateLimiter | None:
+    if not requests_per_minute:
+        return None
+    with _rate_limiters_lock:
+        key = (provider, requests_per_minute)
+        if key not in _rate_limiters:
+            _rate_limiters[key] = RateLimiter(requests_per_minute)
+        return _rate_limiters[key]
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    status = getattr(error, "status_code", None)
+    return status == 429 or (status is not None and 500 <= status < 600)
+
+
+class PageRunner:
+    """
+    Runs a LangChain chain over many page inputs concurrently.
+
+    At most `max_concurrency` requests are in flight, request starts are
+    rate limited per provider, and 429/5xx/connection errors are retried
+    with jittered exponential backoff. Results come back in input order;
+    a page that still fails holds its exception instead of a result.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 requests_per_minute: float | None = DEFAULT_REQUESTS_PER_MINUTE,
+                 provider: str = "openai", max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = get_rate_limiter(provider, requests_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def run(self, chain, inputs: list[dict]) -> list:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.arun(chain, inputs))
+        # Already inside an event loop (e.g. a notebook): run on a helper thread.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, self.arun(chain, inputs)).result()
+
+    async def arun(self, chain, inputs: list[dict]) -> list:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(page_input):
+            async with semaphore:
+                try:
+                    return await self._invoke_with_retry(chain, page_input)
+                except Exception as e:
+                    return e
+
+        return await asyncio.gather(*(run_one(page_input) for page_input in inputs))
+
+    async def _invoke_with_retry(self, chain, page_input: dict):
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            try:
+                return await chain.ainvoke(page_input)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                print(f"Retrying after {type(e).__name__} in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+                attempt += 1
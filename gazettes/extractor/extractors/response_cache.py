@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(os.environ.get("EXTRACTOR_CACHE_PATH", ".cache/llm_responses.sqlite"))
+DEFAULT_CACHE_MAX_MB = float(os.environ.get("EXTRACTOR_CACHE_MAX_MB", 512))
+
+
+def cache_key(model: str, temperature: float, template: str, text: str) -> str:
+    payload = json.dumps([model, temperature, template, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Disk-backed cache of raw LLM responses.
+
+    Entries are keyed by cache_key(model, temperature, prompt template, page
+    text), so any prompt or model change misses while re-running the same
+    gazette is free. When the stored responses exceed `max_mb`, the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_mb: float = DEFAULT_CACHE_MAX_MB):
+        self.path = Path(path)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self.conn.commit()
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(self.conn.execute(
+                f"SELECT key, response FROM responses WHERE key IN ({placeholders})", chunk
+            ).fetchall())
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany("UPDATE responses SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        self.hits += sum(1 for key in keys if key in found)
+        self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, entries: dict[str, str]):
+        if not entries:
+            return
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_used) VALUES (?, ?, ?, ?)",
+                [(key, response, len(response.encode("utf-8")), now) for key, response in entries.items()],
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed, stale = 0, []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"LLM cache: {self.hits} hit(s), {self.misses} miss(es) ({rate:.0f}% hit rate)"
+
+    def close(self):
+        self.conn.close()
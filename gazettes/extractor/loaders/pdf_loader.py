@@ -1,47 +1,232 @@
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+import pymupdf
 from langchain_core.documents import Document
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("EXTRACTOR_TOKEN_BUDGET", 3000))
+DEFAULT_OVERLAP_TOKENS = int(os.environ.get("EXTRACTOR_OVERLAP_TOKENS", 150))
+
+# Line breaks, tabs and runs of spaces all become a single space.
+PAGE_WHITESPACE = re.compile(r"\s+")
+
+# Split points for oversized pages, tried from coarsest to finest.
+SPLIT_BOUNDARIES = [
+    # Ministry headings and amendment references, e.g. "No. 12. Minister of ..."
+    re.compile(r"(?=(?:No\.\s*\d+\s*\.\s*(?:State\s+)?Minister\b|With reference to the Heading))"),
+    # Column change markers, e.g. "(a) In Column I thereof"
+    re.compile(r"(?=\(\s*[a-z]\s*\)\s*In Column)"),
+    # Numbered items, e.g. " 14. Registration of persons"
+    re.compile(r"(?<=\s)(?=\d{1,3}\.\s)"),
+    # Sentences
+    re.compile(r"(?<=[.;])(?=\s)"),
+]
+
+
+class TokenCounter:
+    """
+    Counts tokens with the model's tiktoken encoding. Falls back to a
+    four-characters-per-token estimate when the encoding cannot be loaded
+    (tiktoken downloads it on first use).
+    """
+
+    def __init__(self, model: str = DEFAULT_MODEL):
+        try:
+            import tiktoken
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"Tokenizer for {model} unavailable ({type(e).__name__}), estimating tokens from length.")
+            self.encoding = None
+
+    def count(self, text: str) -> int:
+        if self.encoding is None:
+            return len(text) // 4 + 1
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def tail(self, text: str, tokens: int) -> str:
+        if tokens <= 0:
+            return ""
+        if self.encoding is None:
+            return text[-tokens * 4:]
+        return self.encoding.decode(self.encoding.encode(text, disallowed_special=())[-tokens:])
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model: str = DEFAULT_MODEL) -> TokenCounter:
+    return TokenCounter(model)
+
+
+def _pack(segments: list[str], budget: int, counter: TokenCounter, sep: str = "") -> list[str]:
+    pieces, current, used = [], [], 0
+    for segment in segments:
+        tokens = counter.count(segment)
+        if current and used + tokens > budget:
+            pieces.append(sep.join(current))
+            current, used = [], 0
+        current.append(segment)
+        used += tokens
+    if current:
+        pieces.append(sep.join(current))
+    return pieces
+
+
+def _split_text(text: str, budget: int, counter: TokenCounter, level: int = 0) -> list[str]:
+    """
+    Split text into pieces of at most `budget` tokens, preferring the coarsest boundary.
+    """
+    if counter.count(text) <= budget:
+        return [text]
+    if level >= len(SPLIT_BOUNDARIES):
+        # No boundary left: cut between words.
+        return _pack(text.split(), budget, counter, sep=" ")
+
+    segments = [s for s in SPLIT_BOUNDARIES[level].split(text) if s.strip()]
+    if len(segments) == 1:
+        return _split_text(text, budget, counter, level + 1)
+    pieces = _pack(segments, budget, counter)
+    return [part for piece in pieces for part in _split_text(piece, budget, counter, level + 1)]
+
+
+def iter_chunks(documents: Iterable[Document], token_budget: int = DEFAULT_TOKEN_BUDGET,
+                overlap_tokens: int = DEFAULT_OVERLAP_TOKENS, model: str = DEFAULT_MODEL) -> Iterator[Document]:
+    """
+    Turn pages into LLM requests of at most `token_budget` tokens of page text.
+
+    Pages larger than the budget are split on ministry/column/item boundaries,
+    each part repeating the last `overlap_tokens` tokens of the previous one.
+    Consecutive small pages are packed into one request. Every chunk records
+    the 1-based pages it covers in metadata["pages"] and whether it starts
+    with overlapping text in metadata["overlap"]. Pages are consumed lazily
+    and each chunk is yielded as soon as it is full.
+    """
+    counter = get_token_counter(model)
+    overlap_tokens = min(overlap_tokens, token_budget // 4)
+    metadata = None
+
+    def units():
+        # (text, page number, tokens, starts with overlap)
+        nonlocal metadata
+        for idx, doc in enumerate(documents):
+            if metadata is None:
+                metadata = doc.metadata
+            page = doc.metadata.get("page", idx) + 1
+            text = doc.page_content.strip()
+            if not text:
+                continue
+            tokens = counter.count(text)
+            if tokens <= token_budget:
+                yield text, page, tokens, False
+                continue
+            parts = _split_text(text, token_budget - overlap_tokens, counter)
+            print(f"Split page {page} ({tokens} tokens) into {len(parts)} parts.")
+            for part_idx, part in enumerate(parts):
+                if part_idx > 0 and overlap_tokens:
+                    part = counter.tail(parts[part_idx - 1], overlap_tokens) + " " + part
+                yield part, page, counter.count(part), part_idx > 0 and overlap_tokens > 0
+
+    def make_chunk(texts, pages, overlap):
+        return Document(page_content="\n".join(texts), metadata={**metadata, "page": pages[0] - 1, "pages": pages, "overlap": overlap})
+
+    texts, pages, used, overlap = [], [], 0, False
+    for text, page, tokens, starts_with_overlap in units():
+        if texts and used + tokens + 1 > token_budget:
+            yield make_chunk(texts, pages, overlap)
+            texts, pages, used = [], [], 0
+        if not texts:
+            overlap = starts_with_overlap
+        texts.append(text)
+        if page not in pages:
+            pages.append(page)
+        used += tokens + 1
+    if texts:
+        yield make_chunk(texts, pages, overlap)
+
+
+def chunk_documents(documents: Iterable[Document], token_budget: int = DEFAULT_TOKEN_BUDGET,
+                    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS, model: str = DEFAULT_MODEL) -> list[Document]:
+    """
+    List form of `iter_chunks`.
+    """
+    return list(iter_chunks(documents, token_budget=token_budget, overlap_tokens=overlap_tokens, model=model))
+
+
 class PDFLoader:
+    """
+    Reads gazette pages from one PyMuPDF document.
+
+    The PDF is opened once per loader and `iter_pages` produces pages
+    lazily, so the plain-text and amendment modes share the same parse and
+    the chunker never holds the parsed pages as a whole. The `load*`
+    methods return lists: the extractors index chunks by position and hand
+    them to the PageRunner together, and the amendment parser reads the
+    whole gazette at once, so streaming stops at the loader.
+    """
+
     def __init__(self, pdf_path):
-        self.pdf_path = pdf_path
-    
+        self.pdf_path = str(pdf_path)
+        self._document = None
+
+    @property
+    def document(self):
+        if self._document is None:
+            self._document = pymupdf.open(self.pdf_path)
+        return self._document
+
+    def close(self):
+        if self._document is not None:
+            self._document.close()
+            self._document = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def iter_pages(self, keep_line_breaks: bool = False) -> Iterator[Document]:
+        """
+        Yield one Document per page. Whitespace is collapsed to single spaces
+        unless `keep_line_breaks` is set (amendment mode).
+        """
+        document = self.document
+        total_pages = document.page_count
+        for idx in range(total_pages):
+            text = document.load_page(idx).get_text()
+            if not keep_line_breaks:
+                text = PAGE_WHITESPACE.sub(" ", text)
+            page = Document(page_content=text, metadata={
+                "source": self.pdf_path, "file_path": self.pdf_path, "page": idx, "total_pages": total_pages,
+            })
+            logger.debug("Page %d/%d: %r", idx + 1, total_pages, page)
+            yield page
+
     def load(self):
-        loader = PyMuPDFLoader(self.pdf_path)
-        content = loader.load()
-        
-        # Clean each document's text content
-        cleaned_content = [
-            Document(page_content=doc.page_content.replace("\n", " ").replace("\t"," ").replace("  "," "), metadata=doc.metadata)
-            for doc in content
-        ]
-
-        print('document')
-        print(cleaned_content)
-
-        return cleaned_content
-    
-    def loadAmendment(self):
-        loader = PyMuPDFLoader(self.pdf_path)
-        pages = loader.load()  # returns list of Document objects, one per page
-
-        merged_docs = []
-        temp_content = ""
-        temp_metadata = {}
-        
-        for i, page in enumerate(pages):
-            temp_content += page.page_content + "\n"
-
-            # Keep the metadata of the first page in the chunk
-            if i % 3 == 0:
-                temp_metadata = page.metadata
-
-            # Every 3 pages or last page
-            if (i + 1) % 3 == 0 or (i + 1) == len(pages):
-                merged_docs.append(Document(page_content=temp_content.strip(), metadata=temp_metadata))
-                temp_content = ""
-                i -= 1
-
-        print('merged docs')
-        print(merged_docs)
-        return merged_docs
\ No newline at end of file
+        """Every page as a list; use `iter_pages` to read pages one at a time."""
+        return list(self.iter_pages())
+
+    def loadChunks(self, token_budget: int = DEFAULT_TOKEN_BUDGET, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS):
+        """Pages packed into LLM requests, chunked as they are parsed; see `iter_chunks`."""
+        chunks = chunk_documents(self.iter_pages(), token_budget=token_budget, overlap_tokens=overlap_tokens)
+        logger.debug("%d chunks: %r", len(chunks), chunks)
+        return chunks
+
+    def loadAmendmentPages(self):
+        # Line breaks are kept: the amendment rule parser and prompt rely on them.
+        return list(self.iter_pages(keep_line_breaks=True))
+
+    def loadAmendment(self, token_budget: int = DEFAULT_TOKEN_BUDGET, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS):
+        # Amendment notices run across pages, so they are packed by token budget
+        # rather than page count.
+        merged_docs = chunk_documents(self.iter_pages(keep_line_breaks=True), token_budget=token_budget,
+                                      overlap_tokens=overlap_tokens)
+        logger.debug("%d merged docs: %r", len(merged_docs), merged_docs)
+        return merged_docs
@@ -1,48 +1,95 @@
 import json
+import time
 from pathlib import Path
 
+from extractors.base_extractor import make_llm
 from extractors.ministry_amendment_and_table_extractor import MinistryAmendmentTableExtractor
 from extractors.ministry_amendment_extractor import MinistryAmendmentExtractor
 from extractors.ministry_extractor import MinistryExtractor
+from extractors.page_runner import DEFAULT_MAX_CONCURRENCY, DEFAULT_REQUESTS_PER_MINUTE, PageRunner
 from extractors.person_extractor import PersonExtractor
-from loaders.pdf_loader import PDFLoader
+from extractors.response_cache import ResponseCache
+from loaders.pdf_loader import DEFAULT_TOKEN_BUDGET, PDFLoader
 from mergers.ministry_amendment_merger import group_by_change_type
 from mergers.ministry_amendment_table import merge_gazette_responses
 from mergers.ministry_merger import merge_ministers
 from mergers.person_merger import merge_person
 
-def run_pipeline(gazette_type: str, pdf_path: str, output_path: str):
-    documents = PDFLoader(pdf_path).load()
+def run_pipeline(gazette_type: str, pdf_path: str, output_path: str,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 requests_per_minute: float | None = DEFAULT_REQUESTS_PER_MINUTE,
+                 use_cache: bool = True, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 llm_provider: str = "openai", stats: dict | None = None, output_name: str | None = None):
+    """
+    Extract `pdf_path` and write the merged result to
+    `<output_path><gazette_type>-<output_name>.json`, where `output_name`
+    defaults to the PDF's file name without its extension. If a
+    `stats` dict is given it is filled with page, chunk and response counts
+    and the seconds spent in each stage (load, extract, merge, write).
+    """
+    timings = {}
+    start = time.perf_counter()
+    with PDFLoader(pdf_path) as loader:
+        page_count = len(loader.document)
+        # Amendments are parsed from pages with line breaks; every other type is chunked.
+        if gazette_type == "ministry-amendment":
+            documents = loader.loadAmendmentPages()
+        else:
+            documents = loader.loadChunks(token_budget=token_budget)
+    timings["load"] = time.perf_counter() - start
+
+    runner = PageRunner(max_concurrency=max_concurrency, requests_per_minute=requests_per_minute)
+    cache = ResponseCache() if use_cache else None
+    llm = make_llm(llm_provider)
 
     if not output_path:
         output_path = "outputs/"
 
     pdf_path = Path(pdf_path)
-    pdf_name = pdf_path.name.split('.')[0]
+    pdf_name = output_name or pdf_path.stem
 
     final_result = {}
     
     if gazette_type == "ministry-initial":
-        extractor = MinistryExtractor()
+        extractor = MinistryExtractor(runner, cache, llm)
         raw_result = extractor.extract(documents)
-        final_result = merge_ministers(raw_result)
+        merge = merge_ministers
 
     elif gazette_type == "ministry-amendment":
-        ad = PDFLoader(pdf_path).loadAmendment()
-        extractor = MinistryAmendmentExtractor()
-        raw_result = extractor.extract(ad)
-        final_result = group_by_change_type(raw_result)
+        extractor = MinistryAmendmentExtractor(runner, cache, token_budget=token_budget, llm=llm)
+        raw_result = extractor.extract(documents)
+        merge = group_by_change_type
 
     elif gazette_type == "ministry-amendment-table":
-        extractor = MinistryAmendmentTableExtractor()
+        extractor = MinistryAmendmentTableExtractor(runner, cache, llm)
         raw_result = extractor.extract(documents)
+        merge = None
         # final_result = merge_gazette_responses(raw_result)
     
     elif gazette_type == "persons":
-        extractor = PersonExtractor()
+        extractor = PersonExtractor(runner, cache, llm)
         raw_result = extractor.extract(documents)
-        final_result = merge_person(raw_result)
+        merge = merge_person
     
+    timings["extract"] = time.perf_counter() - start - timings["load"]
+
+    start = time.perf_counter()
+    if merge is not None:
+        final_result = merge(raw_result)
+    timings["merge"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    output_file = f'{output_path}{gazette_type}-{pdf_name}.json'
     if final_result is not {}:
-        with open(f'{output_path}{gazette_type}-{pdf_name}.json',"w", encoding="utf-8") as f:
+        with open(output_file,"w", encoding="utf-8") as f:
             json.dump(final_result, f, indent=2, ensure_ascii=False)  
+    timings["write"] = time.perf_counter() - start
+
+    if cache is not None:
+        print(cache.stats())
+        cache.close()
+
+    if stats is not None:
+        stats.update(pages=page_count, chunks=len(documents), **extractor.stats, timings=timings)
+
+    return output_file
@@ -7,13 +7,24 @@ def group_by_change_type(nested_data):
         "RENUMBER": []
     }
 
+    # Overlapping chunks can report the same change twice, so details already
+    # seen for a ministry/change/column are dropped.
+    seen = {}
+
     for item in flat_data:
         change_type = item.get("change_type")
         if change_type in result:
+            key = (item.get("ministry_name"), change_type, item.get("affected_column"))
+            details = item.get("details", [])
+            if key in seen:
+                details = [d for d in details if repr(d) not in seen[key]]
+                if not details:
+                    continue
+            seen.setdefault(key, set()).update(repr(d) for d in details)
             result[change_type].append({
                 "ministry_name": item.get("ministry_name"),
                 "affected_column": item.get("affected_column"),
-                "details": item.get("details", [])
+                "details": details
             })
 
     return result
\ No newline at end of file
@@ -7,6 +7,16 @@ def merge_person(response_list):
         "RENAME": []
     }
 
+    # Overlapping chunks can report the same record twice.
+    seen = set()
+
+    def extend(change_type, records):
+        for record in records:
+            key = (change_type, json.dumps(record, sort_keys=True))
+            if key not in seen:
+                seen.add(key)
+                merged[change_type].append(record)
+
     for res_str in response_list:
         try:
             if isinstance(res_str, dict):
@@ -15,11 +25,11 @@ def merge_person(response_list):
                 data = json.loads(res_str)
 
             if "ADD" in data:
-                merged["ADD"].extend(data["ADD"])
+                extend("ADD", data["ADD"])
             if "TERMINATE" in data:
-                merged["TERMINATE"].extend(data["TERMINATE"])
+                extend("TERMINATE", data["TERMINATE"])
             if "RENAME" in data:
-                merged["RENAME"].extend(data["RENAME"])
+                extend("RENAME", data["RENAME"])
 
         except json.JSONDecodeError:
             print("Warning: Skipped invalid JSON chunk") 
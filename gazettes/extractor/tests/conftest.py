@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# The extractor modules are run from this directory rather than installed.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+class WordCounter:
+    """Counts one token per word, so chunk sizes in tests can be read off the text."""
+
+    encoding = None
+
+    def count(self, text):
+        return len(text.split())
+
+    def tail(self, text, tokens):
+        return " ".join(text.split()[-tokens:]) if tokens > 0 else ""
+
+
+@pytest.fixture
+def word_counter(monkeypatch):
+    counter = WordCounter()
+    monkeypatch.setattr("loaders.pdf_loader.get_token_counter", lambda model=None: counter)
+    return counter
@@ -0,0 +1,114 @@
+import json
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from extractors.amendment_rule_parser import parse_amendment_text
+from extractors.ministry_amendment_extractor import MinistryAmendmentExtractor
+from extractors.page_runner import PageRunner
+
+HEADER = "GAZETTE EXTRAORDINARY OF THE DEMOCRATIC SOCIALIST REPUBLIC OF SRI LANKA"
+# Clause (d) continues on the second page, after its running header.
+PAGES = [
+    f"""{HEADER}
+2A
+The President has amended the Schedule to the Order published in the Gazette.
+SCHEDULE
+(1) With reference to the Heading, “No. 06. Minister of Investment Promotion” of the said notification, as follows:-
+(a) In Column I thereof, by omitting items 7, 9 and 11 to 12;
+(b) In Column I thereof, re-numbering of items 8 to 13 respectively, as numbers 7 to 12;
+(c) In Column II thereof, by insertion of the following items immediately after item 4;
+5. Sri Lanka Export
+Development Board
+6. Board of Investment
+PRINTED AT THE DEPARTMENT OF GOVERNMENT PRINTING, SRI LANKA.
+""",
+    f"""{HEADER}
+3A
+(d) In Column III thereof, by omitting the following items;
+• Citizenship Act, No. 18 of 1948
+• Immigrants and Emigrants Act
+(2) With reference to the Heading, “No. 12. Minister of Health” of the said notification, as follows:-
+(a) In Column II thereof, by the insertion of the following items after the item “Medical Research Institute”;
+• National Hospital
+(b) In Column I thereof, by substituting the following for item 3;
+3. Public health services
+""",
+]
+INVESTMENT = "Minister of Investment Promotion"
+SUBSTITUTION = ("(2) With reference to the Heading, “No. 12. Minister of Health” of the said notification, "
+                "as follows:-\n"
+                "(b) In Column I thereof, by substituting the following for item 3;\n"
+                "3. Public health services")
+
+
+def test_template_clauses_are_parsed():
+    changes, unparsed, stats = parse_amendment_text(PAGES)
+
+    assert changes == [
+        {"ministry_name": INVESTMENT, "change_type": "OMIT", "affected_column": "I",
+         "details": ["Omitted: item 7", "Omitted: item 9", "Omitted: item 11", "Omitted: item 12"]},
+        {"ministry_name": INVESTMENT, "change_type": "RENUMBER", "affected_column": "I",
+         "details": ["Renumbered: items 8 to 13 as 7 to 12"]},
+        {"ministry_name": INVESTMENT, "change_type": "ADD", "affected_column": "II",
+         "details": ["Inserted: item 5 — Sri Lanka Export Development Board",
+                     "Inserted: item 6 — Board of Investment"]},
+        {"ministry_name": INVESTMENT, "change_type": "OMIT", "affected_column": "III",
+         "details": ["Omitted: Citizenship Act, No. 18 of 1948", "Omitted: Immigrants and Emigrants Act"]},
+        {"ministry_name": "Minister of Health", "change_type": "ADD", "affected_column": "II",
+         "details": ["after: Medical Research Institute", "Inserted: National Hospital"]},
+    ]
+    # The substitution has no rule: it is returned with its heading, on the page it came from.
+    assert unparsed == [(SUBSTITUTION, 2)]
+    assert stats == {"clauses": 6, "parsed": 5}
+
+
+def test_partial_list_clause_is_left_for_the_llm():
+    text = ("SCHEDULE\n(1) With reference to the Heading, “No. 03. Minister of Finance” of the said notification, "
+            "as follows:-\n(a) In Column II thereof, by omitting the following items;\n"
+            "Department of Census and Statistics\n• Department of Valuation\n")
+    changes, unparsed, stats = parse_amendment_text([text])
+
+    assert changes == []
+    assert [page for _, page in unparsed] == [1]
+    assert "Department of Census and Statistics" in unparsed[0][0]
+    assert stats == {"clauses": 1, "parsed": 0}
+
+
+def test_pages_without_the_template_are_all_left_for_the_llm():
+    pages = ["Ministers appointed under Article 44.", "", "Hon. A. B. Perera, Minister of Health."]
+    assert parse_amendment_text(pages) == ([], [(pages[0], 1), (pages[2], 3)], {"clauses": 0, "parsed": 0})
+
+
+class _PromptLog(BaseCallbackHandler):
+    def __init__(self):
+        self.prompts = []
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.prompts.append(messages[0][-1].content)
+
+
+def test_extractor_sends_only_unparsed_clauses_to_the_llm(word_counter):
+    llm_change = {"ministry_name": "Minister of Health", "change_type": "UPDATE", "affected_column": "I",
+                  "details": ["Substituted: item 3 — Public health services"]}
+    log = _PromptLog()
+    llm = FakeListChatModel(responses=[json.dumps([llm_change])], callbacks=[log])
+    extractor = MinistryAmendmentExtractor(runner=PageRunner(max_concurrency=2), llm=llm)
+
+    result = extractor.extract([Document(page_content=text, metadata={"page": idx}) for idx, text in enumerate(PAGES)])
+
+    assert result[0] == parse_amendment_text(PAGES)[0]
+    assert result[1:] == [[llm_change]]
+    assert len(log.prompts) == 1
+    assert SUBSTITUTION in log.prompts[0]
+    assert "Citizenship Act" not in log.prompts[0]
+
+
+def test_extractor_without_rules_sends_every_page(word_counter):
+    log = _PromptLog()
+    llm = FakeListChatModel(responses=["[]"], callbacks=[log])
+    extractor = MinistryAmendmentExtractor(runner=PageRunner(max_concurrency=2), llm=llm, use_rules=False)
+
+    assert extractor.extract([Document(page_content="(1) Omit item 3.", metadata={"page": 0})]) == [[]]
+    assert len(log.prompts) == 1
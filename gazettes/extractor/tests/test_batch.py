@@ -0,0 +1,63 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import batch
+
+
+def _fake_process_pdf(gazette_type, pdf_path, output_path, name, options):
+    # Named the way run_pipeline names its output.
+    output_file = Path(output_path) / f"{gazette_type}-{name}.json"
+    output_file.write_text(json.dumps({"type": gazette_type, "pdf": pdf_path}))
+    return {
+        "output": str(output_file),
+        "tokens": {"prompt": 1, "completion": 1, "total": 2},
+        "requests": 1,
+        "cost_usd": 0.0,
+        "duration_s": 0.0,
+    }
+
+
+def test_run_batch_tracks_each_gazette_type_separately(tmp_path, monkeypatch):
+    # Threads instead of processes, so the stub replaces the real pipeline in the workers.
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(batch, "_process_pdf", _fake_process_pdf)
+    pdfs = tmp_path / "pdfs"
+    pdfs.mkdir()
+    for name in ("a", "b"):
+        (pdfs / f"{name}.pdf").write_bytes(f"%PDF {name}".encode())
+    output = tmp_path / "out"
+
+    assert batch.run_batch("persons", str(pdfs), str(output), workers=2)["processed"] == 2
+    report = batch.run_batch("ministry-initial", str(pdfs), str(output), workers=2)
+    assert (report["processed"], report["skipped"]) == (2, 0)
+    assert (output / f"ministry-initial-a-{batch.file_hash(pdfs / 'a.pdf')[:12]}.json").exists()
+
+    # Re-running either type now skips every PDF.
+    assert batch.run_batch("persons", str(pdfs), str(output), workers=2)["skipped"] == 2
+    manifest = batch.load_manifest(output / batch.MANIFEST_NAME)
+    assert sorted(entry["gazette_type"] for entry in manifest.values()) == [
+        "ministry-initial", "ministry-initial", "persons", "persons",
+    ]
+
+
+def test_run_batch_gives_same_named_pdfs_their_own_outputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(batch, "_process_pdf", _fake_process_pdf)
+    pdfs = tmp_path / "pdfs"
+    # The same name in two folders, and dotted names that share their first part.
+    paths = [pdfs / "x" / "2021.07.01.pdf", pdfs / "y" / "2021.07.01.pdf", pdfs / "2021.09.15.pdf"]
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(f"%PDF {path.relative_to(pdfs)}".encode())
+    output = tmp_path / "out"
+
+    assert batch.run_batch("persons", str(pdfs), str(output), workers=3)["processed"] == 3
+
+    manifest = batch.load_manifest(output / batch.MANIFEST_NAME)
+    outputs = {entry["pdf"]: entry["output"] for entry in manifest.values()}
+    assert sorted(outputs) == sorted(str(path) for path in paths)
+    assert len(set(outputs.values())) == 3
+    for pdf, output_file in outputs.items():
+        assert json.loads(Path(output_file).read_text())["pdf"] == pdf
+        assert Path(output_file).name.startswith(f"persons-{Path(pdf).stem}-")
@@ -0,0 +1,101 @@
+import inspect
+
+import pytest
+from langchain_core.documents import Document
+
+from loaders import pdf_loader
+from loaders.pdf_loader import PDFLoader, _split_text, chunk_documents, iter_chunks
+
+MINISTRIES = ("No. 1. Minister of Finance 1. Budget 2. Treasury 3. Customs "
+              "No. 2. Minister of Health 1. Hospitals 2. Medical supplies 3. Nursing schools")
+
+
+def _pages(*texts):
+    return [Document(page_content=text, metadata={"source": "gazette.pdf", "page": idx})
+            for idx, text in enumerate(texts)]
+
+
+def test_small_pages_are_packed_up_to_the_budget(word_counter):
+    chunks = chunk_documents(_pages("a b c", "d e f", "", "g h i", "j k l", "m n o"), token_budget=10)
+
+    # Each page costs its words plus one for the joining newline.
+    assert [chunk.page_content for chunk in chunks] == ["a b c\nd e f", "g h i\nj k l", "m n o"]
+    assert [chunk.metadata for chunk in chunks] == [
+        {"source": "gazette.pdf", "page": 0, "pages": [1, 2], "overlap": False},
+        {"source": "gazette.pdf", "page": 3, "pages": [4, 5], "overlap": False},
+        {"source": "gazette.pdf", "page": 5, "pages": [6], "overlap": False},
+    ]
+
+
+def test_split_prefers_the_coarsest_boundary(word_counter):
+    assert _split_text(MINISTRIES, 13, word_counter) == [
+        "No. 1. Minister of Finance 1. Budget 2. Treasury 3. Customs ",
+        "No. 2. Minister of Health 1. Hospitals 2. Medical supplies 3. Nursing schools",
+    ]
+    # A ministry over the budget falls back to its numbered items.
+    assert _split_text(MINISTRIES, 8, word_counter) == [
+        "No. 1. Minister of Finance 1. Budget ", "2. Treasury 3. Customs ",
+        "No. 2. Minister of Health 1. Hospitals ", "2. Medical supplies 3. Nursing schools",
+    ]
+    # Text without any boundary is cut between words.
+    assert _split_text("one two three four five", 2, word_counter) == ["one two", "three four", "five"]
+
+
+def test_oversize_pages_are_split_with_overlap(word_counter):
+    words = [f"w{i}" for i in range(30)]
+    chunks = chunk_documents(_pages("x y", " ".join(words), "z"), token_budget=12, overlap_tokens=2)
+
+    # Parts hold budget - overlap words, and each later part repeats the last two words of the one before.
+    assert [chunk.page_content.split() for chunk in chunks] == [
+        ["x", "y"], words[:10], words[8:20], words[18:30], ["z"],
+    ]
+    assert [chunk.metadata["pages"] for chunk in chunks] == [[1], [2], [2], [2], [3]]
+    assert [chunk.metadata["page"] for chunk in chunks] == [0, 1, 1, 1, 2]
+    assert [chunk.metadata["overlap"] for chunk in chunks] == [False, False, True, True, False]
+
+
+def test_overlap_is_capped_at_a_quarter_of_the_budget(word_counter):
+    chunks = chunk_documents(_pages(" ".join(f"w{i}" for i in range(20))), token_budget=8, overlap_tokens=10)
+
+    assert [chunk.page_content for chunk in chunks] == [
+        "w0 w1 w2 w3 w4 w5", "w4 w5 w6 w7 w8 w9 w10 w11", "w10 w11 w12 w13 w14 w15 w16 w17", "w16 w17 w18 w19",
+    ]
+
+
+def test_chunks_are_yielded_before_the_pages_run_out(word_counter):
+    consumed = []
+
+    def pages():
+        for idx in range(100):
+            consumed.append(idx)
+            yield Document(page_content=f"page {idx} text", metadata={"page": idx})
+
+    first = next(iter_chunks(pages(), token_budget=8))
+    assert first.metadata["pages"] == [1, 2]
+    assert consumed == [0, 1, 2]
+
+
+def test_loader_chunks_pages_as_it_parses_them(word_counter, tmp_path, monkeypatch):
+    pymupdf = pytest.importorskip("pymupdf")
+    path = tmp_path / "gazette.pdf"
+    with pymupdf.open() as doc:
+        for idx in range(3):
+            doc.new_page().insert_text((72, 72), f"Minister of\nFinance {idx}")
+        doc.save(path)
+
+    received = []
+    chunk = pdf_loader.chunk_documents
+    monkeypatch.setattr(pdf_loader, "chunk_documents", lambda documents, **kwargs: (
+        received.append(inspect.isgenerator(documents)), chunk(documents, **kwargs))[1])
+
+    with PDFLoader(path) as loader:
+        chunks = loader.loadChunks(token_budget=10)
+        pages = loader.loadAmendmentPages()
+
+    # Pages reach the chunker as a generator; only the chunks are listed.
+    assert received == [True]
+    assert [c.page_content for c in chunks] == ["Minister of Finance 0\nMinister of Finance 1", "Minister of Finance 2"]
+    assert [c.metadata["pages"] for c in chunks] == [[1, 2], [3]]
+    assert [p.page_content.split() for p in pages] == [["Minister", "of", "Finance", str(idx)] for idx in range(3)]
+    assert "\n" in pages[0].page_content
+    assert pages[2].metadata == {"source": str(path), "file_path": str(path), "page": 2, "total_pages": 3}
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from langchain.prompts import PromptTemplate
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+from langchain_core.output_parsers import StrOutputParser
+
+from extractors.local_llm import FixtureRecorder, FixtureStore, LocalChatModel, messages_key
+from prompts import ministry_amendment_prompts, ministry_prompts, person_prompts
+
+AMENDMENT_TEXT = """SCHEDULE
+(1) With reference to the Heading, "No. 06. Minister of Investment Promotion" of the said notification, as follows:-
+(a) In Column I thereof, by omitting item 7;
+"""
+MINISTRY_TEXT = """1. Minister of Finance
+2. State Minister of Rural Roads
+"""
+PERSON_TEXT = """Appointed on 2020.08.12:
+Hon. Dinesh Gunawardena, M.P., Minister of Foreign Affairs.
+"""
+
+
+def _run(llm, template, docs):
+    chain = PromptTemplate(input_variables=["docs"], template=template) | llm | StrOutputParser()
+    return chain.invoke({"docs": docs})
+
+
+def test_rules_answer_each_prompt_in_its_own_format(tmp_path):
+    llm = LocalChatModel(fixtures=FixtureStore(str(tmp_path / "none.jsonl")))
+
+    assert json.loads(_run(llm, ministry_amendment_prompts.INITIAL_PROMPT, AMENDMENT_TEXT)) == [{
+        "ministry_name": "Minister of Investment Promotion", "change_type": "OMIT", "affected_column": "I",
+        "details": ["Omitted: item 7"],
+    }]
+    assert json.loads(_run(llm, ministry_prompts.INITIAL_PROMPT, MINISTRY_TEXT))["ministers"] == [
+        {"name": name, "subjects_and_functions": [], "departments": [], "laws_and_ordinances": []}
+        for name in ("Minister of Finance", "State Minister of Rural Roads")
+    ]
+    assert json.loads(_run(llm, person_prompts.INITIAL_PROMPT, PERSON_TEXT)) == {
+        "ADD": [{"name": "Dinesh Gunawardena", "Ministry": "Foreign Affairs", "date": "2020-08-12",
+                 "position": "Minister"}],
+        "TERMINATE": [],
+        "RENAME": [],
+    }
+    assert llm.invoke("Unrelated prompt").content == ""
+
+
+def test_recorded_responses_are_replayed(tmp_path):
+    path = str(tmp_path / "fixtures.jsonl")
+    recorder = FakeListChatModel(responses=['{"ministers": []}'], callbacks=[FixtureRecorder(FixtureStore(path))])
+    assert _run(recorder, ministry_prompts.INITIAL_PROMPT, MINISTRY_TEXT) == '{"ministers": []}'
+
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    template = PromptTemplate(input_variables=["docs"], template=ministry_prompts.INITIAL_PROMPT)
+    prompt = template.format(docs=MINISTRY_TEXT)
+    assert records == [{"messages_sha256": messages_key([HumanMessage(prompt)]), "response": '{"ministers": []}'}]
+
+    # The recording wins over the rule that would otherwise answer this prompt.
+    llm = LocalChatModel(fixtures=FixtureStore(path))
+    assert _run(llm, ministry_prompts.INITIAL_PROMPT, MINISTRY_TEXT) == '{"ministers": []}'
+    assert json.loads(_run(llm, ministry_prompts.INITIAL_PROMPT, "1. Minister of Health"))["ministers"]
+
+
+def test_latency_is_seeded_per_call_and_validated(tmp_path):
+    fixtures = FixtureStore(str(tmp_path / "none.jsonl"))
+    llm = LocalChatModel(fixtures=fixtures, latency="uniform:0.2,1.5")
+    delays = [llm._delay(key) for key in ("a", "b", "c")]
+
+    assert all(0.2 <= delay <= 1.5 for delay in delays)
+    assert delays == [LocalChatModel(fixtures=fixtures, latency="uniform:0.2,1.5")._delay(key) for key in "abc"]
+    assert delays != [LocalChatModel(fixtures=fixtures, latency="uniform:0.2,1.5", seed=1)._delay(key)
+                      for key in "abc"]
+    assert LocalChatModel(fixtures=fixtures, latency="fixed:0.5")._delay("a") == 0.5
+
+    with pytest.raises(ValueError, match="Unsupported latency distribution"):
+        LocalChatModel(fixtures=fixtures, latency="poisson:1")
+
+
+def test_usage_metadata_is_reported(tmp_path):
+    message = LocalChatModel(fixtures=FixtureStore(str(tmp_path / "none.jsonl"))).invoke("x" * 40)
+    assert message.usage_metadata == {"input_tokens": 10, "output_tokens": 0, "total_tokens": 10}
@@ -0,0 +1,116 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from extractors import page_runner
+from extractors.page_runner import PageRunner, RateLimiter, get_rate_limiter
+
+_real_sleep = asyncio.sleep
+
+
+class _ServerError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _FakeChain:
+    """Answers each page after a random delay, failing the first calls for a page with the queued errors."""
+
+    def __init__(self, errors=None, seed=0):
+        self.errors = {page: list(queued) for page, queued in (errors or {}).items()}
+        self.rng = random.Random(seed)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, page_input):
+        page = page_input["docs"]
+        self.calls.append(page)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await _real_sleep(self.rng.uniform(0, 0.01))
+            if self.errors.get(page):
+                raise self.errors[page].pop(0)
+            return f"result {page}"
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records the runner's backoff and rate-limit waits instead of waiting them out."""
+    recorded = []
+
+    async def sleep(delay):
+        recorded.append(delay)
+        await _real_sleep(0)
+
+    monkeypatch.setattr(page_runner.asyncio, "sleep", sleep)
+    monkeypatch.setattr(page_runner.random, "uniform", lambda low, high: high)
+    return recorded
+
+
+def test_results_keep_input_order_under_concurrency():
+    chain = _FakeChain()
+    runner = PageRunner(max_concurrency=3, requests_per_minute=None)
+
+    results = runner.run(chain, [{"docs": page} for page in range(20)])
+
+    assert results == [f"result {page}" for page in range(20)]
+    assert chain.max_in_flight == 3
+
+
+def test_retryable_errors_are_retried_with_backoff(sleeps):
+    chain = _FakeChain(errors={1: [_ServerError(429), _ServerError(503), _ServerError(500)]})
+    runner = PageRunner(max_concurrency=2, requests_per_minute=None, base_delay=1.0, max_delay=3.0)
+
+    assert runner.run(chain, [{"docs": 0}, {"docs": 1}]) == ["result 0", "result 1"]
+    assert chain.calls.count(1) == 4
+    # Doubling from base_delay, capped at max_delay (jitter pinned to its upper bound).
+    assert sleeps == [1.0, 2.0, 3.0]
+
+
+def test_retries_give_up_after_max_retries(sleeps):
+    chain = _FakeChain(errors={0: [_ServerError(502)] * 5})
+    runner = PageRunner(max_concurrency=1, requests_per_minute=None, max_retries=2)
+
+    [result] = runner.run(chain, [{"docs": 0}])
+
+    assert isinstance(result, _ServerError)
+    assert chain.calls == [0, 0, 0]
+
+
+def test_other_errors_are_raised_immediately(sleeps):
+    chain = _FakeChain(errors={0: [ValueError("bad prompt")], 1: [_ServerError(400)]})
+    runner = PageRunner(max_concurrency=2, requests_per_minute=None)
+
+    results = runner.run(chain, [{"docs": page} for page in range(3)])
+
+    assert [type(result) for result in results] == [ValueError, _ServerError, str]
+    assert sorted(chain.calls) == [0, 1, 2]
+    assert sleeps == []
+
+
+def test_rate_limiter_spaces_request_starts(monkeypatch):
+    monkeypatch.setattr(page_runner, "time", SimpleNamespace(monotonic=lambda: 100.0))
+    limiter = RateLimiter(requests_per_minute=120)
+
+    assert [limiter.reserve() for _ in range(4)] == [0.0, 0.5, 1.0, 1.5]
+
+
+def test_runners_share_one_rate_limiter_per_provider(sleeps, monkeypatch):
+    monkeypatch.setattr(page_runner, "time", SimpleNamespace(monotonic=lambda: 200.0))
+    first = PageRunner(requests_per_minute=6000, provider="test-shared")
+    second = PageRunner(requests_per_minute=6000, provider="test-shared")
+
+    assert first.rate_limiter is second.rate_limiter
+    assert get_rate_limiter("test-other", 6000) is not first.rate_limiter
+    assert get_rate_limiter("test-shared", None) is None
+
+    first.run(_FakeChain(), [{"docs": page} for page in range(3)])
+    second.run(_FakeChain(), [{"docs": 3}])
+    assert sleeps == pytest.approx([0.01, 0.02, 0.03])
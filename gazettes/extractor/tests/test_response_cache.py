@@ -0,0 +1,83 @@
+import itertools
+from types import SimpleNamespace
+
+from langchain.prompts import PromptTemplate
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+
+from extractors import response_cache
+from extractors.base_extractor import BaseExtractor
+from extractors.page_runner import PageRunner
+from extractors.response_cache import ResponseCache, cache_key
+
+
+class _FakeChatModel(FakeListChatModel):
+    # Read by BaseExtractor.run_pages to key the cache, as on ChatOpenAI.
+    model_name: str = "fake"
+    temperature: float = 0
+
+
+class _Extractor(BaseExtractor):
+    def extract(self, documents):
+        chain = PromptTemplate(input_variables=["docs"], template="Extract: {docs}") | self.llm | StrOutputParser()
+        return self.run_pages(chain, documents)
+
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    cache.put_many({"a": "response a"})
+
+    assert cache.get_many(["a", "b", "a"]) == {"a": "response a"}
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.stats() == "LLM cache: 2 hit(s), 1 miss(es) (67% hit rate)"
+    cache.close()
+
+    # Entries outlive the connection.
+    assert ResponseCache(tmp_path / "cache.sqlite").get_many(["a"]) == {"a": "response a"}
+
+
+def test_keys_change_with_page_text_prompt_and_model():
+    key = cache_key("gpt-3.5-turbo", 0, "Extract: {docs}", "page one")
+
+    assert key == cache_key("gpt-3.5-turbo", 0, "Extract: {docs}", "page one")
+    assert len({key, cache_key("gpt-3.5-turbo", 0, "Extract: {docs}", "page two"),
+                cache_key("gpt-3.5-turbo", 0, "Summarise: {docs}", "page one"),
+                cache_key("gpt-4o", 0, "Extract: {docs}", "page one"),
+                cache_key("gpt-3.5-turbo", 0.5, "Extract: {docs}", "page one")}) == 5
+
+
+def test_extractor_only_sends_pages_it_has_not_seen(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    pages = [Document(page_content=text, metadata={"page": idx}) for idx, text in enumerate(["one", "two"])]
+
+    first = _Extractor(PageRunner(max_concurrency=1), cache, _FakeChatModel(responses=["A", "B"]))
+    assert first.extract(pages) == [(0, "A"), (1, "B")]
+
+    # The unchanged page comes from the cache; only the edited one reaches the LLM.
+    llm = _FakeChatModel(responses=["C", "D"])
+    second = _Extractor(PageRunner(max_concurrency=1), cache, llm)
+    pages[1] = Document(page_content="two, amended", metadata={"page": 1})
+    assert second.extract(pages) == [(0, "A"), (1, "C")]
+    assert llm.i == 1
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(time=lambda: next(clock)))
+    # Room for three 30-byte responses.
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_mb=100 / 1024 / 1024)
+
+    for key in "abc":
+        cache.put_many({key: key * 30})
+    cache.get_many(["a"])
+    cache.put_many({"d": "d" * 30})
+    assert _stored(cache) == {"a", "c", "d"}
+
+    cache.put_many({"e": "e" * 60})
+    assert _stored(cache) == {"d", "e"}
+
+
+def _stored(cache):
+    return {key for key, in cache.conn.execute("SELECT key FROM responses")}
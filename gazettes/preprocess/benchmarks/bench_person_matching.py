@@ -0,0 +1,111 @@
+"""
+Benchmark fuzzy ministry matching for a full cabinet reshuffle gazette.
+
+Compares the previous per-pair matching loop (clean + token_sort_ratio for
+every portfolio on every call) against MinistryMatcher. That both return the
+same suggestions is tested in tests/test_person_matching.py.
+
+Usage (from gazettes/preprocess):
+    python -m benchmarks.bench_person_matching [--ministers 60] [--repeat 3]
+"""
+import argparse
+import random
+import re
+import time
+
+from nltk.stem import PorterStemmer
+from rapidfuzz import fuzz
+
+from gztprocessor.gazette_processors.person_gazette_processor import MinistryMatcher, clean_ministry_name
+
+SUBJECTS = [
+    "Finance", "Economic Stabilization", "National Policies", "Defence", "Health", "Indigenous Medicine",
+    "Education", "Higher Education", "Justice", "Prison Affairs", "Constitutional Reforms", "Foreign Affairs",
+    "Public Security", "Transport", "Highways", "Mass Media", "Agriculture", "Wildlife", "Forest Conservation",
+    "Trade", "Commerce", "Food Security", "Irrigation", "Water Supply", "Power", "Energy", "Tourism", "Lands",
+    "Fisheries", "Labour", "Foreign Employment", "Ports", "Shipping", "Aviation", "Urban Development", "Housing",
+    "Plantation Industries", "Industries", "Technology", "Science", "Research", "Sports", "Youth Affairs",
+    "Women", "Child Affairs", "Social Empowerment", "Buddhasasana", "Religious Affairs", "Cultural Affairs",
+    "Public Administration", "Home Affairs", "Provincial Councils", "Local Government", "Environment",
+    "Disaster Management", "Skills Development", "Vocational Training", "Digital Infrastructure",
+]
+POSITIONS = ["Minister", "State Minister", "Deputy Minister"]
+
+_legacy_stemmer = PorterStemmer()
+
+
+def legacy_clean_ministry_name(name: str) -> str:
+    stopwords = {"ministry", "of", "and", "for", "&", "the"}
+    words = re.findall(r"\b\w+\b", name.lower())
+    return " ".join(_legacy_stemmer.stem(word) for word in words if word not in stopwords)
+
+
+def legacy_match(ministry_name: str, db_ministries: list[tuple], threshold=70) -> list[dict]:
+    """The matching loop as it ran before, once per incoming ministry."""
+    matches = []
+    cleaned_target = legacy_clean_ministry_name(ministry_name)
+    target_tokens = set(cleaned_target.split())
+    for db_name, db_position, db_person in db_ministries:
+        cleaned_db_name = legacy_clean_ministry_name(db_name)
+        db_tokens = set(cleaned_db_name.split())
+        score = fuzz.token_sort_ratio(cleaned_target, cleaned_db_name)
+        if score >= threshold or len(target_tokens & db_tokens) >= 1:
+            matches.append(
+                {
+                    "existing_ministry": db_name,
+                    "existing_position": db_position,
+                    "existing_person": db_person,
+                    "score": score,
+                }
+            )
+    return sorted(matches, key=lambda x: x["score"], reverse=True)
+
+
+def build_cabinet(rng: random.Random, ministers: int) -> list[tuple]:
+    rows = []
+    for i in range(ministers):
+        subjects = rng.sample(SUBJECTS, rng.randint(1, 3))
+        ministry = "Ministry of " + (", ".join(subjects[:-1]) + " and " + subjects[-1] if len(subjects) > 1 else subjects[0])
+        for position in POSITIONS:
+            rows.append((ministry, position, f"Hon. Member {i}-{position}"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ministers", type=int, default=60, help="Cabinet ministries per state")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    previous_state = build_cabinet(rng, args.ministers)
+    # Full reshuffle: every portfolio is re-gazetted under a recombined ministry name.
+    incoming = [row[0] for row in build_cabinet(rng, args.ministers)]
+    print(f"Previous state: {len(previous_state)} portfolios, incoming gazette: {len(incoming)} ADDs")
+
+    legacy_times, cold_times, warm_times = [], [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for name in incoming:
+            legacy_match(name, previous_state)
+        legacy_times.append(time.perf_counter() - start)
+
+        clean_ministry_name.cache_clear()
+        start = time.perf_counter()
+        matcher = MinistryMatcher(previous_state)
+        matcher.match_many(incoming)
+        cold_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        matcher.match_many(incoming)
+        warm_times.append(time.perf_counter() - start)
+
+    legacy_best, cold_best, warm_best = min(legacy_times), min(cold_times), min(warm_times)
+    print(f"legacy per-pair loop : {legacy_best * 1000:8.1f} ms")
+    print(f"matcher (cold build) : {cold_best * 1000:8.1f} ms  ({legacy_best / cold_best:.1f}x)")
+    print(f"matcher (cached)     : {warm_best * 1000:8.1f} ms  ({legacy_best / warm_best:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
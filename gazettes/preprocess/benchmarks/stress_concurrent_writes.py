@@ -0,0 +1,135 @@
+"""
+Concurrency stress test for the FastAPI app's write path.
+
+Runs against throwaway databases in a temp directory (GZTP_DATA_DIR /
+GZTP_STATE_DIR), so it never touches real state. Checks that:
+
+1. Concurrent amendment POSTs prepared against the same X-State-Version
+   produce exactly one success; the rest get 409 Conflict.
+2. Unconditional person POSTs for many gazettes, interleaved with readers,
+   all succeed and leave a version history that matches a serial replay.
+
+Usage (from gazettes/preprocess):
+    python -m benchmarks.stress_concurrent_writes [--writers 16] [--readers 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--gazettes", type=int, default=40, help="Person gazettes written concurrently")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="gztp-stress-"))
+    os.environ["GZTP_DATA_DIR"] = str(workdir)
+    os.environ["GZTP_STATE_DIR"] = str(workdir / "state")
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    from fastapi.testclient import TestClient
+    from gztprocessor.db_connections import db_gov, db_person, db_trans
+    from gztprocessor.state_managers.person_state_manager import PersonStateManager
+    import main as app_main
+
+    db_gov.init_db()
+    db_person.init_db()
+    db_trans.init_db()
+    os.chdir(workdir)  # CSV output is written relative to the working directory
+    client = TestClient(app_main.app)
+
+    # --- 1. optimistic version check on conflicting amendment writes -------
+    initial = client.get("/mindep/initial/2022-07-22/2289-43").json()
+    assert client.post("/mindep/initial/2022-07-22/2289-43", json=initial).status_code == 200
+
+    preview = client.get("/mindep/amendment/2022-09-16/2297-78")
+    base_version = int(preview.headers["X-State-Version"])
+    statuses = []
+    barrier = threading.Barrier(args.writers)
+
+    def conflicting_writer():
+        barrier.wait()
+        r = client.post(
+            "/mindep/amendment/2022-09-16/2297-78",
+            json=preview.json(),
+            headers={"X-Expected-Version": str(base_version)},
+        )
+        statuses.append(r.status_code)
+
+    threads = [threading.Thread(target=conflicting_writer) for _ in range(args.writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"conflicting writers: {statuses.count(200)} ok, {statuses.count(409)} conflict")
+    assert statuses.count(200) == 1 and statuses.count(409) == args.writers - 1, statuses
+
+    # --- 2. many unconditional writers interleaved with readers ------------
+    payloads = [
+        (
+            f"9{i:03d}-01",
+            "2023-01-01",
+            {"transactions": {"adds": [
+                {"new_person": f"Hon. Member {i}", "new_ministry": f"Ministry of Subject {i}",
+                 "new_position": "Minister", "date": "2023-01-01"},
+            ]}},
+        )
+        for i in range(args.gazettes)
+    ]
+    errors = []
+    stop = threading.Event()
+    reads = [0]
+
+    def reader():
+        while not stop.is_set():
+            r = client.get("/person/state/latest")
+            if r.status_code != 200:
+                errors.append(("read", r.status_code))
+            reads[0] += 1
+
+    def writer(gazette_number, date, payload):
+        r = client.post(f"/person/{date}/{gazette_number}", json=payload)
+        if r.status_code != 200:
+            errors.append(("write", gazette_number, r.status_code, r.text))
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    writer_threads = [threading.Thread(target=writer, args=p) for p in payloads]
+    start = time.perf_counter()
+    for t in reader_threads + writer_threads:
+        t.start()
+    for t in writer_threads:
+        t.join()
+    stop.set()
+    for t in reader_threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    assert not errors, errors[:5]
+
+    # Writes are serialized, so every gazette is a complete, self-consistent state:
+    # it holds exactly its own ADD plus whatever earlier-numbered gazettes already held.
+    manager = PersonStateManager()
+    manager.flush_snapshots()
+    for gazette_number, date, _ in payloads:
+        state = manager.load_state(gazette_number, date)
+        names = {p["person_name"] for p in state["persons"]}
+        own = f"Hon. Member {int(gazette_number[1:4])}"
+        assert own in names, (gazette_number, names)
+        assert all(len(p["portfolios"]) == 1 for p in state["persons"]), state
+
+    with db_person.get_connection() as conn:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    print(
+        f"{len(payloads)} concurrent person writes + {reads[0]} reads in {elapsed:.2f}s, "
+        f"final version {manager.get_state_version()}"
+    )
+    print(f"OK (scratch data in {workdir})")
+
+
+if __name__ == "__main__":
+    main()
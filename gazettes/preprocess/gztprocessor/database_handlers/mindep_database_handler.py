@@ -1,13 +1,15 @@
-from gztprocessor.db_connections.db_gov import get_connection
+from gztprocessor.db_connections.db_gov import store
 from collections import defaultdict
 from gztprocessor.state_managers.mindep_state_manager import MindepStateManager
 
 mindep_state_manager = MindepStateManager()
 
-def load_initial_state_to_db(gazette_number: str, date_str: str, ministries: list[dict]):
-    with get_connection() as conn:
-        cur = conn.cursor()
-
+def load_initial_state_to_db(gazette_number: str, date_str: str, ministries: list[dict], expected_version: int | None = None):
+    """
+    Replace the state for this gazette with the given ministries.
+    Raises StateVersionConflict if expected_version is given and the DB has changed since.
+    """
+    def replace_state(cur):
         # 1. Delete all ministries and departments for the incoming gazette_number and date_str
         cur.execute("SELECT id FROM ministry WHERE gazette_number = ? AND date = ?", (gazette_number, date_str))
         ministry_ids = [r[0] for r in cur.fetchall()]
@@ -31,13 +33,16 @@ def load_initial_state_to_db(gazette_number: str, date_str: str, ministries: lis
                 )
                 position += 1
 
-        conn.commit()
-
+    store.write(replace_state, expected_version)
     mindep_state_manager.export_state_snapshot(gazette_number, date_str)
     print(f"Initial state replaced for gazette {gazette_number} on {date_str}.")
 
 
-def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: dict):
+def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: dict, expected_version: int | None = None):
+    """
+    Apply transactions on top of the latest state and store the result under this gazette.
+    Raises StateVersionConflict if expected_version is given and the DB has changed since.
+    """
     if isinstance(transactions, dict) and "transactions" in transactions:
         transactions = transactions["transactions"]
     if isinstance(transactions, dict):
@@ -59,9 +64,7 @@ def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: d
         )
     ]
 
-    with get_connection() as conn:
-        cur = conn.cursor()
-
+    def apply_to_latest_state(cur) -> bool:
         # 1. Get the latest gazette_number and date in the DB
         cur.execute("SELECT gazette_number, date FROM ministry ORDER BY date DESC, gazette_number DESC LIMIT 1")
         row = cur.fetchone()
@@ -69,7 +72,7 @@ def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: d
             latest_gazette, latest_date = row
         else:
             # No data yet, return
-            return
+            return False
 
         # 2. Load the latest state into memory
         ministry_depts = defaultdict(list)
@@ -145,9 +148,11 @@ def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: d
                     "INSERT INTO department (name, ministry_id, position, gazette_number, date) VALUES (?, ?, ?, ?, ?)",
                     (dept_name, ministry_id, idx, gazette_number, date_str)
                 )
+        return True
 
-        conn.commit()
-        print("DB updated with new positions (versioned, no deletes)")
+    if not store.write(apply_to_latest_state, expected_version):
+        return
+    print("DB updated with new positions (versioned, no deletes)")
 
     mindep_state_manager.export_state_snapshot(gazette_number, date_str)
     print(f"Exported state snapshot for {date_str}")
@@ -1,15 +1,17 @@
 # database_handlers/person_database_handler.py
-from gztprocessor.db_connections.db_person import get_connection
+from gztprocessor.db_connections.db_person import store
 from gztprocessor.state_managers.person_state_manager import PersonStateManager
 
 person_state_manager = PersonStateManager()
 
-def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: dict):
+def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: dict, expected_version: int | None = None):
+    """
+    Apply transactions on top of the previous state and store the result under this gazette.
+    Raises StateVersionConflict if expected_version is given and the DB has changed since.
+    """
     txs = transactions.get("transactions", transactions)
 
-    with get_connection() as conn:
-        cur = conn.cursor()
-
+    def apply_to_previous_state(cur):
         print(f" Applying transactions for gazette {gazette_number} on {date_str}")
 
         # 1. Remove any existing records for this gazette_number/date
@@ -103,9 +105,9 @@ def apply_transactions_to_db(gazette_number: str, date_str: str, transactions: d
                     (pf["name"], pf["position"], person_id, gazette_number, date_str)
                 )
 
-        conn.commit()
-        print(f"Person-portfolio DB updated for {gazette_number} on {date_str}")
+    store.write(apply_to_previous_state, expected_version)
+    print(f"Person-portfolio DB updated for {gazette_number} on {date_str}")
 
-        # Save snapshot
-        person_state_manager.export_state_snapshot(gazette_number, date_str)
+    # Save snapshot
+    person_state_manager.export_state_snapshot(gazette_number, date_str)
 
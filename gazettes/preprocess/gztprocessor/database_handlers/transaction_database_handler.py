@@ -1,9 +1,8 @@
 import json
-from gztprocessor.db_connections.db_trans import get_connection 
+from gztprocessor.db_connections.db_trans import get_connection, store
 
 def create_record(gazette_number: str, gazette_type: str, gazette_format: str, gazette_date: str):
-    with get_connection() as conn:
-        cur = conn.cursor()
+    def insert_if_missing(cur):
         cur.execute(
             """
             INSERT INTO transactions (gazette_number, gazette_type, gazette_format, gazette_date)
@@ -14,7 +13,8 @@ def create_record(gazette_number: str, gazette_type: str, gazette_format: str, g
             """,
             (gazette_number, gazette_type, gazette_format, gazette_date, gazette_number)
         )
-        conn.commit()
+
+    store.write(insert_if_missing)
 
 
 
@@ -30,15 +30,15 @@ def get_gazette_info(gazette_number: str):
 
 
 def save_transactions(gazette_number: str, data_json: dict):
-    with get_connection() as conn:
-        cur = conn.cursor()
+    def update_transactions(cur):
         cur.execute(
             """
             UPDATE transactions SET transactions = ? WHERE gazette_number = ?
             """,
             (json.dumps(data_json), gazette_number)
         )
-        conn.commit()
+
+    store.write(update_transactions)
 
 def get_saved_transactions(gazette_number: str):
     with get_connection() as conn:
@@ -76,8 +76,7 @@ def set_warning(gazette_number: str, warning: bool):
     :param gazette_number: The gazette number to update
     :param warning: True to set warning, False to clear it
     """
-    with get_connection() as conn:
-        cur = conn.cursor()
+    def update_warning(cur):
         cur.execute(
             """
             UPDATE transactions
@@ -86,4 +85,5 @@ def set_warning(gazette_number: str, warning: bool):
             """,
             (1 if warning else 0, gazette_number)
         )
-        conn.commit()
+
+    store.write(update_warning)
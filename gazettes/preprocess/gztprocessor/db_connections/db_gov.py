@@ -1,14 +1,21 @@
+import os
 from pathlib import Path
-import sqlite3
+
+from gztprocessor.db_connections.storage import SQLiteStore
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-DB_PATH = BASE_DIR / "gov.db"
+DATA_DIR = Path(os.environ.get("GZTP_DATA_DIR", BASE_DIR))
+DB_PATH = DATA_DIR / "gov.db"
 SCHEMA_PATH = BASE_DIR / "schemas" / "mindep_schema.sql"
 
+store = SQLiteStore(DB_PATH, SCHEMA_PATH)
+
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    """
+    Borrow a pooled read-only connection; use as `with get_connection() as conn:`.
+    Writes go through `store.write`.
+    """
+    return store.reader()
 
 def init_db():
-    with get_connection() as conn:
-        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-            conn.executescript(f.read())
+    store.init_schema()
@@ -0,0 +1,126 @@
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable
+
+
+class StateVersionConflict(Exception):
+    """
+    Raised when a write was prepared against an older version of the database.
+    """
+
+    def __init__(self, expected_version: int, current_version: int):
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(
+            f"State changed since it was read: expected version {expected_version}, "
+            f"current version {current_version}."
+        )
+
+
+class SQLiteStore:
+    """
+    WAL-mode SQLite database with pooled readers and a single writer thread.
+
+    Readers borrow query-only connections from a small pool and never block
+    on writes. Every write is a callable run by one dedicated writer thread
+    inside BEGIN IMMEDIATE, so writes are serialized. Each committed write
+    bumps PRAGMA user_version, which clients can pass back as
+    `expected_version` to reject writes based on a stale read.
+    """
+
+    def __init__(self, db_path: Path, schema_path: Path, pool_size: int = 8, busy_timeout_ms: int = 5000):
+        self.db_path = db_path
+        self.schema_path = schema_path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    def connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        return conn
+
+    def init_schema(self):
+        conn = self.connect()
+        try:
+            with open(self.schema_path, "r", encoding="utf-8") as f:
+                conn.executescript(f.read())
+        finally:
+            conn.close()
+
+    @contextmanager
+    def reader(self):
+        """
+        Borrow a pooled, query-only connection.
+        """
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._reader_lock:
+                create = self._reader_count < self.pool_size
+                if create:
+                    self._reader_count += 1
+            if create:
+                conn = self.connect(check_same_thread=False)
+                conn.execute("PRAGMA query_only=ON")
+            else:
+                conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def version(self) -> int:
+        with self.reader() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def write(self, fn: Callable[[sqlite3.Cursor], Any], expected_version: int | None = None) -> Any:
+        """
+        Run `fn(cursor)` on the writer thread in one transaction and return its result.
+        Raises StateVersionConflict if `expected_version` is given and stale.
+        """
+        future = Future()
+        self._ensure_writer()
+        self._writes.put((fn, expected_version, future))
+        return future.result()
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run_writer, name=f"writer-{self.db_path.name}", daemon=True)
+                self._writer.start()
+
+    def _run_writer(self):
+        conn = self.connect()
+        conn.isolation_level = None  # transactions are managed explicitly below
+        while True:
+            fn, expected_version, future = self._writes.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if expected_version is not None and expected_version != current_version:
+                    raise StateVersionConflict(expected_version, current_version)
+                result = fn(conn.cursor())
+                conn.execute(f"PRAGMA user_version={current_version + 1}")
+                conn.execute("COMMIT")
+            except BaseException as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                future.set_exception(e)
+            else:
+                future.set_result(result)
@@ -1,70 +1,144 @@
 import re
-from rapidfuzz import fuzz
-from gztprocessor.db_connections.db_person import get_connection
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from gztprocessor.db_connections.db_person import get_connection, store
 from nltk.stem import PorterStemmer
 from gztprocessor.state_managers.person_state_manager import PersonStateManager
 
 stemmer = PorterStemmer()
 person_state_manager = PersonStateManager()
 
+MINISTRY_STOPWORDS = frozenset({"ministry", "of", "and", "for", "&", "the"})
+
+
+@lru_cache(maxsize=4096)
 def clean_ministry_name(name: str) -> str:
     """
     Lowercase, remove stopwords, stem the rest of the words.
+    Results are memoized since the same names recur across gazettes.
     """
-    stopwords = {"ministry", "of", "and", "for", "&", "the"}
     words = re.findall(r"\b\w+\b", name.lower())
-    filtered = [stemmer.stem(word) for word in words if word not in stopwords]
+    filtered = [stemmer.stem(word) for word in words if word not in MINISTRY_STOPWORDS]
     return " ".join(filtered)
 
 
-def get_fuzzy_matches_for_ministry(ministry_name: str, gazette_number: str, date_str: str, threshold=70) -> list[dict]:
+class MinistryMatcher:
     """
-    Fuzzy match a given ministry name against current ministry-person assignments in DB.
-    Uses cleaned & stemmed names for comparison, but returns original labels.
-    If DB is empty (first gazette), returns empty list.
+    Fuzzy matcher over the portfolios of a single person state.
+
+    Cleaned names and a token -> portfolio inverted index are built once,
+    then every incoming ministry is scored against all candidates with one
+    vectorized rapidfuzz cdist call.
     """
-    matches = []
-    cleaned_target = clean_ministry_name(ministry_name)
-    target_tokens = set(cleaned_target.split())
 
+    def __init__(self, portfolios: list[tuple]):
+        # portfolios: (ministry name, position, person name) rows in DB order
+        self.portfolios = portfolios
+        self.cleaned_names = list(dict.fromkeys(clean_ministry_name(row[0]) for row in portfolios))
+        name_to_column = {name: i for i, name in enumerate(self.cleaned_names)}
+        self.portfolio_columns = [name_to_column[clean_ministry_name(row[0])] for row in portfolios]
+        self.column_rows = defaultdict(list)
+        self.token_index = defaultdict(set)
+        for row_idx, column in enumerate(self.portfolio_columns):
+            self.column_rows[column].append(row_idx)
+            for token in self.cleaned_names[column].split():
+                self.token_index[token].add(row_idx)
+
+    def match_many(self, ministry_names: list[str], threshold=70) -> dict[str, list[dict]]:
+        """
+        Return suggestions for each ministry name, keyed by the original name.
+        A portfolio is suggested when its score reaches the threshold or when
+        it shares at least one cleaned token with the incoming ministry.
+        """
+        names = list(dict.fromkeys(ministry_names))
+        if not names or not self.portfolios:
+            return {name: [] for name in names}
+
+        cleaned_targets = [clean_ministry_name(name) for name in names]
+        scores = process.cdist(
+            cleaned_targets, self.cleaned_names, scorer=fuzz.token_sort_ratio, dtype=np.float64
+        )
+
+        results = {}
+        for target_idx, name in enumerate(names):
+            column_scores = scores[target_idx]
+
+            candidates = set()
+            for token in set(cleaned_targets[target_idx].split()):
+                candidates |= self.token_index.get(token, set())
+            for column in np.flatnonzero(column_scores >= threshold):
+                candidates.update(self.column_rows[int(column)])
+
+            matches = []
+            for row_idx in sorted(candidates):
+                db_name, db_position, db_person = self.portfolios[row_idx]
+                matches.append(
+                    {
+                        "existing_ministry": db_name,
+                        "existing_position": db_position,
+                        "existing_person": db_person,
+                        "score": float(column_scores[self.portfolio_columns[row_idx]]),
+                    }
+                )
+            results[name] = sorted(matches, key=lambda x: x["score"], reverse=True)
+        return results
+
+
+@lru_cache(maxsize=8)
+def _load_ministry_matcher(prev_gazette: str, prev_date: str, db_version: int) -> MinistryMatcher:
+    # db_version is only part of the cache key: every committed write bumps
+    # it, so a changed person DB never reuses a stale matcher.
     with get_connection() as conn:
         cur = conn.cursor()
-        try:
-            prev_gazette, prev_date = person_state_manager.get_latest_state_info(cur, gazette_number, date_str)
-        except FileNotFoundError:
-            return []
         cur.execute(
             """
             SELECT portfolio.name, portfolio.position, person.name
             FROM portfolio
             LEFT JOIN person ON portfolio.person_id = person.id
             WHERE portfolio.gazette_number = ? AND portfolio.date = ?
+            ORDER BY portfolio.id ASC
             """,
             (prev_gazette, prev_date)
         )
-        db_ministries = cur.fetchall()
+        return MinistryMatcher(cur.fetchall())
+
 
-        if not db_ministries:
-            # First gazette case — DB is empty
-            return []
+def get_ministry_matcher(gazette_number: str, date_str: str) -> MinistryMatcher | None:
+    """
+    Return the cached matcher for the state preceding the given gazette.
+    If DB is empty (first gazette), returns None.
+    """
+    db_version = store.version()
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            prev_gazette, prev_date = person_state_manager.get_latest_state_info(cur, gazette_number, date_str)
+        except FileNotFoundError:
+            return None
+    return _load_ministry_matcher(prev_gazette, prev_date, db_version)
 
-        for db_name, db_position, db_person in db_ministries:
-            cleaned_db_name = clean_ministry_name(db_name)
-            db_tokens = set(cleaned_db_name.split())
-            score = fuzz.token_sort_ratio(cleaned_target, cleaned_db_name)
-            word_overlap = len(target_tokens & db_tokens)
 
-            if score >= threshold or word_overlap >= 1:
-                matches.append(
-                    {
-                        "existing_ministry": db_name,
-                        "existing_position": db_position,
-                        "existing_person": db_person,
-                        "score": score,
-                    }
-                )
+def get_fuzzy_matches_for_ministries(ministry_names: list[str], gazette_number: str, date_str: str, threshold=70) -> dict[str, list[dict]]:
+    """
+    Fuzzy match many ministry names at once against the previous state.
+    Returns a mapping of ministry name -> suggestions (empty on the first gazette).
+    """
+    matcher = get_ministry_matcher(gazette_number, date_str)
+    if matcher is None:
+        return {name: [] for name in ministry_names}
+    return matcher.match_many(ministry_names, threshold=threshold)
 
-    return sorted(matches, key=lambda x: x["score"], reverse=True)
+
+def get_fuzzy_matches_for_ministry(ministry_name: str, gazette_number: str, date_str: str, threshold=70) -> list[dict]:
+    """
+    Fuzzy match a given ministry name against current ministry-person assignments in DB.
+    Uses cleaned & stemmed names for comparison, but returns original labels.
+    If DB is empty (first gazette), returns empty list.
+    """
+    return get_fuzzy_matches_for_ministries([ministry_name], gazette_number, date_str, threshold)[ministry_name]
 
 
 def process_person_gazette(gazette_number: str, date_str: str, data: dict) -> dict:
@@ -78,14 +152,16 @@ def process_person_gazette(gazette_number: str, date_str: str, data: dict) -> di
     moves = []
     used_terminate_names = set()
 
+    suggestions_by_ministry = get_fuzzy_matches_for_ministries(
+        [entry.get("Ministry", "") for entry in adds], gazette_number, date_str, threshold=70
+    )
+
     for name in set(adds_by_name.keys()) & set(terminates_by_name.keys()):
         add_entry = adds_by_name[name]
         terminate_entry = terminates_by_name[name]
         used_terminate_names.add(name)
 
-        raw_suggestions = get_fuzzy_matches_for_ministry(
-            add_entry.get("Ministry", ""), gazette_number, date_str, threshold=70
-        )
+        raw_suggestions = suggestions_by_ministry[add_entry.get("Ministry", "")]
 
         filtered_suggestions = [
             suggestion
@@ -117,9 +193,7 @@ def process_person_gazette(gazette_number: str, date_str: str, data: dict) -> di
                     "new_ministry": entry["Ministry"],
                     "new_position": entry["position"],
                     "date": entry["date"],
-                    "suggested_terminates": get_fuzzy_matches_for_ministry(
-                        entry.get("Ministry", ""), gazette_number, date_str, threshold=70
-                    ),
+                    "suggested_terminates": list(suggestions_by_ministry[entry.get("Ministry", "")]),
                 }
             )
 
@@ -0,0 +1,245 @@
+"""
+Columnar export of the full government structure timeline.
+
+Streams ministry/department and person/portfolio history, plus the
+transactions table, into year-partitioned Parquet datasets:
+
+    output/history/mindep/year=2022/part-<id>.parquet
+    output/history/person/year=2022/part-<id>.parquet
+    output/history/transactions/year=2022/part-<id>.parquet
+
+Name columns are dictionary encoded and every row carries its gazette_number
+and date, so a whole dataset loads with one `pyarrow.parquet.read_table` call.
+Already exported gazettes are recorded in `_manifest.json`; later runs only
+append gazettes that are new since the last export.
+
+Requires the optional `export` extra (pyarrow).
+"""
+import json
+import uuid
+from pathlib import Path
+
+from gztprocessor.db_connections import db_gov, db_person, db_trans
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError as e:  # pragma: no cover - optional dependency
+    raise ImportError(
+        "History export needs pyarrow. Install it with: pip install \"gztprocessor[export]\""
+    ) from e
+
+DEFAULT_HISTORY_DIR = Path("output") / "history"
+MANIFEST_NAME = "_manifest.json"
+BATCH_SIZE = 50_000
+
+_NAME = pa.dictionary(pa.int32(), pa.string())
+
+MINDEP_SCHEMA = pa.schema([
+    ("gazette_number", _NAME),
+    ("date", pa.date32()),
+    ("ministry", _NAME),
+    ("department", _NAME),
+    ("position", pa.int32()),
+])
+PERSON_SCHEMA = pa.schema([
+    ("gazette_number", _NAME),
+    ("date", pa.date32()),
+    ("person", _NAME),
+    ("portfolio", _NAME),
+    ("position", _NAME),
+])
+TRANSACTIONS_SCHEMA = pa.schema([
+    ("gazette_number", pa.string()),
+    ("date", pa.date32()),
+    ("gazette_type", _NAME),
+    ("gazette_format", _NAME),
+    ("warning", pa.bool_()),
+    ("transactions", pa.string()),
+])
+
+# Every query selects (gazette_number, date, ...) first and orders by date,
+# so each year partition is written by one writer per run.
+MINDEP_QUERY = """
+    SELECT m.gazette_number, m.date, m.name, d.name, d.position
+    FROM ministry m
+    LEFT JOIN department d ON d.ministry_id = m.id
+    WHERE m.date >= ?
+    ORDER BY m.date, m.gazette_number, m.id, d.position
+"""
+PERSON_QUERY = """
+    SELECT p.gazette_number, p.date, p.name, pf.name, pf.position
+    FROM person p
+    LEFT JOIN portfolio pf ON pf.person_id = p.id
+    WHERE p.date >= ?
+    ORDER BY p.date, p.gazette_number, p.id, pf.id
+"""
+TRANSACTIONS_QUERY = """
+    SELECT gazette_number, gazette_date, gazette_type, gazette_format, warning, transactions
+    FROM transactions
+    WHERE gazette_date >= ?
+    ORDER BY gazette_date, gazette_number
+"""
+
+# name -> (connection factory, distinct gazettes query, rows query, schema)
+DATASETS = {
+    "mindep": (
+        db_gov.get_connection,
+        "SELECT DISTINCT gazette_number, date FROM ministry",
+        MINDEP_QUERY,
+        MINDEP_SCHEMA,
+    ),
+    "person": (
+        db_person.get_connection,
+        "SELECT DISTINCT gazette_number, date FROM person",
+        PERSON_QUERY,
+        PERSON_SCHEMA,
+    ),
+    "transactions": (
+        db_trans.get_connection,
+        "SELECT gazette_number, gazette_date FROM transactions",
+        TRANSACTIONS_QUERY,
+        TRANSACTIONS_SCHEMA,
+    ),
+}
+
+
+def _load_manifest(output_dir: Path) -> dict:
+    manifest_path = output_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(output_dir: Path, manifest: dict):
+    manifest_path = output_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    tmp_path.replace(manifest_path)
+
+
+def _gazette_key(gazette_number: str, date_str: str) -> str:
+    return f"{gazette_number}|{date_str}"
+
+
+def _stream_rows(conn, query: str, since: str, exported: set, batch_size: int):
+    """
+    Yield batches of rows dated `since` or later for gazettes not yet in `exported`.
+    """
+    cur = conn.cursor()
+    cur.execute(query, (since,))
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        new_rows = [row for row in rows if _gazette_key(row[0], row[1]) not in exported]
+        if new_rows:
+            yield new_rows
+
+
+def _to_record_batch(rows: list[tuple], schema) -> "pa.RecordBatch":
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(schema, columns):
+        if field.name == "date":
+            arrays.append(pa.array(values, type=pa.string()).cast(pa.date32()))
+        elif field.type == pa.bool_():
+            arrays.append(pa.array([bool(v) if v is not None else None for v in values], type=pa.bool_()))
+        elif pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode().cast(field.type))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_dataset(name: str, output_dir: Path = DEFAULT_HISTORY_DIR, full: bool = False,
+                   batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Export one dataset ("mindep", "person" or "transactions").
+    Only gazettes missing from the manifest are written unless `full` is set,
+    in which case the dataset directory is rebuilt from scratch. Gazettes
+    re-applied after their export are refreshed by a `full` run.
+    Returns a summary with the number of gazettes and rows written.
+    """
+    get_connection, gazettes_query, rows_query, schema = DATASETS[name]
+
+    output_dir = Path(output_dir)
+    dataset_dir = output_dir / name
+    manifest = _load_manifest(output_dir)
+
+    if full:
+        for part in dataset_dir.glob("year=*/part-*.parquet"):
+            part.unlink()
+        manifest[name] = []
+    exported = set(manifest.get(name, []))
+
+    run_id = uuid.uuid4().hex[:12]
+    writer, writer_year = None, None
+    new_gazettes = set()
+    rows_written = 0
+
+    with get_connection() as conn:
+        pending = [
+            (gazette_number, date_str)
+            for gazette_number, date_str in conn.execute(gazettes_query)
+            if _gazette_key(gazette_number, date_str) not in exported
+        ]
+        # Only scan rows from the oldest unexported gazette onwards.
+        since = min((date_str for _, date_str in pending), default=None)
+
+        try:
+            rows_iter = _stream_rows(conn, rows_query, since, exported, batch_size) if since else []
+            for rows in rows_iter:
+                batch = _to_record_batch(rows, schema)
+                years = [row[1][:4] for row in rows]
+                start = 0
+                # Rows are date ordered, so a batch splits into contiguous year runs.
+                for end in range(1, len(rows) + 1):
+                    if end < len(rows) and years[end] == years[start]:
+                        continue
+                    year = years[start]
+                    if year != writer_year:
+                        if writer is not None:
+                            writer.close()
+                        part_dir = dataset_dir / f"year={year}"
+                        part_dir.mkdir(parents=True, exist_ok=True)
+                        writer = pq.ParquetWriter(part_dir / f"part-{run_id}.parquet", schema)
+                        writer_year = year
+                    writer.write_batch(batch.slice(start, end - start))
+                    start = end
+
+                new_gazettes.update(_gazette_key(row[0], row[1]) for row in rows)
+                rows_written += len(rows)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    # The manifest is only updated once every part file is closed.
+    manifest[name] = sorted(exported | new_gazettes)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _save_manifest(output_dir, manifest)
+
+    if rows_written:
+        print(f"✅ {name} history: {len(new_gazettes)} new gazette(s), {rows_written} rows → {dataset_dir}")
+    else:
+        print(f"ℹ️ {name} history already up to date at {dataset_dir}")
+    return {"dataset": name, "gazettes": len(new_gazettes), "rows": rows_written}
+
+
+def export_history(output_dir: Path = DEFAULT_HISTORY_DIR, full: bool = False) -> list[dict]:
+    """
+    Export mindep, person and transactions history. See `export_dataset`.
+    """
+    return [export_dataset(name, output_dir, full=full) for name in DATASETS]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export gazette history to partitioned Parquet.")
+    parser.add_argument("--output", default=str(DEFAULT_HISTORY_DIR), help="Output directory")
+    parser.add_argument("--full", action="store_true", help="Rebuild instead of appending new gazettes")
+    args = parser.parse_args()
+    export_history(Path(args.output), full=args.full)
@@ -1,19 +1,23 @@
 # state_managers/mindep_state_manager.py
 from gztprocessor.state_managers.state_manager import AbstractStateManager
-from gztprocessor.db_connections.db_gov import get_connection
+from gztprocessor.db_connections.db_gov import get_connection, store
 from pathlib import Path
-import json
+import os
 
 
 class MindepStateManager(AbstractStateManager):
     def __init__(self):
         project_root = Path(__file__).resolve().parent.parent.parent
-        state_dir = project_root / "state" / "mindep"
+        state_root = Path(os.environ.get("GZTP_STATE_DIR", project_root / "state"))
+        state_dir = state_root / "mindep"
         super().__init__(state_dir)
 
     def get_connection(self):
         return get_connection()
 
+    def get_store(self):
+        return store
+
     def get_latest_db_row(self, cur):
         cur.execute(
             "SELECT gazette_number, date FROM ministry ORDER BY date DESC, gazette_number DESC LIMIT 1"
@@ -45,21 +49,24 @@ class MindepStateManager(AbstractStateManager):
         return row
 
     def _get_state_from_db(self, cur, gazette_number: str, date_str: str) -> dict:
-        snapshot = {"ministers": []}
+        # One LEFT JOIN instead of a department query per ministry.
         cur.execute(
-            "SELECT id, name FROM ministry WHERE gazette_number = ? AND date = ? ORDER BY id ASC",
+            """
+            SELECT m.id, m.name, d.name
+            FROM ministry m
+            LEFT JOIN department d
+              ON d.ministry_id = m.id AND d.gazette_number = m.gazette_number AND d.date = m.date
+            WHERE m.gazette_number = ? AND m.date = ?
+            ORDER BY m.id ASC, d.position ASC
+            """,
             (gazette_number, date_str),
         )
-        for ministry_id, ministry_name in cur.fetchall():
-            cur.execute(
-                "SELECT name FROM department WHERE ministry_id = ? AND gazette_number = ? AND date = ? ORDER BY position ASC",
-                (ministry_id, gazette_number, date_str),
-            )
-            departments = [row[0] for row in cur.fetchall()]
-            snapshot["ministers"].append(
-                {"name": ministry_name, "departments": departments}
-            )
-        return snapshot
+        ministers = {}
+        for ministry_id, ministry_name, department_name in cur.fetchall():
+            minister = ministers.setdefault(ministry_id, {"name": ministry_name, "departments": []})
+            if department_name is not None:
+                minister["departments"].append(department_name)
+        return {"ministers": list(ministers.values())}
 
     def get_all_gazette_numbers(self, from_date, to_date) -> list[dict]:
         with self.get_connection() as conn:
@@ -79,19 +86,10 @@ class MindepStateManager(AbstractStateManager):
             rows = cur.fetchall()
             return [{"gazette_number": row[0], "date": row[1]} for row in rows]
 
-    def export_state_snapshot(self, gazette_number: str, date_str: str):
-        state = self._get_state_from_db(
-            self.get_connection().cursor(), gazette_number, date_str
-        )
-        state_path = self.get_state_file_path(gazette_number, date_str)
-        with open(state_path, "w", encoding="utf-8") as f:
-            json.dump(state, f, indent=2, ensure_ascii=False)
-        print(f"✅ Mindep snapshot exported to {state_path}")
-
     def clear_db(self):
-        with get_connection() as conn:
-            cur = conn.cursor()
+        def delete_all(cur):
             cur.execute("DELETE FROM department")
             cur.execute("DELETE FROM ministry")
-            conn.commit()
+
+        store.write(delete_all)
         print("🧹 Ministry and department tables cleared.")
@@ -1,19 +1,23 @@
 # state_managers/person_state_manager.py
 from gztprocessor.state_managers.state_manager import AbstractStateManager
-from gztprocessor.db_connections.db_person import get_connection
+from gztprocessor.db_connections.db_person import get_connection, store
 from pathlib import Path
-import json
+import os
 
 
 class PersonStateManager(AbstractStateManager):
     def __init__(self):
         project_root = Path(__file__).resolve().parent.parent.parent
-        state_dir = project_root / "state" / "person"
+        state_root = Path(os.environ.get("GZTP_STATE_DIR", project_root / "state"))
+        state_dir = state_root / "person"
         super().__init__(state_dir)
 
     def get_connection(self):
         return get_connection()
 
+    def get_store(self):
+        return store
+
     def get_latest_db_row(self, cur):
         cur.execute(
             "SELECT gazette_number, date FROM person ORDER BY date DESC, gazette_number DESC LIMIT 1"
@@ -45,23 +49,24 @@ class PersonStateManager(AbstractStateManager):
         return [row[0] for row in cur.fetchall()]
 
     def _get_state_from_db(self, cur, gazette_number: str, date_str: str) -> dict:
-        snapshot = {"persons": []}
+        # One LEFT JOIN instead of a portfolio query per person.
         cur.execute(
-            "SELECT id, name FROM person WHERE gazette_number = ? AND date = ? ORDER BY id ASC",
+            """
+            SELECT p.id, p.name, pf.name, pf.position
+            FROM person p
+            LEFT JOIN portfolio pf
+              ON pf.person_id = p.id AND pf.gazette_number = p.gazette_number AND pf.date = p.date
+            WHERE p.gazette_number = ? AND p.date = ?
+            ORDER BY p.id ASC, pf.id ASC
+            """,
             (gazette_number, date_str),
         )
-        for person_id, person_name in cur.fetchall():
-            cur.execute(
-                "SELECT name, position FROM portfolio WHERE person_id = ? AND gazette_number = ? AND date = ? ORDER BY id ASC",
-                (person_id, gazette_number, date_str),
-            )
-            portfolios = [
-                {"name": row[0], "position": row[1]} for row in cur.fetchall()
-            ]
-            snapshot["persons"].append(
-                {"person_name": person_name, "portfolios": portfolios}
-            )
-        return snapshot
+        persons = {}
+        for person_id, person_name, portfolio_name, position in cur.fetchall():
+            person = persons.setdefault(person_id, {"person_name": person_name, "portfolios": []})
+            if portfolio_name is not None:
+                person["portfolios"].append({"name": portfolio_name, "position": position})
+        return {"persons": list(persons.values())}
 
 
     def get_all_gazette_numbers(self) -> list[dict]:
@@ -79,20 +84,10 @@ class PersonStateManager(AbstractStateManager):
         return [{"gazette_number": row[0], "date": row[1]} for row in rows]
 
 
-    def export_state_snapshot(self, gazette_number: str, date_str: str):
-      state = self._get_state_from_db(
-        self.get_connection().cursor(), gazette_number, date_str
-    )
-      state_path = self.get_state_file_path(gazette_number, date_str)
-      with open(state_path, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2, ensure_ascii=False)
-      print(f"✅ Person snapshot exported to {state_path}")
- 
-
     def clear_db(self):
-      with get_connection() as conn:
-        cur = conn.cursor()
+      def delete_all(cur):
         cur.execute("DELETE FROM portfolio")
         cur.execute("DELETE FROM person")
-        conn.commit()
+
+      store.write(delete_all)
       print("🧹 Person and portfolio tables cleared.")
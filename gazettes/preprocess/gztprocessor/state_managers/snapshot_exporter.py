@@ -0,0 +1,113 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+
+class SnapshotExporter:
+    """
+    Background writer for state snapshot files.
+
+    Exports are queued per target path: a path submitted again before the
+    worker picks it up is only written once, and a snapshot whose content
+    hash matches the last written file is skipped. Files are written as
+    compact JSON (gzipped when `compress` is set) via a temp file + rename,
+    so readers never see a partial snapshot.
+    """
+
+    def __init__(self, compress: bool = False):
+        self.compress = compress
+        self._pending: dict[Path, Callable[[], dict]] = {}
+        self._hashes: dict[Path, str] = {}
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def snapshot_path(self, path: Path) -> Path:
+        return path.with_name(path.name + ".gz") if self.compress else path
+
+    def submit(self, path: Path, build_state: Callable[[], dict]):
+        """
+        Schedule `build_state()` to be written to `path`. Returns immediately.
+        """
+        with self._cond:
+            self._pending[path] = build_state
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="snapshot-exporter", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Block until every queued snapshot has been written.
+        Returns False if the timeout expired first.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def discard(self, directory: Path):
+        """
+        Drop queued snapshots under `directory` and forget their hashes.
+        Used before state files are deleted so no stale snapshot is rewritten.
+        """
+        with self._cond:
+            for path in [p for p in self._pending if p.parent == directory]:
+                del self._pending[path]
+            self._cond.wait_for(lambda: not self._busy)
+            for path in [p for p in self._hashes if p.parent == directory]:
+                del self._hashes[path]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                path = next(iter(self._pending))
+                build_state = self._pending.pop(path)
+                self._busy = True
+            try:
+                self._export(path, build_state)
+            except Exception as e:
+                print(f"❗ Failed to export snapshot {path}: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _export(self, path: Path, build_state: Callable[[], dict]):
+        payload = json.dumps(build_state(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        target = self.snapshot_path(path)
+
+        known = self._hashes.get(target)
+        if known is None and target.exists():
+            try:
+                known = hashlib.sha256(self._read(target)).hexdigest()
+            except (OSError, EOFError):
+                known = None
+        if known == digest:
+            self._hashes[target] = digest
+            return
+
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        data = gzip.compress(payload, mtime=0) if self.compress else payload
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self._hashes[target] = digest
+        print(f"✅ Snapshot exported to {target}")
+
+    def _read(self, target: Path) -> bytes:
+        data = target.read_bytes()
+        return gzip.decompress(data) if target.suffix == ".gz" else data
+
+
+snapshot_exporter = SnapshotExporter(compress=os.environ.get("GZTP_COMPRESS_SNAPSHOTS") == "1")
+atexit.register(snapshot_exporter.flush, 10)
@@ -1,5 +1,9 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
+
+from gztprocessor.state_managers.snapshot_exporter import snapshot_exporter
+
+
 class AbstractStateManager(ABC):
     def __init__(self, state_dir: Path):
         self.state_dir = state_dir
@@ -9,13 +13,13 @@ class AbstractStateManager(ABC):
     def get_connection(self): ...
 
     @abstractmethod
-    def _get_state_from_db(self, cur, gazette_number: str, date_str: str) -> dict: ...
+    def get_store(self): ...
 
     @abstractmethod
-    def get_gazette_numbers_for_date(self, cur, date_str: str) -> list[str]: ...
+    def _get_state_from_db(self, cur, gazette_number: str, date_str: str) -> dict: ...
 
     @abstractmethod
-    def export_state_snapshot(self, gazette_number: str, date_str: str): ...
+    def get_gazette_numbers_for_date(self, cur, date_str: str) -> list[str]: ...
 
     @abstractmethod
     def get_latest_state_info(self) -> tuple[str, str]: ...
@@ -54,8 +58,33 @@ class AbstractStateManager(ABC):
             cur = conn.cursor()
             return self._get_state_from_db(cur, gazette_number, date_str)
 
+    def get_state_version(self) -> int:
+        """
+        Current write version of the DB; pass it back as expected_version to
+        reject writes prepared against an older state.
+        """
+        return self.get_store().version()
+
+    def export_state_snapshot(self, gazette_number: str, date_str: str):
+        """
+        Queue a JSON snapshot of the given state for the background exporter.
+        The state is read from the DB when the export runs, so repeated calls
+        for the same gazette collapse into one write.
+        """
+        snapshot_exporter.submit(
+            self.get_state_file_path(gazette_number, date_str),
+            lambda: self.load_state(gazette_number, date_str),
+        )
+
+    def flush_snapshots(self, timeout: float | None = None) -> bool:
+        """
+        Wait for queued snapshot exports to finish (useful in tests and scripts).
+        """
+        return snapshot_exporter.flush(timeout)
+
     def clear_all_state_data(self):
-        for f in self.state_dir.glob("state_*.json"):
+        snapshot_exporter.discard(self.state_dir)
+        for f in self.state_dir.glob("state_*.json*"):
             f.unlink()
         self.clear_db()
 
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Header, Response
+from fastapi.responses import JSONResponse
 
 from fastapi.params import Body
-from typing import List
+from typing import List, Optional
 
 from gztprocessor.state_managers.person_state_manager import PersonStateManager
 import gztprocessor.gazette_processors.person_gazette_processor as person_gazette_processor
 import gztprocessor.database_handlers.person_database_handler as person_database
 import gztprocessor.csv_writer as csv_writer
+from gztprocessor.db_connections.storage import StateVersionConflict
 from routes.state_router import create_state_routes
 import utils as utils
 
@@ -16,31 +18,43 @@ person_state_manager = PersonStateManager()
 person_router.include_router(create_state_routes("person", person_state_manager))
 
 @person_router.get("/person/{date}/{gazette_number}")
-def get_contents_of_person_gazette(gazette_number: str, date: str):
+def get_contents_of_person_gazette(gazette_number: str, date: str, response: Response):
     """
     Return the predicted transactions from a person gazette.
+    The X-State-Version header can be sent back as X-Expected-Version on POST.
     """
+    response.headers["X-State-Version"] = str(person_state_manager.get_state_version())
     try:
         data = utils.load_person_gazette_data_from_JSON(gazette_number, date)
         transactions = person_gazette_processor.process_person_gazette(gazette_number, date, data)
         return transactions
     except FileNotFoundError:
         return {"error": f"Gazette file for {gazette_number}, {date} not found."}
+    except utils.AmbiguousGazetteFileError as e:
+        return {"error": str(e)}
 
 
 @person_router.post("/person/{date}/{gazette_number}")
-def create_state_from_person_gazette(date: str, gazette_number: str, payload: dict = Body(...)):
+def create_state_from_person_gazette(
+    date: str,
+    gazette_number: str,
+    payload: dict = Body(...),
+    expected_version: Optional[int] = Header(None, alias="X-Expected-Version"),
+):
     """
     Apply user-reviewed transactions and save new state snapshot.
+    Returns 409 if X-Expected-Version is sent and the state has changed since.
     """
     try:
         transactions = payload.get("transactions", {})
 
-        person_database.apply_transactions_to_db(gazette_number, date, transactions)
+        person_database.apply_transactions_to_db(gazette_number, date, transactions, expected_version)
         csv_writer.generate_person_csvs(gazette_number, date, transactions)
         return {
             "message": f"State updated for amendment gazette {gazette_number} on {date}"
         }
+    except StateVersionConflict as e:
+        return JSONResponse(status_code=409, content={"error": str(e), "current_version": e.current_version})
     except FileNotFoundError:
         return {
             "error": f"Gazette file for {gazette_number}, {date} not found."
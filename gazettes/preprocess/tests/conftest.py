@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# The databases and state directories are fixed when gztprocessor is imported,
+# so point them at a scratch directory before any test imports it.
+SCRATCH_DIR = Path(tempfile.mkdtemp(prefix="gztp-tests-"))
+os.environ["GZTP_DATA_DIR"] = str(SCRATCH_DIR)
+os.environ["GZTP_STATE_DIR"] = str(SCRATCH_DIR / "state")
+
+# main, routes and utils are imported from this directory rather than installed.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+@pytest.fixture
+def databases():
+    """Fresh gov, person and transaction databases (the schemas drop existing tables) and no snapshots."""
+    from gztprocessor.db_connections import db_gov, db_person, db_trans
+    from gztprocessor.state_managers.mindep_state_manager import MindepStateManager
+    from gztprocessor.state_managers.person_state_manager import PersonStateManager
+
+    for db in (db_gov, db_person, db_trans):
+        db.init_db()
+    for manager in (MindepStateManager(), PersonStateManager()):
+        manager.clear_all_state_data()
+    return db_gov, db_person, db_trans
+
+
+@pytest.fixture
+def client(databases, tmp_path, monkeypatch):
+    testclient = pytest.importorskip("fastapi.testclient")
+    import main
+
+    # CSV output is written relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+    return testclient.TestClient(main.app)
@@ -0,0 +1,123 @@
+import datetime
+import json
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from gztprocessor import history_export  # noqa: E402
+
+# gazette -> ministry -> departments, spanning two years.
+MINDEP_TIMELINE = {
+    ("2289-43", "2021-07-22"): {"Minister of Finance": ["Treasury", "Customs"], "Minister of Health": []},
+    ("2297-78", "2022-09-16"): {"Minister of Finance": ["Treasury"], "Minister of Energy": ["Customs"]},
+}
+PERSON_TIMELINE = {
+    ("2067-09", "2021-07-22"): {"Hon. A": [("Minister of Finance", "Minister")]},
+    ("2068-06", "2022-09-16"): {"Hon. A": [("Minister of Energy", "Minister")], "Hon. B": []},
+}
+
+
+def _insert_mindep(gazette_number, date_str, ministries):
+    def insert(cur):
+        for ministry, departments in ministries.items():
+            cur.execute("INSERT INTO ministry (name, gazette_number, date) VALUES (?, ?, ?)",
+                        (ministry, gazette_number, date_str))
+            ministry_id = cur.lastrowid
+            cur.executemany(
+                "INSERT INTO department (name, ministry_id, position, gazette_number, date) VALUES (?, ?, ?, ?, ?)",
+                [(name, ministry_id, position, gazette_number, date_str) for position, name in enumerate(departments)],
+            )
+
+    history_export.db_gov.store.write(insert)
+
+
+def _insert_person(gazette_number, date_str, persons):
+    def insert(cur):
+        for person, portfolios in persons.items():
+            cur.execute("INSERT INTO person (name, gazette_number, date) VALUES (?, ?, ?)",
+                        (person, gazette_number, date_str))
+            cur.executemany(
+                "INSERT INTO portfolio (name, position, person_id, gazette_number, date) VALUES (?, ?, ?, ?, ?)",
+                [(name, position, cur.lastrowid, gazette_number, date_str) for name, position in portfolios],
+            )
+
+    history_export.db_person.store.write(insert)
+
+
+def _insert_transaction(gazette_number, date_str, warning):
+    history_export.db_trans.store.write(lambda cur: cur.execute(
+        "INSERT INTO transactions (gazette_type, gazette_format, gazette_number, gazette_date, warning, transactions)"
+        " VALUES ('mindep', 'amendment', ?, ?, ?, ?)",
+        (gazette_number, date_str, warning, json.dumps([{"type": "MOVE"}])),
+    ))
+
+
+@pytest.fixture
+def timeline(databases):
+    for (gazette_number, date_str), ministries in MINDEP_TIMELINE.items():
+        _insert_mindep(gazette_number, date_str, ministries)
+    for (gazette_number, date_str), persons in PERSON_TIMELINE.items():
+        _insert_person(gazette_number, date_str, persons)
+    _insert_transaction("2289-43", "2021-07-22", 0)
+    _insert_transaction("2297-78", "2022-09-16", 1)
+
+
+def _rows(path):
+    table = pq.read_table(path)
+    return table, sorted(tuple(row.values()) for row in table.to_pylist())
+
+
+def _date(date_str):
+    return datetime.date.fromisoformat(date_str)
+
+
+def test_timeline_round_trips_through_year_partitions(timeline, tmp_path):
+    summaries = history_export.export_history(tmp_path)
+
+    assert summaries == [{"dataset": "mindep", "gazettes": 2, "rows": 5},
+                         {"dataset": "person", "gazettes": 2, "rows": 3},
+                         {"dataset": "transactions", "gazettes": 2, "rows": 2}]
+    for name in history_export.DATASETS:
+        assert sorted(p.name for p in (tmp_path / name).iterdir()) == ["year=2021", "year=2022"]
+
+    # A year partition holds only that year's gazettes.
+    assert {row["gazette_number"] for row in pq.read_table(
+        next((tmp_path / "mindep" / "year=2021").glob("part-*.parquet"))).to_pylist()} == {"2289-43"}
+
+    table, rows = _rows(tmp_path / "mindep")
+    # The hive partition key comes back as an extra "year" column.
+    assert table.schema.remove(table.schema.get_field_index("year")) == history_export.MINDEP_SCHEMA
+    assert rows == sorted(
+        (gazette_number, _date(date_str), ministry, department, position, int(date_str[:4]))
+        for (gazette_number, date_str), ministries in MINDEP_TIMELINE.items()
+        for ministry, departments in ministries.items()
+        for position, department in (enumerate(departments) if departments else [(None, None)])
+    )
+
+    table, rows = _rows(tmp_path / "person")
+    assert table.schema.remove(table.schema.get_field_index("year")) == history_export.PERSON_SCHEMA
+    assert ("2068-06", _date("2022-09-16"), "Hon. B", None, None, 2022) in rows
+    assert len(rows) == 3
+
+    table, rows = _rows(tmp_path / "transactions")
+    assert [row[:5] for row in rows] == [("2289-43", _date("2021-07-22"), "mindep", "amendment", False),
+                                         ("2297-78", _date("2022-09-16"), "mindep", "amendment", True)]
+    assert json.loads(rows[0][5]) == [{"type": "MOVE"}]
+
+
+def test_later_exports_only_append_new_gazettes(timeline, tmp_path):
+    history_export.export_dataset("mindep", tmp_path)
+    assert history_export.export_dataset("mindep", tmp_path)["rows"] == 0
+
+    _insert_mindep("2300-24", "2022-10-01", {"Minister of Trade": ["Export Board"]})
+    assert history_export.export_dataset("mindep", tmp_path) == {"dataset": "mindep", "gazettes": 1, "rows": 1}
+    assert len(list((tmp_path / "mindep" / "year=2022").glob("part-*.parquet"))) == 2
+
+    manifest = json.loads((tmp_path / history_export.MANIFEST_NAME).read_text())
+    assert manifest["mindep"] == ["2289-43|2021-07-22", "2297-78|2022-09-16", "2300-24|2022-10-01"]
+
+    _, appended = _rows(tmp_path / "mindep")
+    assert history_export.export_dataset("mindep", tmp_path, full=True)["rows"] == 6
+    assert _rows(tmp_path / "mindep")[1] == appended
+    assert len(list((tmp_path / "mindep" / "year=2022").glob("part-*.parquet"))) == 1
@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+
+import utils
+from utils import AmbiguousGazetteFileError, GazetteInputCatalog
+
+
+@pytest.fixture
+def input_dirs(tmp_path):
+    mindep, person = tmp_path / "mindep", tmp_path / "person"
+    mindep.mkdir()
+    person.mkdir()
+    return mindep, person
+
+
+@pytest.fixture
+def catalog(input_dirs):
+    mindep, person = input_dirs
+    return GazetteInputCatalog({"mindep": (mindep, "ministry-"), "person": (person, "persons-")}, max_cached_files=2)
+
+
+def _write(path, data, mtime=None):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def _touch_dir(directory, mtime):
+    # Directory mtimes can be coarse, so set them explicitly instead of relying on the clock.
+    os.utime(directory, (mtime, mtime))
+
+
+def test_files_are_found_by_gazette_number_and_date(catalog, input_dirs):
+    mindep, person = input_dirs
+    _write(mindep / "ministry-initial-2289-43_E_2022_07_22.json", {"ministers": []})
+    _write(person / "persons-2067-09_E_2022_07_22.json", {"ADD": []})
+
+    assert catalog.load("mindep", "2289-43", "2022-07-22") == {"ministers": []}
+    assert catalog.load("person", "2067-09", "2022_07_22") == {"ADD": []}
+    with pytest.raises(FileNotFoundError):
+        catalog.find("person", "2289-43", "2022-07-22")
+
+
+def test_index_is_refreshed_when_the_directory_changes(catalog, input_dirs, monkeypatch):
+    mindep, _ = input_dirs
+    _write(mindep / "ministry-initial-1_E_2022_01_01.json", {"n": 1})
+    _touch_dir(mindep, 1_000_000)
+    assert catalog.load("mindep", "1", "2022-01-01") == {"n": 1}
+
+    # Unchanged directories are not listed again.
+    listed = []
+    iterdir = type(mindep).iterdir
+    monkeypatch.setattr(type(mindep), "iterdir", lambda self: listed.append(self) or iterdir(self))
+    with pytest.raises(FileNotFoundError):
+        catalog.find("mindep", "2", "2022-01-02")
+    assert listed == []
+
+    _write(mindep / "ministry-amendment-2_E_2022_01_02.json", {"n": 2})
+    _touch_dir(mindep, 1_000_010)
+    assert catalog.load("mindep", "2", "2022-01-02") == {"n": 2}
+    assert mindep in listed
+
+    (mindep / "ministry-initial-1_E_2022_01_01.json").unlink()
+    _touch_dir(mindep, 1_000_020)
+    with pytest.raises(FileNotFoundError):
+        catalog.find("mindep", "1", "2022-01-01")
+
+
+def test_decoded_files_are_kept_in_a_bounded_lru(catalog, input_dirs):
+    mindep, _ = input_dirs
+    paths = [mindep / f"ministry-initial-{n}_E_2022_01_01.json" for n in range(3)]
+    for n, path in enumerate(paths):
+        _write(path, {"n": n, "items": []}, mtime=2_000_000)
+
+    first = catalog.load("mindep", "0", "2022-01-01")
+    # Callers may modify what they get back without touching the cache.
+    first["items"].append("changed")
+    assert catalog.load("mindep", "0", "2022-01-01") == {"n": 0, "items": []}
+
+    catalog.load("mindep", "1", "2022-01-01")
+    catalog.load("mindep", "0", "2022-01-01")
+    catalog.load("mindep", "2", "2022-01-01")
+    assert list(catalog._cache) == [paths[0], paths[2]]
+
+    # A file rewritten in place is read again.
+    _write(paths[0], {"n": "zero", "items": []}, mtime=2_000_100)
+    assert catalog.load("mindep", "0", "2022-01-01") == {"n": "zero", "items": []}
+
+
+def test_ambiguous_files_raise_their_own_error(catalog, input_dirs):
+    mindep, _ = input_dirs
+    _write(mindep / "ministry-initial-7_E_2022_01_01.json", {})
+    _write(mindep / "ministry-amendment-7_E_2022_01_01.json", {})
+
+    with pytest.raises(AmbiguousGazetteFileError, match="ministry-amendment-7_E_2022_01_01.json"):
+        catalog.load("mindep", "7", "2022-01-01")
+    assert list(catalog.duplicates()) == [("mindep", "7", "2022_01_01")]
+
+
+def test_routes_report_ambiguous_files_before_other_value_errors(client, catalog, input_dirs, monkeypatch):
+    mindep, person = input_dirs
+    for prefix in ("initial", "amendment"):
+        _write(mindep / f"ministry-{prefix}-7_E_2022_01_01.json", {})
+    _write(person / "persons-7_E_2022_01_01.json", {})
+    _write(person / "persons-x-7_E_2022_01_01.json", {})
+    monkeypatch.setattr(utils, "input_catalog", catalog)
+
+    for path in ("/mindep/initial/2022-01-01/7", "/mindep/amendment/2022-01-01/7", "/person/2022-01-01/7"):
+        assert client.get(path).json()["error"].startswith("Multiple gazette files found for 7, 2022-01-01")
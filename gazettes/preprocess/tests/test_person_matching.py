@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from benchmarks.bench_person_matching import SUBJECTS, build_cabinet, legacy_clean_ministry_name, legacy_match
+from gztprocessor.gazette_processors.person_gazette_processor import (
+    MinistryMatcher,
+    clean_ministry_name,
+    get_fuzzy_matches_for_ministry,
+    get_ministry_matcher,
+)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("threshold", [50, 70, 90])
+def test_matcher_gives_the_same_suggestions_as_the_per_pair_loop(seed, threshold):
+    rng = random.Random(seed)
+    previous_state = build_cabinet(rng, 25)
+    # A reshuffle, a few names repeated, and some ministries sharing no subject with the previous state.
+    incoming = [row[0] for row in build_cabinet(rng, 25)]
+    incoming += rng.sample(incoming, 5) + ["Ministry of Sports", "Ministry for the Arts", ""]
+
+    expected = {name: legacy_match(name, previous_state, threshold) for name in incoming}
+    assert MinistryMatcher(previous_state).match_many(incoming, threshold) == expected
+
+
+def test_cleaned_names_match_the_old_cleaning():
+    for subject in SUBJECTS:
+        name = f"Ministry of the {subject} & Development"
+        assert clean_ministry_name(name) == legacy_clean_ministry_name(name)
+
+
+def test_empty_previous_state_suggests_nothing():
+    assert MinistryMatcher([]).match_many(["Ministry of Health", "Ministry of Health"]) == {"Ministry of Health": []}
+
+
+def _write_person_gazette(gazette_number, date_str, ministry):
+    from gztprocessor.database_handlers.person_database_handler import apply_transactions_to_db
+
+    apply_transactions_to_db(gazette_number, date_str, {"adds": [
+        {"new_person": "Hon. A. B. Perera", "new_ministry": ministry, "new_position": "Minister", "date": date_str},
+    ]})
+
+
+def test_cached_matcher_is_rebuilt_when_the_person_db_changes(databases):
+    assert get_ministry_matcher("1000-01", "2023-01-01") is None
+
+    _write_person_gazette("1000-01", "2023-01-01", "Ministry of Health")
+    matcher = get_ministry_matcher("1000-02", "2023-02-01")
+    assert matcher.portfolios == [("Ministry of Health", "Minister", "Hon. A. B. Perera")]
+    assert get_ministry_matcher("1000-02", "2023-02-01") is matcher
+
+    # The previous gazette is rewritten in place: same (gazette, date) key, new DB version.
+    _write_person_gazette("1000-01", "2023-01-01", "Ministry of Finance")
+    rebuilt = get_ministry_matcher("1000-02", "2023-02-01")
+    assert rebuilt is not matcher
+    assert rebuilt.portfolios == [("Ministry of Finance", "Minister", "Hon. A. B. Perera")]
+    assert [match["existing_ministry"] for match in
+            get_fuzzy_matches_for_ministry("Ministry of Finance", "1000-02", "2023-02-01")] == ["Ministry of Finance"]
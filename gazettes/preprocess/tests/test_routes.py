@@ -0,0 +1,67 @@
+import threading
+
+
+def test_previews_send_the_state_version(client, databases):
+    db_gov, db_person, _ = databases
+    for path, db in (("/mindep/initial/2022-07-22/2289-43", db_gov), ("/person/2022-07-22/2067-09", db_person)):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.headers["X-State-Version"] == str(db.store.version())
+
+    # The frontend runs on another origin, so the header has to be exposed to it.
+    response = client.get("/", headers={"Origin": "http://localhost:5173"})
+    assert response.headers["Access-Control-Expose-Headers"] == "X-State-Version"
+
+
+def test_post_with_a_stale_expected_version_gets_409(client):
+    preview = client.get("/mindep/initial/2022-07-22/2289-43")
+    version = preview.headers["X-State-Version"]
+
+    created = client.post("/mindep/initial/2022-07-22/2289-43", json=preview.json(),
+                          headers={"X-Expected-Version": version})
+    assert created.status_code == 200
+
+    amendment = client.get("/mindep/amendment/2022-09-16/2297-78")
+    assert int(amendment.headers["X-State-Version"]) == int(version) + 1
+
+    stale = client.post("/mindep/amendment/2022-09-16/2297-78", json=amendment.json(),
+                        headers={"X-Expected-Version": version})
+    assert stale.status_code == 409
+    assert stale.json()["current_version"] == int(version) + 1
+
+    # Without the header the write is unconditional.
+    assert client.post("/mindep/amendment/2022-09-16/2297-78", json=amendment.json()).status_code == 200
+
+
+def test_concurrent_posts_from_one_preview_produce_one_success(client):
+    client.post("/mindep/initial/2022-07-22/2289-43", json=client.get("/mindep/initial/2022-07-22/2289-43").json())
+    preview = client.get("/mindep/amendment/2022-09-16/2297-78")
+    writers = 6
+    barrier = threading.Barrier(writers)
+    statuses = []
+
+    def post():
+        barrier.wait()
+        statuses.append(client.post("/mindep/amendment/2022-09-16/2297-78", json=preview.json(),
+                                    headers={"X-Expected-Version": preview.headers["X-State-Version"]}).status_code)
+
+    threads = [threading.Thread(target=post) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [200] + [409] * (writers - 1)
+
+
+def test_person_post_checks_the_expected_version(client):
+    payload = {"transactions": {"adds": [{"new_person": "Hon. Member", "new_ministry": "Ministry of Health",
+                                          "new_position": "Minister", "date": "2023-01-01"}]}}
+    version = client.get("/person/2022-07-22/2067-09").headers["X-State-Version"]
+
+    first = client.post("/person/2023-01-01/9001-01", json=payload, headers={"X-Expected-Version": version})
+    assert first.status_code == 200
+    conflict = client.post("/person/2023-01-02/9002-01", json=payload, headers={"X-Expected-Version": version})
+    assert conflict.status_code == 409
+    assert conflict.json()["current_version"] == int(version) + 1
+    assert client.get("/person/state/latest").json()["gazette_number"] == "9001-01"
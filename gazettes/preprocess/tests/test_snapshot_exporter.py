@@ -0,0 +1,126 @@
+import gzip
+import json
+import threading
+import time
+
+import pytest
+
+from gztprocessor.state_managers import snapshot_exporter as exporter_module
+from gztprocessor.state_managers.snapshot_exporter import SnapshotExporter
+
+
+@pytest.fixture
+def exporter():
+    exporter = SnapshotExporter()
+    yield exporter
+    assert exporter.flush(timeout=10)
+
+
+def _builder(state, calls):
+    def build():
+        calls.append(state)
+        return state
+    return build
+
+
+def _blocked(exporter, path):
+    """Occupy the worker with an export of `path` until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def build():
+        started.set()
+        release.wait(10)
+        return {"blocking": True}
+
+    exporter.submit(path, build)
+    assert started.wait(10)
+    return release
+
+
+def test_repeated_submissions_are_coalesced(exporter, tmp_path):
+    release = _blocked(exporter, tmp_path / "state_0.json")
+    calls = []
+    for version in range(5):
+        exporter.submit(tmp_path / "state_1.json", _builder({"version": version}, calls))
+
+    assert not exporter.flush(timeout=0.05)
+    release.set()
+    assert exporter.flush(timeout=10)
+
+    # Only the last submission for a path is built and written.
+    assert calls == [{"version": 4}]
+    assert json.loads((tmp_path / "state_1.json").read_text()) == {"version": 4}
+
+
+def test_unchanged_snapshots_are_not_rewritten(exporter, tmp_path, monkeypatch):
+    replaced = []
+    replace = exporter_module.os.replace
+    monkeypatch.setattr(exporter_module.os, "replace", lambda src, dst: (replaced.append(dst), replace(src, dst)))
+    path = tmp_path / "state_1.json"
+
+    for state in ({"persons": []}, {"persons": []}, {"persons": ["A"]}, {"persons": ["A"]}):
+        exporter.submit(path, lambda state=state: state)
+        assert exporter.flush(timeout=10)
+    assert replaced == [path, path]
+
+    # A new exporter hashes the file already on disk rather than rewriting it.
+    fresh = SnapshotExporter()
+    fresh.submit(path, lambda: {"persons": ["A"]})
+    assert fresh.flush(timeout=10)
+    assert replaced == [path, path]
+
+
+def test_snapshots_are_replaced_atomically(exporter, tmp_path, monkeypatch):
+    path = tmp_path / "state_1.json"
+    exporter.submit(path, lambda: {"version": 1})
+    assert exporter.flush(timeout=10)
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(exporter_module.os, "replace", fail)
+    exporter.submit(path, lambda: {"version": 2})
+    assert exporter.flush(timeout=10)
+    # The old snapshot is untouched and the temp file is cleaned up.
+    assert json.loads(path.read_text()) == {"version": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["state_1.json"]
+
+    # The worker survives the failure and the next export goes through.
+    monkeypatch.undo()
+    exporter.submit(path, lambda: {"version": 3})
+    assert exporter.flush(timeout=10)
+    assert json.loads(path.read_text()) == {"version": 3}
+    assert path.read_text() == '{"version":3}'
+
+
+def test_compressed_snapshots_get_a_gz_suffix(tmp_path):
+    exporter = SnapshotExporter(compress=True)
+    exporter.submit(tmp_path / "state_1.json", lambda: {"ministries": ["Minister of Health"]})
+    assert exporter.flush(timeout=10)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["state_1.json.gz"]
+    assert json.loads(gzip.decompress((tmp_path / "state_1.json.gz").read_bytes())) == {
+        "ministries": ["Minister of Health"]}
+
+
+def test_discard_drops_queued_snapshots_for_a_directory(exporter, tmp_path):
+    kept, dropped = tmp_path / "kept", tmp_path / "dropped"
+    kept.mkdir()
+    dropped.mkdir()
+    release = _blocked(exporter, tmp_path / "state_0.json")
+    calls = []
+    exporter.submit(dropped / "state_1.json", _builder({"dropped": True}, calls))
+    exporter.submit(kept / "state_1.json", _builder({"kept": True}, calls))
+
+    # discard() waits for the busy worker, so run it alongside and let the worker go once the queue is pruned.
+    discarding = threading.Thread(target=exporter.discard, args=(dropped,))
+    discarding.start()
+    deadline = time.monotonic() + 10
+    while dropped / "state_1.json" in exporter._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    discarding.join(10)
+    assert exporter.flush(timeout=10)
+
+    assert calls == [{"kept": True}]
+    assert list(dropped.iterdir()) == []
@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+
+import pytest
+
+from gztprocessor.db_connections.storage import SQLiteStore, StateVersionConflict
+
+
+@pytest.fixture
+def store(tmp_path):
+    schema = tmp_path / "schema.sql"
+    schema.write_text("CREATE TABLE counter (id INTEGER PRIMARY KEY, value INTEGER NOT NULL);\n"
+                      "INSERT INTO counter VALUES (1, 0);\n")
+    store = SQLiteStore(tmp_path / "test.db", schema, pool_size=2)
+    store.init_schema()
+    return store
+
+
+def _value(store):
+    with store.reader() as conn:
+        return conn.execute("SELECT value FROM counter").fetchone()[0]
+
+
+def _increment(cur):
+    # Read-modify-write: only safe because writes are serialized.
+    value = cur.execute("SELECT value FROM counter").fetchone()[0]
+    cur.execute("UPDATE counter SET value = ?", (value + 1,))
+    return value + 1
+
+
+def test_each_committed_write_bumps_the_version(store):
+    assert store.version() == 0
+    assert store.write(_increment) == 1
+    assert store.write(_increment, expected_version=1) == 2
+    assert store.version() == 2
+    assert _value(store) == 2
+
+
+def test_stale_expected_version_is_rejected_without_writing(store):
+    store.write(_increment)
+
+    with pytest.raises(StateVersionConflict) as conflict:
+        store.write(_increment, expected_version=0)
+
+    assert (conflict.value.expected_version, conflict.value.current_version) == (0, 1)
+    assert store.version() == 1
+    assert _value(store) == 1
+
+
+def test_failed_write_is_rolled_back(store):
+    def fail(cur):
+        _increment(cur)
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        store.write(fail)
+    assert store.version() == 0
+    assert _value(store) == 0
+    # The writer thread survives the error.
+    assert store.write(_increment) == 1
+
+
+def test_concurrent_writes_run_one_at_a_time_on_the_writer_thread(store):
+    writers = 16
+    barrier = threading.Barrier(writers)
+    threads_seen = set()
+
+    def write():
+        barrier.wait()
+        store.write(lambda cur: (threads_seen.add(threading.current_thread().name), _increment(cur)))
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert threads_seen == {"writer-test.db"}
+    assert _value(store) == writers
+    assert store.version() == writers
+
+
+def test_only_one_of_several_writers_with_the_same_expected_version_wins(store):
+    writers = 8
+    barrier = threading.Barrier(writers)
+    outcomes = []
+
+    def write():
+        barrier.wait()
+        try:
+            store.write(_increment, expected_version=0)
+            outcomes.append("ok")
+        except StateVersionConflict:
+            outcomes.append("conflict")
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes) == ["conflict"] * (writers - 1) + ["ok"]
+    assert _value(store) == 1
+
+
+def test_readers_are_query_only_and_pooled(store):
+    with store.reader() as first:
+        with pytest.raises(sqlite3.OperationalError):
+            first.execute("UPDATE counter SET value = 5")
+        with store.reader() as second:
+            assert second is not first
+    with store.reader() as again:
+        assert again in (first, second)
+    assert _value(store) == 0
@@ -1,9 +1,140 @@
 import json
+import re
+from collections import OrderedDict, defaultdict
 from pathlib import Path
+from threading import Lock
 
 MINDEP_INPUT_DIR = Path(__file__).resolve().parent / "input" / "mindep"
 PERSON_INPUT_DIR = Path(__file__).resolve().parent / "input" / "person"
 
+
+class AmbiguousGazetteFileError(ValueError):
+    """Raised when more than one input file matches a gazette number and date."""
+
+
+class GazetteInputCatalog:
+    """
+    Index of gazette input files keyed by (kind, gazette_number, date).
+
+    The index is built once and only rebuilt when an input directory's mtime
+    changes, so lookups no longer list the directory on every request.
+    Decoded files are kept in a bounded LRU keyed by the file's mtime/size.
+    """
+
+    def __init__(self, sources: dict[str, tuple[Path, str]], max_cached_files: int = 64):
+        # sources: kind -> (directory, filename prefix)
+        self.sources = sources
+        self.max_cached_files = max_cached_files
+        self._patterns = {
+            kind: re.compile(
+                rf"^{re.escape(prefix)}(?:[a-z]+-)?(?P<gazette_number>.+?)_E_(?P<date>[\d_]+)\.json$"
+            )
+            for kind, (_, prefix) in sources.items()
+        }
+        self._dir_stamps = {}
+        self._index = {}
+        self._duplicates = {}
+        self._cache = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _normalize_date(date_str: str) -> str:
+        # Convert hyphens to underscores so "2022-07-22" matches "2022_07_22"
+        return date_str.replace("-", "_")
+
+    @staticmethod
+    def _stamp(path: Path):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh_if_changed(self):
+        stamps = {kind: self._stamp(directory) for kind, (directory, _) in self.sources.items()}
+        if stamps == self._dir_stamps:
+            return
+
+        matches = defaultdict(list)
+        for kind, (directory, _) in self.sources.items():
+            if stamps[kind] is None:
+                continue
+            pattern = self._patterns[kind]
+            for f in sorted(directory.iterdir()):
+                match = pattern.match(f.name)
+                if match and f.is_file():
+                    matches[(kind, match["gazette_number"], match["date"])].append(f)
+
+        self._index = {key: files[0] for key, files in matches.items() if len(files) == 1}
+        self._duplicates = {key: files for key, files in matches.items() if len(files) > 1}
+        self._dir_stamps = stamps
+
+        for (kind, gazette_number, date), files in self._duplicates.items():
+            names = ", ".join(f.name for f in files)
+            print(f"⚠️ Ambiguous {kind} gazette files for {gazette_number} on {date}: {names}")
+
+    def duplicates(self) -> dict[tuple[str, str, str], list[Path]]:
+        """
+        Return every (kind, gazette_number, date) key that matches more than one file.
+        """
+        with self._lock:
+            self._refresh_if_changed()
+            return dict(self._duplicates)
+
+    def find(self, kind: str, gazette_number: str, date_str: str) -> Path:
+        key = (kind, gazette_number, self._normalize_date(date_str))
+        with self._lock:
+            self._refresh_if_changed()
+            if key in self._duplicates:
+                names = ", ".join(f.name for f in self._duplicates[key])
+                raise AmbiguousGazetteFileError(
+                    f"Multiple gazette files found for {gazette_number}, {date_str}: {names}"
+                )
+            if key not in self._index:
+                raise FileNotFoundError(
+                    f"Gazette file for {gazette_number}, {date_str} not found."
+                )
+            return self._index[key]
+
+    def load(self, kind: str, gazette_number: str, date_str: str) -> dict:
+        """
+        Return the decoded gazette JSON. Callers get a fresh object on every
+        call because the gazette processors modify the data in place.
+        """
+        json_path = self.find(kind, gazette_number, date_str)
+        stamp = self._stamp(json_path)
+        if stamp is None:
+            raise FileNotFoundError(
+                f"Gazette file for {gazette_number}, {date_str} not found."
+            )
+
+        with self._lock:
+            cached = self._cache.get(json_path)
+            if cached is not None and cached[0] == stamp:
+                self._cache.move_to_end(json_path)
+                return json.loads(cached[1])
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON format in {json_path}: {e}")
+
+        with self._lock:
+            self._cache[json_path] = (stamp, text)
+            self._cache.move_to_end(json_path)
+            while len(self._cache) > self.max_cached_files:
+                self._cache.popitem(last=False)
+        return data
+
+
+input_catalog = GazetteInputCatalog({
+    "mindep": (MINDEP_INPUT_DIR, "ministry-"),
+    "person": (PERSON_INPUT_DIR, "persons-"),
+})
+
+
 def load_mindep_gazette_data_from_JSON(gazette_number: str, date_str: str) -> dict:
     """
     Load a gazette JSON file using gazette number and date.
@@ -17,32 +148,10 @@ def load_mindep_gazette_data_from_JSON(gazette_number: str, date_str: str) -> di
 
     Note: date_str passed with hyphens ('YYYY-MM-DD') will be
     converted to underscores to match filenames.
-    """
 
-    # Convert hyphens to underscores so "2022-07-22" matches "2022_07_22"
-    normalized_date_str = date_str.replace("-", "_")
-
-    expected_suffix = f"{gazette_number}_E_{normalized_date_str}.json"
-
-    matching_files = [
-        f for f in MINDEP_INPUT_DIR.iterdir()
-        if f.is_file() and f.name.endswith(expected_suffix) and f.name.startswith("ministry-")
-    ]
-
-    if not matching_files:
-        raise FileNotFoundError(
-            f"Gazette file for {gazette_number}, {date_str} not found."
-        )
-
-    if len(matching_files) > 1:
-        print(f"Multiple gazette files found, using the first one: {matching_files[0].name}")
-
-    json_path = matching_files[0]
-    try:
-        with open(json_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON format in {json_path}: {e}")
+    Raises AmbiguousGazetteFileError if more than one file matches.
+    """
+    return input_catalog.load("mindep", gazette_number, date_str)
     
 
 def load_person_gazette_data_from_JSON(gazette_number: str, date_str: str) -> dict:
@@ -57,29 +166,7 @@ def load_person_gazette_data_from_JSON(gazette_number: str, date_str: str) -> di
 
     Note: date_str passed with hyphens ('YYYY-MM-DD') will be
     converted to underscores to match filenames.
-    """
 
-    # Convert hyphens to underscores so "2022-07-22" matches "2022_07_22"
-    normalized_date_str = date_str.replace("-", "_")
-
-    expected_suffix = f"{gazette_number}_E_{normalized_date_str}.json"
-
-    matching_files = [
-        f for f in PERSON_INPUT_DIR.iterdir()
-        if f.is_file() and f.name.endswith(expected_suffix) and f.name.startswith("persons-")
-    ]
-
-    if not matching_files:
-        raise FileNotFoundError(
-            f"Gazette file for {gazette_number}, {date_str} not found."
-        )
-
-    if len(matching_files) > 1:
-        print(f"⚠️ Multiple gazette files found, using the first one: {matching_files[0].name}")
-
-    json_path = matching_files[0]
-    try:
-        with open(json_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON format in {json_path}: {e}")
\ No newline at end of file
+    Raises AmbiguousGazetteFileError if more than one file matches.
+    """
+    return input_catalog.load("person", gazette_number, date_str)
@@ -0,0 +1,428 @@
+"""
+Graph storage backends for the gazette tracer.
+
+Rows are returned as tuples in the column order of the original Cypher
+queries, which is how Neo4j records serialise to JSON, so the API responses
+are the same whichever backend is configured.
+"""
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from doctracer import Neo4jInterface
+from gazettetracer.dates import parse_gazette_date
+from gazettetracer.setup_database import (MERGE_GAZETTES, MERGE_RELATIONSHIPS, bump_data_version,
+                                          delete_gazette_data, ensure_constraints, get_data_version,
+                                          rebuild_closure)
+
+BACKENDS = ("neo4j", "embedded")
+DEFAULT_BACKEND = os.getenv("GAZETTE_BACKEND", "neo4j")
+DEFAULT_DB_PATH = os.getenv("GAZETTE_DB_PATH", "gazettes.sqlite")
+
+Row = Tuple
+GAZETTE_FIELDS = ("gazette_id", "date", "url", "name", "description")
+
+# Column names of the rows each read returns.
+GAZETTE_COLUMNS = ("id", "date", "name", "url")
+GRAPH_COLUMNS = ("child_id", "parent_id", "child_date", "parent_date", "child_url", "parent_url")
+CHAIN_COLUMNS = GAZETTE_COLUMNS + ("depth",)
+
+
+def chain_key(row: Row) -> Tuple:
+    """
+    Sort key of an (id, date, name, url, depth) row: depth, then gazette date
+    (undated last), then id. Dates are stored as written (2020-Aug-09,
+    2022-09-16, ...), so chains are sorted here rather than by the raw string.
+    """
+    parsed = parse_gazette_date(row[1])
+    return row[4], parsed is None, parsed.isoformat() if parsed else "", row[0]
+
+
+class GraphBackend(ABC):
+    """Storage for Gazette nodes and child-[AMENDS]->parent edges."""
+
+    @abstractmethod
+    def get_timeline(self) -> List[Row]:
+        """(id, date, name, url) of every gazette, ordered by date."""
+
+    @abstractmethod
+    def get_graph(self) -> List[Row]:
+        """(child_id, parent_id, child_date, parent_date, child_url, parent_url) of every AMENDS edge."""
+
+    @abstractmethod
+    def get_parents(self) -> List[Row]:
+        """(id, date, name, url) of gazettes that are amended or have no relationships."""
+
+    @abstractmethod
+    def get_ancestors(self, gazette_id: str) -> List[Row]:
+        """(id, date, name, url, depth) of every gazette `gazette_id` transitively amends, nearest first."""
+
+    @abstractmethod
+    def get_descendants(self, gazette_id: str) -> List[Row]:
+        """(id, date, name, url, depth) of every gazette transitively amending `gazette_id`, nearest first."""
+
+    @abstractmethod
+    def get_roots(self, gazette_id: str) -> List[Row]:
+        """(id, date, name, url, depth) of the original gazettes at the top of `gazette_id`'s amendment
+        chains, or of `gazette_id` itself (depth 0) if it amends nothing; empty if it does not exist."""
+
+    @abstractmethod
+    def rebuild_closure(self):
+        """Recompute the transitive amendment index from the AMENDS edges."""
+
+    @abstractmethod
+    def load_gazettes(self, batches: Iterable[List[Dict]]) -> int:
+        """Upsert gazette row batches; returns the rows loaded."""
+
+    @abstractmethod
+    def load_relationships(self, batches: Iterable[List[Dict]]) -> int:
+        """Upsert relationship row batches whose endpoints exist; returns the rows sent."""
+
+    @abstractmethod
+    def delete_all(self):
+        pass
+
+    @abstractmethod
+    def data_version(self) -> str:
+        """Stamp that changes whenever the stored graph does, including writes from other processes."""
+
+    def close(self):
+        pass
+
+
+class Neo4jBackend(GraphBackend):
+    def __init__(self, neo4j: Optional[Neo4jInterface] = None):
+        self.neo4j = neo4j or Neo4jInterface()
+
+    def _rows(self, query, parameters=None) -> List[Row]:
+        return [tuple(record.values()) for record in self.neo4j.execute_query(query, parameters)]
+
+    def get_timeline(self):
+        query = """
+        MATCH (g:Gazette)
+        RETURN g.gazette_id AS id,
+               g.date AS date,
+               g.name AS name,
+               g.url AS url
+        ORDER BY g.date
+        """
+        return self._rows(query)
+
+    def get_graph(self):
+        query = """
+        MATCH (child:Gazette)-[r:AMENDS]->(parent:Gazette)
+        RETURN child.gazette_id AS child_id,
+               parent.gazette_id AS parent_id,
+               child.date AS child_date,
+               parent.date AS parent_date,
+               child.url AS child_url,
+               parent.url AS parent_url
+        """
+        return self._rows(query)
+
+    def get_parents(self):
+        query = """
+        MATCH (node:Gazette)
+        WHERE NOT (node)--()
+        RETURN DISTINCT node.gazette_id AS id,
+               node.date AS date,
+               node.name AS name,
+               node.url AS url
+        UNION
+        MATCH (child:Gazette)-[:AMENDS]->(parent:Gazette)
+        RETURN DISTINCT parent.gazette_id AS id,
+               parent.date AS date,
+               parent.name AS name,
+               parent.url AS url
+        """
+        return self._rows(query)
+
+    def get_ancestors(self, gazette_id):
+        query = """
+        MATCH (:Gazette {gazette_id: $gazette_id})-[c:AMENDS_CLOSURE]->(ancestor:Gazette)
+        RETURN ancestor.gazette_id AS id, ancestor.date AS date, ancestor.name AS name, ancestor.url AS url,
+               c.depth AS depth
+        """
+        return sorted(self._rows(query, {"gazette_id": gazette_id}), key=chain_key)
+
+    def get_descendants(self, gazette_id):
+        query = """
+        MATCH (:Gazette {gazette_id: $gazette_id})<-[c:AMENDS_CLOSURE]-(descendant:Gazette)
+        RETURN descendant.gazette_id AS id, descendant.date AS date, descendant.name AS name,
+               descendant.url AS url, c.depth AS depth
+        """
+        return sorted(self._rows(query, {"gazette_id": gazette_id}), key=chain_key)
+
+    def get_roots(self, gazette_id):
+        query = """
+        MATCH (g:Gazette {gazette_id: $gazette_id})
+        OPTIONAL MATCH (g)-[c:AMENDS_CLOSURE]->(ancestor:Gazette)
+        WHERE NOT (ancestor)-[:AMENDS]->()
+        WITH coalesce(ancestor, g) AS root, coalesce(c.depth, 0) AS depth
+        RETURN root.gazette_id AS id, root.date AS date, root.name AS name, root.url AS url, depth
+        """
+        rows = sorted(self._rows(query, {"gazette_id": gazette_id}), key=chain_key)
+        return sorted(rows, key=lambda row: -row[4])
+
+    def rebuild_closure(self):
+        rebuild_closure(self.neo4j)
+        bump_data_version(self.neo4j)
+
+    def load_gazettes(self, batches):
+        ensure_constraints(self.neo4j)
+        count = self.neo4j.execute_batches(MERGE_GAZETTES, batches)
+        bump_data_version(self.neo4j)
+        return count
+
+    def load_relationships(self, batches):
+        ensure_constraints(self.neo4j)
+        count = self.neo4j.execute_batches(MERGE_RELATIONSHIPS, batches)
+        bump_data_version(self.neo4j)
+        return count
+
+    def delete_all(self):
+        delete_gazette_data(self.neo4j)
+        bump_data_version(self.neo4j)
+
+    def data_version(self):
+        return get_data_version(self.neo4j)
+
+    def close(self):
+        self.neo4j.close()
+
+
+class EmbeddedBackend(GraphBackend):
+    """
+    In-process graph: gazettes and AMENDS edges are held in dicts with parent
+    and child adjacency indexes, and written through to a SQLite file that is
+    read back on start, and again whenever data_version finds that another
+    process (such as the insert command) has written to it. Other reads never
+    touch SQLite.
+
+    A closure table maps every gazette to each gazette it transitively amends
+    with the shortest depth. It is extended incrementally as edges are added,
+    so ancestor, descendant and root queries are a single dict lookup.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS gazettes ("
+                "gazette_id TEXT PRIMARY KEY, date TEXT, url TEXT, name TEXT, description TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS amends ("
+                "child_id TEXT, parent_id TEXT, parent_date TEXT, child_date TEXT, PRIMARY KEY (child_id, parent_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS amends_closure ("
+                "descendant_id TEXT, ancestor_id TEXT, depth INTEGER, PRIMARY KEY (descendant_id, ancestor_id))"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._load()
+
+    def _load(self):
+        """(Re)read the graph from SQLite, e.g. after another process wrote to it."""
+        with self._lock:
+            # Read the stamp first: a write landing mid-load leaves it stale, so the next check reloads again.
+            self._version = self._stored_version()
+            self.nodes: Dict[str, Dict] = {}
+            self.parents: Dict[str, Dict[str, Dict]] = {}
+            self.children: Dict[str, Dict[str, Dict]] = {}
+            self.ancestors: Dict[str, Dict[str, int]] = {}
+            self.descendants: Dict[str, Dict[str, int]] = {}
+            for row in self._conn.execute(
+                "SELECT gazette_id, date, url, name, description FROM gazettes ORDER BY rowid"
+            ):
+                self.nodes[row[0]] = dict(zip(GAZETTE_FIELDS, row))
+            for child_id, parent_id, parent_date, child_date in self._conn.execute(
+                "SELECT child_id, parent_id, parent_date, child_date FROM amends ORDER BY rowid"
+            ):
+                self._link(child_id, parent_id, {"parent_date": parent_date, "child_date": child_date})
+            for descendant_id, ancestor_id, depth in self._conn.execute(
+                "SELECT descendant_id, ancestor_id, depth FROM amends_closure"
+            ):
+                self._set_depth(descendant_id, ancestor_id, depth)
+            if self.parents and not self.ancestors:
+                self.rebuild_closure()
+
+    def _stored_version(self) -> str:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        return row[0] if row else ""
+
+    def _bump_version(self):
+        """Stamp a new data version; call inside the write's transaction."""
+        self._version = uuid.uuid4().hex
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('data_version', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (self._version,),
+        )
+
+    def data_version(self):
+        with self._lock:
+            if self._stored_version() != self._version:
+                self._load()
+            return self._version
+
+    def _set_depth(self, descendant_id, ancestor_id, depth):
+        self.ancestors.setdefault(descendant_id, {})[ancestor_id] = depth
+        self.descendants.setdefault(ancestor_id, {})[descendant_id] = depth
+
+    def _extend_closure(self, child_id, parent_id) -> List[Tuple[str, str, int]]:
+        """Add the paths through a new child->parent edge; returns the closure rows that changed."""
+        lower = {child_id: 0, **self.descendants.get(child_id, {})}
+        upper = {parent_id: 0, **self.ancestors.get(parent_id, {})}
+        changed = []
+        for descendant_id, down in lower.items():
+            for ancestor_id, up in upper.items():
+                if descendant_id == ancestor_id:
+                    continue
+                depth = down + 1 + up
+                current = self.ancestors.get(descendant_id, {}).get(ancestor_id)
+                if current is None or depth < current:
+                    self._set_depth(descendant_id, ancestor_id, depth)
+                    changed.append((descendant_id, ancestor_id, depth))
+        return changed
+
+    def _save_closure(self, rows):
+        self._conn.executemany(
+            "INSERT INTO amends_closure (descendant_id, ancestor_id, depth) VALUES (?, ?, ?) "
+            "ON CONFLICT (descendant_id, ancestor_id) DO UPDATE SET depth = excluded.depth",
+            rows,
+        )
+
+    def _link(self, child_id, parent_id, edge):
+        self.parents.setdefault(child_id, {})[parent_id] = edge
+        self.children.setdefault(parent_id, {})[child_id] = edge
+
+    def _summary(self, gazette_id) -> Row:
+        node = self.nodes[gazette_id]
+        return node["gazette_id"], node["date"], node["name"], node["url"]
+
+    def get_timeline(self):
+        with self._lock:
+            # Cypher sorts nulls last.
+            nodes = sorted(self.nodes.values(), key=lambda node: (node["date"] is None, node["date"] or ""))
+            return [self._summary(node["gazette_id"]) for node in nodes]
+
+    def get_graph(self):
+        rows = []
+        with self._lock:
+            for child_id, parents in self.parents.items():
+                child = self.nodes[child_id]
+                for parent_id in parents:
+                    parent = self.nodes[parent_id]
+                    rows.append((child_id, parent_id, child["date"], parent["date"], child["url"], parent["url"]))
+        return rows
+
+    def get_parents(self):
+        with self._lock:
+            isolated = [gazette_id for gazette_id in self.nodes
+                        if not self.parents.get(gazette_id) and not self.children.get(gazette_id)]
+            amended = [gazette_id for gazette_id, children in self.children.items() if children]
+            return [self._summary(gazette_id) for gazette_id in dict.fromkeys(isolated + amended)]
+
+    def _chain(self, depths: Dict[str, int]) -> List[Row]:
+        return sorted((self._summary(gazette_id) + (depth,) for gazette_id, depth in depths.items()), key=chain_key)
+
+    def get_ancestors(self, gazette_id):
+        with self._lock:
+            return self._chain(self.ancestors.get(gazette_id, {}))
+
+    def get_descendants(self, gazette_id):
+        with self._lock:
+            return self._chain(self.descendants.get(gazette_id, {}))
+
+    def get_roots(self, gazette_id):
+        with self._lock:
+            if gazette_id not in self.nodes:
+                return []
+            ancestors = self.ancestors.get(gazette_id, {})
+            roots = {ancestor_id: depth for ancestor_id, depth in ancestors.items() if not self.parents.get(ancestor_id)}
+            rows = self._chain(roots or {gazette_id: 0})
+        return sorted(rows, key=lambda row: -row[4])
+
+    def rebuild_closure(self):
+        with self._lock, self._conn:
+            self.ancestors, self.descendants = {}, {}
+            for child_id, parents in self.parents.items():
+                for parent_id in parents:
+                    self._extend_closure(child_id, parent_id)
+            self._conn.execute("DELETE FROM amends_closure")
+            self._save_closure([
+                (descendant_id, ancestor_id, depth)
+                for descendant_id, ancestors in self.ancestors.items() for ancestor_id, depth in ancestors.items()
+            ])
+            self._bump_version()
+
+    def load_gazettes(self, batches):
+        count = 0
+        for rows in batches:
+            records = [tuple(row.get(field) for field in GAZETTE_FIELDS) for row in rows]
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO gazettes (gazette_id, date, url, name, description) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (gazette_id) DO UPDATE SET date = excluded.date, url = excluded.url, "
+                    "name = excluded.name, description = excluded.description",
+                    records,
+                )
+                for record in records:
+                    self.nodes[record[0]] = dict(zip(GAZETTE_FIELDS, record))
+                self._bump_version()
+            count += len(rows)
+        return count
+
+    def load_relationships(self, batches):
+        count = 0
+        for rows in batches:
+            with self._lock, self._conn:
+                # Like MATCH in the Neo4j loader, edges to unknown gazettes are skipped.
+                records = [
+                    (row["child_id"], row["parent_id"], row.get("parent_date"), row.get("child_date"))
+                    for row in rows if row["child_id"] in self.nodes and row["parent_id"] in self.nodes
+                ]
+                self._conn.executemany(
+                    "INSERT INTO amends (child_id, parent_id, parent_date, child_date) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (child_id, parent_id) DO UPDATE SET "
+                    "parent_date = excluded.parent_date, child_date = excluded.child_date",
+                    records,
+                )
+                changed = []
+                for child_id, parent_id, parent_date, child_date in records:
+                    is_new = parent_id not in self.parents.get(child_id, {})
+                    self._link(child_id, parent_id, {"parent_date": parent_date, "child_date": child_date})
+                    if is_new:
+                        changed.extend(self._extend_closure(child_id, parent_id))
+                self._save_closure(changed)
+                self._bump_version()
+            count += len(rows)
+        return count
+
+    def delete_all(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM amends_closure")
+            self._conn.execute("DELETE FROM amends")
+            self._conn.execute("DELETE FROM gazettes")
+            self.nodes, self.parents, self.children = {}, {}, {}
+            self.ancestors, self.descendants = {}, {}
+            self._bump_version()
+
+    def close(self):
+        self._conn.close()
+
+
+def create_backend(name: str = DEFAULT_BACKEND, neo4j: Optional[Neo4jInterface] = None,
+                   db_path: str = DEFAULT_DB_PATH) -> GraphBackend:
+    """Backend selected by name ("neo4j" or "embedded"), by default from GAZETTE_BACKEND."""
+    if name == "neo4j":
+        return Neo4jBackend(neo4j)
+    if name == "embedded":
+        return EmbeddedBackend(db_path)
+    raise ValueError(f"Unsupported backend: {name}")
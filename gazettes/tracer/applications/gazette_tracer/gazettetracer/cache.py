@@ -0,0 +1,92 @@
+"""
+Response cache for the read endpoints.
+
+The graph only changes on insert, delete or reindex, each of which replaces
+the backend's data version stamp. Serialised responses are cached with their
+ETag until the stamp changes; the stamp itself is re-read at most every
+`check_interval` seconds, so most requests never reach the backend.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+DEFAULT_CHECK_INTERVAL = float(os.getenv("GAZETTE_VERSION_CHECK_INTERVAL", "1.0"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("GAZETTE_CACHE_ENTRIES", "256"))
+
+
+def dumps(data: Any) -> bytes:
+    """Serialise to JSON bytes with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def encode_json(data: Any) -> Tuple[bytes, str]:
+    """(body, etag) of `data`; the ETag is derived from the body, so it is stable across restarts."""
+    body = dumps(data)
+    return body, hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """LRU of values keyed by request, all dropped when the data version changes."""
+
+    def __init__(self, version: Callable[[], str], check_interval: float = DEFAULT_CHECK_INTERVAL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._version = version
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._current = None
+        self._checked_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+
+    def version(self) -> str:
+        """Current data version, clearing the cache if it has changed since the last check."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._current
+        current = self._version()
+        with self._lock:
+            if current != self._current:
+                self._entries.clear()
+                self._current = current
+            self._checked_at = now
+            return current
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        version = self.version()
+        key = (version, key)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        # Built outside the lock; concurrent misses for one key may both build it.
+        value = build()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_json(self, key: Hashable, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        """Cached `encode_json` of what `build` returns."""
+        return self.get(("json", key), lambda: encode_json(build()))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = float("-inf")
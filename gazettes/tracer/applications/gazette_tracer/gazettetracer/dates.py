@@ -0,0 +1,21 @@
+import re
+from datetime import date
+from typing import Optional
+
+# Gazette dates are written as 2020-Aug-09, 2020-SEP-25, 2022-September-16 or 2022-09-16.
+DATE_PATTERN = re.compile(r"^\s*(\d{4})-([A-Za-z]+|\d{1,2})-(\d{1,2})\s*$")
+MONTHS = {name: number for number, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+
+def parse_gazette_date(value: Optional[str]) -> Optional[date]:
+    """Parse a gazette date, or return None if it is missing or malformed."""
+    match = DATE_PATTERN.match(value or "")
+    if not match:
+        return None
+    year, month, day = match.groups()
+    month = int(month) if month.isdigit() else MONTHS.get(month[:3].lower())
+    try:
+        return date(int(year), month, int(day))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,264 @@
+"""
+Download-and-extract pipeline behind /extract-text.
+
+PDFs are streamed through one pooled HTTP session into a temporary file,
+hashed on the way, and capped at `max_bytes`. Page text is kept in
+doctracer's page-text cache, keyed by content hash, and a small URL index
+records each URL's hash, page count and ETag/Last-Modified validators. A
+repeat request for pages already extracted is answered from the cache without
+touching the network; once an entry is older than `max_age`, it is revalidated
+with a conditional GET first.
+
+Extractions run on a thread pool, so a request can wait a bounded time and
+otherwise hand back a job id to poll, and concurrent requests for the same
+document share one job.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from doctracer.extract import extract_pages, parse_page_range
+from doctracer.extract.pdf_extractor import get_page_text_cache, page_count
+
+BACKEND = "pdfplumber"
+DEFAULT_CACHE_PATH = os.getenv("GAZETTE_TEXT_CACHE", "gazette_text.sqlite")
+DEFAULT_MAX_BYTES = int(float(os.getenv("GAZETTE_MAX_PDF_MB", "50")) * 1024 * 1024)
+DEFAULT_MAX_AGE = float(os.getenv("GAZETTE_TEXT_MAX_AGE", str(24 * 60 * 60)))
+DEFAULT_TIMEOUT = (5, float(os.getenv("GAZETTE_DOWNLOAD_TIMEOUT", "30")))  # (connect, read) seconds
+DEFAULT_WORKERS = int(os.getenv("GAZETTE_EXTRACT_WORKERS", "4"))
+# Seconds a synchronous /extract-text request waits before answering with a job id.
+DEFAULT_WAIT = float(os.getenv("GAZETTE_EXTRACT_WAIT", "20"))
+CHUNK_SIZE = 1 << 16
+# Finished jobs are kept this long for polling.
+JOB_TTL = 60 * 60
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class DownloadError(Exception):
+    """The PDF could not be fetched."""
+
+
+class DownloadTooLarge(DownloadError):
+    """The PDF is larger than the configured limit."""
+
+
+class InvalidPageRange(ValueError):
+    """The requested pages are malformed or outside the document."""
+
+
+def get_session(pool_size: int = DEFAULT_WORKERS * 2) -> requests.Session:
+    """Process-wide session, so connections to the gazette host are reused."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504),
+                          allowed_methods=("GET",))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+class UrlIndex:
+    """SQLite map of PDF URL to its content hash, page count and HTTP validators."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "url TEXT PRIMARY KEY, sha256 TEXT, pages INTEGER, etag TEXT, last_modified TEXT, checked_at REAL)"
+            )
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, pages, etag, last_modified, checked_at FROM documents WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("sha256", "pages", "etag", "last_modified", "checked_at"), row))
+
+    def put(self, url: str, sha256: str, pages: int, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (url, sha256, pages, etag, last_modified, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, sha256, pages, etag, last_modified, time.time()),
+            )
+
+    def touch(self, url: str):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE documents SET checked_at = ? WHERE url = ?", (time.time(), url))
+
+    def close(self):
+        self._conn.close()
+
+
+def download_pdf(url: str, dest, session: Optional[requests.Session] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 headers: Optional[Dict] = None, timeout=DEFAULT_TIMEOUT) -> Optional[Tuple[str, requests.Response]]:
+    """
+    Stream `url` into the open binary file `dest`. Returns (sha256, response),
+    or None if the server answered 304 to conditional `headers`.
+    """
+    session = session or get_session()
+    try:
+        with session.get(url, stream=True, timeout=timeout, headers=headers or {}) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            length = response.headers.get("Content-Length")
+            if length and length.isdigit() and int(length) > max_bytes:
+                raise DownloadTooLarge(f"{url} is {int(length)} bytes, over the {max_bytes} byte limit")
+            digest = hashlib.sha256()
+            size = 0
+            for chunk in response.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise DownloadTooLarge(f"{url} is over the {max_bytes} byte limit")
+                digest.update(chunk)
+                dest.write(chunk)
+            dest.flush()
+            return digest.hexdigest(), response
+    except requests.RequestException as e:
+        raise DownloadError(f"Failed to download {url}: {e}")
+
+
+class TextExtractor:
+    """Cached, deduplicated text extraction of PDFs by URL."""
+
+    def __init__(self, index: Optional[UrlIndex] = None, session: Optional[requests.Session] = None,
+                 page_cache=None, workers: int = DEFAULT_WORKERS, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: float = DEFAULT_MAX_AGE):
+        self.index = index or UrlIndex()
+        self.session = session
+        self.page_cache = page_cache or get_page_text_cache()
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract-text")
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, Optional[str]], Future] = {}
+        self._jobs: Dict[str, Tuple[Future, float]] = {}
+
+    def cached(self, url: str, pages: Optional[str] = None) -> Optional[str]:
+        """Text of `pages` of `url` if every page is cached and the entry is fresh, else None."""
+        doc = self.index.get(url)
+        if doc is None or time.time() - doc["checked_at"] > self.max_age:
+            return None
+        return self._cached_text(doc, pages)
+
+    def _cached_text(self, doc: Dict, pages: Optional[str]) -> Optional[str]:
+        indices = self._indices(pages, doc["pages"])
+        texts = self.page_cache.get_many(doc["sha256"], BACKEND, indices)
+        if len(texts) < len(set(indices)):
+            return None
+        return "\n".join(texts[idx] for idx in indices)
+
+    @staticmethod
+    def _indices(pages: Optional[str], count: int) -> List[int]:
+        if not pages:
+            return list(range(count))
+        try:
+            selected = parse_page_range(pages, count)
+        except ValueError as e:
+            raise InvalidPageRange(f"{e} for a document of {count} pages")
+        if not selected:
+            raise InvalidPageRange(f"Page range {pages!r} selects none of the document's {count} pages")
+        return [page - 1 for page in selected]
+
+    def extract(self, url: str, pages: Optional[str] = None) -> str:
+        """Text of `pages` (a range such as "1-3,7", all by default) of the PDF at `url`."""
+        text = self.cached(url, pages)
+        if text is not None:
+            return text
+        doc = self.index.get(url)
+        headers = {}
+        if doc and self._cached_text(doc, pages) is not None:
+            # Everything needed is cached; only ask whether the document changed.
+            if doc["etag"]:
+                headers["If-None-Match"] = doc["etag"]
+            if doc["last_modified"]:
+                headers["If-Modified-Since"] = doc["last_modified"]
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as temp_file:
+            result = download_pdf(url, temp_file, self.session, self.max_bytes, headers)
+            if result is None:
+                self.index.touch(url)
+                return self._cached_text(doc, pages)
+            sha256, response = result
+            count = page_count(temp_file.name)
+            # Indexed before the pages are checked, so a bad range is refused up front next time.
+            self.index.put(url, sha256, count, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            indices = [idx + 1 for idx in self._indices(pages, count)]
+            texts = extract_pages(temp_file.name, indices, BACKEND, cache=self.page_cache)
+        return "\n".join(texts)
+
+    def submit(self, url: str, pages: Optional[str] = None) -> str:
+        """
+        Start (or join) an extraction of `url` in the background; returns its
+        job id. Raises InvalidPageRange up front if `pages` select nothing in
+        the document as last downloaded.
+        """
+        doc = self.index.get(url)
+        if doc is not None:
+            self._indices(pages, doc["pages"])
+        key = (url, pages or None)
+        with self._lock:
+            self._expire_jobs()
+            future = self._inflight.get(key)
+            started = future is None
+            if started:
+                future = self._pool.submit(self.extract, url, pages)
+                self._inflight[key] = future
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = (future, time.time())
+        if started:
+            # Outside the lock: a job that has already finished runs the callback, and so _finish, right here.
+            future.add_done_callback(lambda _: self._finish(key, future))
+        return job_id
+
+    def _finish(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _expire_jobs(self):
+        cutoff = time.time() - JOB_TTL
+        for job_id, (future, created) in list(self._jobs.items()):
+            if future.done() and created < cutoff:
+                del self._jobs[job_id]
+
+    def future(self, job_id: str) -> Optional[Future]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job[0] if job else None
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """{"status": "running" | "done" | "failed", ...} of a job, or None if unknown."""
+        future = self.future(job_id)
+        if future is None:
+            return None
+        if not future.done():
+            return {"job_id": job_id, "status": "running"}
+        error = future.exception()
+        if error is not None:
+            return {"job_id": job_id, "status": "failed", "error": str(error)}
+        return {"job_id": job_id, "status": "done", "text": future.result()}
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.index.close()
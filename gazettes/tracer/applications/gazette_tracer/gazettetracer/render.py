@@ -1,16 +1,57 @@
-from flask import Flask, request, jsonify
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from urllib.parse import urlencode
+from flask import Flask, current_app, request, jsonify, url_for
 from flask_cors import CORS
 from doctracer import Neo4jInterface
-from gazettetracer.setup_database import (load_gazette_data_from_csv,
-                                        load_relationships_from_csv, 
-                                        delete_gazette_data)
-from gazettetracer.services import GazetteService
+from gazettetracer.backends import BACKENDS, DEFAULT_BACKEND, GAZETTE_COLUMNS, GRAPH_COLUMNS, create_backend
+from doctracer.extract import parse_page_range
+from gazettetracer.cache import ResponseCache, encode_json
+from gazettetracer.extraction import DEFAULT_WAIT, DownloadError, DownloadTooLarge, InvalidPageRange
+from gazettetracer.setup_database import DEFAULT_BATCH_SIZE, iter_csv_batches
+from gazettetracer.dates import parse_gazette_date
+from gazettetracer.services import GazetteService, decode_cursor
 import click
 
+MAX_PAGE_SIZE = 1000
+# Upper bound used only to validate the syntax of a page range before the document is known.
+MAX_PAGE_NUMBER = 100000
+FORMATS = ("rows", "objects")
+
+
+def as_objects(rows, columns):
+    """Rows as dicts keyed by column name, for ?format=objects."""
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def parse_timeline_args(args):
+    """Validated (format, start, end, limit, cursor) of a /timeline query string; raises ValueError."""
+    fmt = args.get('format', 'rows')
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    bounds = []
+    for name in ('from', 'to'):
+        value = args.get(name)
+        parsed = parse_gazette_date(value) if value else None
+        if value and parsed is None:
+            raise ValueError(f"Invalid date for {name}: {value}")
+        bounds.append(parsed)
+    limit = args.get('limit')
+    if limit is not None:
+        if not limit.isdigit() or not 0 < int(limit) <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        limit = int(limit)
+    cursor = args.get('cursor') or None
+    if cursor:
+        decode_cursor(cursor)
+    return fmt, bounds[0], bounds[1], limit, cursor
+
 class GazetteTracer:
     _instance = None
     _neo4j = None
+    _backend = None
     _service = None
+    _cache = None
+    backend_name = DEFAULT_BACKEND
 
     @classmethod
     def get_instance(cls):
@@ -24,16 +65,68 @@ class GazetteTracer:
             self._neo4j = Neo4jInterface()
         return self._neo4j
 
+    @property
+    def backend(self):
+        """Graph backend named by `backend_name` (GAZETTE_BACKEND or the --backend option)."""
+        if self._backend is None:
+            neo4j = self.neo4j if self.backend_name == "neo4j" else None
+            self._backend = create_backend(self.backend_name, neo4j=neo4j)
+        return self._backend
+
     @property
     def service(self):
         if self._service is None:
-            self._service = GazetteService(self.neo4j)
+            self._service = GazetteService(self.backend)
         return self._service
 
+    @property
+    def cache(self):
+        """Response cache, invalidated when the backend's data version changes."""
+        if self._cache is None:
+            self._cache = ResponseCache(self.backend.data_version)
+        return self._cache
+
+    def json_response(self, body, etag):
+        """JSON response carrying `etag`, answered with 304 when the client already has it."""
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    def cached_rows(self, name, fetch, columns):
+        """Cached response for a full read endpoint, as rows or, with ?format=objects, dicts."""
+        fmt = request.args.get('format', 'rows')
+        if fmt not in FORMATS:
+            return jsonify({'error': f"format must be one of {', '.join(FORMATS)}"}), 400
+        body, etag = self.cache.get_json(
+            (name, fmt), lambda: as_objects(fetch(), columns) if fmt == 'objects' else fetch()
+        )
+        return self.json_response(body, etag)
+
+    def timeline_response(self):
+        try:
+            fmt, start, end, limit, cursor = parse_timeline_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        def build():
+            keys, rows = self.cache.get('sorted-timeline', self.service.get_sorted_timeline)
+            rows, next_cursor = self.service.timeline_page(keys, rows, start, end, limit, cursor)
+            body, etag = encode_json(as_objects(rows, GAZETTE_COLUMNS) if fmt == 'objects' else rows)
+            return body, etag, next_cursor
+
+        body, etag, next_cursor = self.cache.get(('timeline', fmt, start, end, limit, cursor), build)
+        response = self.json_response(body, etag)
+        if next_cursor:
+            query = urlencode({**request.args.to_dict(), 'cursor': next_cursor})
+            response.headers['X-Next-Cursor'] = next_cursor
+            response.headers['Link'] = f'<{request.base_url}?{query}>; rel="next"'
+        return response
+
     def create_app(self):
         """Create and configure the Flask application."""
         app = Flask(__name__)
-        CORS(app)  # TODO: Replace with specific origins in production
+        CORS(app, expose_headers=['ETag', 'Link', 'X-Next-Cursor'])  # TODO: Replace with specific origins in production
         self.register_routes(app)
         return app
 
@@ -43,44 +136,102 @@ class GazetteTracer:
         @app.route("/timeline")
         def timeline():
             try:
-                results = self.service.get_timeline()
-                return jsonify(results)
+                return self.timeline_response()
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
 
         @app.route("/graph")
         def graph():
             try:
-                results = self.service.get_graph()
-                return jsonify(results)
+                return self.cached_rows('graph', self.service.get_graph, GRAPH_COLUMNS)
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
 
         @app.route("/parents")
         def parents():
             try:
-                results = self.service.get_parents()
+                return self.cached_rows('parents', self.service.get_parents, GAZETTE_COLUMNS)
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/ancestors/<path:gazette_id>")
+        def ancestors(gazette_id):
+            try:
+                results = self.service.get_ancestors(gazette_id)
+                return jsonify(results)
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/descendants/<path:gazette_id>")
+        def descendants(gazette_id):
+            try:
+                results = self.service.get_descendants(gazette_id)
+                return jsonify(results)
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/root/<path:gazette_id>")
+        def root(gazette_id):
+            try:
+                results = self.service.get_roots(gazette_id)
+                if not results:
+                    return jsonify({'error': f'Gazette {gazette_id} not found'}), 404
                 return jsonify(results)
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
 
         @app.route('/extract-text', methods=['POST'])
         def extract_text():
-            pdf_url = request.json.get('pdf_url')
+            body = request.get_json(silent=True) or {}
+            pdf_url = body.get('pdf_url')
             if not pdf_url:
                 return jsonify({'error': 'No PDF URL provided'}), 400
+            pages = body.get('pages') or None
+            if pages:
+                try:
+                    parse_page_range(str(pages), MAX_PAGE_NUMBER)
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+                pages = str(pages)
 
             try:
-                text_content = self.service.extract_text(pdf_url)
-                return jsonify({'text': text_content})
+                text_content = self.service.cached_text(pdf_url, pages)
+                if text_content is not None:
+                    return jsonify({'text': text_content})
+                job_id = self.service.submit_extraction(pdf_url, pages)
+                if not body.get('async'):
+                    # Wait a bounded time so slow documents don't hold the worker; poll the job after that.
+                    text_content = self.service.extractor.future(job_id).result(timeout=DEFAULT_WAIT)
+                    return jsonify({'text': text_content})
+            except FutureTimeoutError:
+                pass
+            except InvalidPageRange as e:
+                return jsonify({'error': str(e)}), 400
+            except DownloadTooLarge as e:
+                return jsonify({'error': str(e)}), 413
+            except DownloadError as e:
+                return jsonify({'error': str(e)}), 502
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
+            status_url = url_for('extraction_job', job_id=job_id)
+            response = jsonify({'job_id': job_id, 'status': 'running', 'status_url': status_url})
+            response.headers['Location'] = status_url
+            return response, 202
+
+        @app.route('/extract-text/jobs/<job_id>')
+        def extraction_job(job_id):
+            status = self.service.extraction_job(job_id)
+            if status is None:
+                return jsonify({'error': f'Job {job_id} not found'}), 404
+            return jsonify(status)
 
 # CLI Commands
 @click.group()
-def cli():
+@click.option('--backend', type=click.Choice(BACKENDS), default=DEFAULT_BACKEND, show_default=True,
+              help='Graph backend; embedded stores the graph in memory and in GAZETTE_DB_PATH (SQLite).')
+def cli(backend):
     """Gazette Tracer CLI tool for managing the application."""
-    pass
+    GazetteTracer.backend_name = backend
 
 @cli.command(name='start')
 @click.option('--host', default='127.0.0.1', help='The host to bind to.')
@@ -95,19 +246,27 @@ def start_server(host, port, debug):
 @cli.command()
 @click.argument('gazette_file', type=click.Path(exists=True))
 @click.argument('gazette_relationship_file', type=click.Path(exists=True))
-def insert(gazette_file, gazette_relationship_file):
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows per transaction.')
+def insert(gazette_file, gazette_relationship_file, batch_size):
     """Insert data from CSV files into the database."""
     gazette_tracer = GazetteTracer.get_instance()
-    load_gazette_data_from_csv(gazette_tracer.neo4j, gazette_file)
-    load_relationships_from_csv(gazette_tracer.neo4j, gazette_relationship_file)
-    click.echo("✓ Data and relationships loaded successfully.")
+    gazettes = gazette_tracer.backend.load_gazettes(iter_csv_batches(gazette_file, batch_size))
+    relationships = gazette_tracer.backend.load_relationships(iter_csv_batches(gazette_relationship_file, batch_size))
+    click.echo(f"✓ {gazettes} gazettes and {relationships} relationships loaded successfully.")
 
 @cli.command()
 def delete():
     """Delete all Gazette data from the database."""
     gazette_tracer = GazetteTracer.get_instance()
-    delete_gazette_data(gazette_tracer.neo4j)
+    gazette_tracer.backend.delete_all()
     click.echo("✓ All Gazette data deleted successfully.")
 
+@cli.command()
+def reindex():
+    """Rebuild the transitive amendment index from the stored relationships."""
+    gazette_tracer = GazetteTracer.get_instance()
+    gazette_tracer.backend.rebuild_closure()
+    click.echo("✓ Amendment index rebuilt successfully.")
+
 if __name__ == '__main__':
     cli()
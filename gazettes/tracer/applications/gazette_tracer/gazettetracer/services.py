@@ -1,71 +1,108 @@
-from typing import List, Dict, Any
-from doctracer.extract import extract_text_from_pdfplumber
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
 from doctracer import Neo4jInterface
-import requests
-import os
-import tempfile
+from gazettetracer.backends import GraphBackend, Neo4jBackend
+from gazettetracer.dates import parse_gazette_date
+from gazettetracer.extraction import TextExtractor
+import base64
+import json
+
+
+def _timeline_key(row: Sequence) -> Tuple[bool, str, str]:
+    """Chronological sort key of a timeline row; undated gazettes go last."""
+    parsed = parse_gazette_date(row[1])
+    return parsed is None, parsed.isoformat() if parsed else "", row[0]
+
+
+def encode_cursor(key: Tuple[bool, str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[bool, str, str]:
+    try:
+        undated, day, gazette_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return bool(undated), str(day), str(gazette_id)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
 
 class GazetteService:
-    def __init__(self, neo4j_interface: Neo4jInterface):
-        self.neo4j = neo4j_interface
+    def __init__(self, backend: Union[GraphBackend, Neo4jInterface], extractor: Optional[TextExtractor] = None):
+        if isinstance(backend, Neo4jInterface):
+            backend = Neo4jBackend(backend)
+        self.backend = backend
+        self._extractor = extractor
+
+    @property
+    def extractor(self) -> TextExtractor:
+        if self._extractor is None:
+            self._extractor = TextExtractor()
+        return self._extractor
 
     def get_timeline(self) -> List[Dict[str, Any]]:
         """Get timeline of all gazettes."""
-        query = """
-        MATCH (g:Gazette)
-        RETURN g.gazette_id AS id,
-               g.date AS date,
-               g.name AS name,
-               g.url AS url
-        ORDER BY g.date
+        return self.backend.get_timeline()
+
+    def get_sorted_timeline(self) -> Tuple[List[Tuple[bool, str, str]], List[Sequence]]:
+        """Sort keys and rows of every gazette in date order, the basis for timeline pages."""
+        ordered = sorted(((_timeline_key(row), row) for row in self.backend.get_timeline()), key=lambda item: item[0])
+        return [key for key, _ in ordered], [row for _, row in ordered]
+
+    @staticmethod
+    def timeline_page(keys: List[Tuple[bool, str, str]], rows: List[Sequence], start: Optional[date] = None,
+                      end: Optional[date] = None, limit: Optional[int] = None,
+                      cursor: Optional[str] = None) -> Tuple[List[Sequence], Optional[str]]:
         """
-        return self.neo4j.execute_query(query)
+        Rows of a `get_sorted_timeline` result dated within [start, end]
+        (either may be open; a bound excludes undated gazettes), after
+        `cursor` and at most `limit` long, with the cursor of the next page or
+        None on the last one.
+        """
+        lo, hi = 0, len(keys)
+        if start:
+            lo = bisect_left(keys, (False, start.isoformat(), ""))
+        if end:
+            hi = bisect_left(keys, (False, (end + timedelta(days=1)).isoformat(), ""))
+        elif start:
+            hi = bisect_left(keys, (True, "", ""))
+        if cursor:
+            lo = max(lo, bisect_right(keys, decode_cursor(cursor)))
+        if limit is not None and lo + limit < hi:
+            return rows[lo:lo + limit], encode_cursor(keys[lo + limit - 1])
+        return rows[lo:hi], None
 
     def get_graph(self) -> List[Dict[str, Any]]:
         """Get graph of gazette relationships."""
-        query = """
-        MATCH (child:Gazette)-[r:AMENDS]->(parent:Gazette)
-        RETURN child.gazette_id AS child_id,
-               parent.gazette_id AS parent_id,
-               child.date AS child_date,
-               parent.date AS parent_date,
-               child.url AS child_url,
-               parent.url AS parent_url
-        """
-        return self.neo4j.execute_query(query)
+        return self.backend.get_graph()
 
     def get_parents(self) -> List[Dict[str, Any]]:
         """Get all parent gazettes."""
-        query = """
-        MATCH (node:Gazette)
-        WHERE NOT (node)--()
-        RETURN DISTINCT node.gazette_id AS id,
-               node.date AS date,
-               node.name AS name,
-               node.url AS url
-        UNION
-        MATCH (child:Gazette)-[:AMENDS]->(parent:Gazette)
-        RETURN DISTINCT parent.gazette_id AS id,
-               parent.date AS date,
-               parent.name AS name,
-               parent.url AS url
-        """
-        return self.neo4j.execute_query(query)
+        return self.backend.get_parents()
+
+    def get_ancestors(self, gazette_id: str) -> List[Dict[str, Any]]:
+        """Get every gazette that a gazette transitively amends, nearest first."""
+        return self.backend.get_ancestors(gazette_id)
+
+    def get_descendants(self, gazette_id: str) -> List[Dict[str, Any]]:
+        """Get every gazette that transitively amends a gazette, nearest first."""
+        return self.backend.get_descendants(gazette_id)
 
-    def extract_text(self, pdf_url: str) -> str:
-        """Extract text from a PDF URL."""
-        # Download the PDF from the URL
-        response = requests.get(pdf_url)
+    def get_roots(self, gazette_id: str) -> List[Dict[str, Any]]:
+        """Get the original gazettes at the top of a gazette's amendment chains."""
+        return self.backend.get_roots(gazette_id)
 
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            temp_file.write(response.content)
-            pdf_path = temp_file.name
+    def extract_text(self, pdf_url: str, pages: Optional[str] = None) -> str:
+        """Extract text from a PDF URL, optionally only `pages` (e.g. "1-3,7")."""
+        return self.extractor.extract(pdf_url, pages)
 
-        # Extract text from the downloaded PDF
-        text = extract_text_from_pdfplumber(pdf_path)
+    def cached_text(self, pdf_url: str, pages: Optional[str] = None) -> Optional[str]:
+        """Already extracted text of a PDF URL, or None."""
+        return self.extractor.cached(pdf_url, pages)
 
-        # Optionally, remove the temporary file
-        os.remove(pdf_path)
+    def submit_extraction(self, pdf_url: str, pages: Optional[str] = None) -> str:
+        """Start extracting text from a PDF URL in the background; returns a job id."""
+        return self.extractor.submit(pdf_url, pages)
 
-        return text 
+    def extraction_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of an extraction job, with its text once done."""
+        return self.extractor.status(job_id)
@@ -1,43 +1,117 @@
+import csv
+import uuid
+from itertools import islice
+
 import click
-import pandas as pd
 from doctracer import Neo4jInterface
 
-neo4j_interface = Neo4jInterface()
-
-def load_gazette_data_from_csv(driver: Neo4jInterface, csv_file: str):
-    # Load CSV data
-    gazettes = pd.read_csv(csv_file)
-    
-    # Insert nodes into Neo4j
-    for _, row in gazettes.iterrows():
-        query = """
-        CREATE (:Gazette {gazette_id: $gazette_id, date: $date, url: $url, name: $name, description: $description})
-        """
-        parameters = {
-            "gazette_id": row["gazette_id"],
-            "date": row["date"],
-            "url": row["url"],
-            "name": row["name"],
-            "description": row["description"],
-        }
-        driver.execute_query(query, parameters)
+DEFAULT_BATCH_SIZE = 1000
+
+GAZETTE_CONSTRAINT = """
+CREATE CONSTRAINT gazette_id_unique IF NOT EXISTS
+FOR (g:Gazette) REQUIRE g.gazette_id IS UNIQUE
+"""
+
+MERGE_GAZETTES = """
+UNWIND $rows AS row
+MERGE (g:Gazette {gazette_id: row.gazette_id})
+SET g.date = row.date, g.url = row.url, g.name = row.name, g.description = row.description
+"""
+
+# Both endpoints are looked up through the gazette_id constraint's index.
+# Each new edge also extends the AMENDS_CLOSURE relationships, which link every
+# gazette to each gazette it transitively amends with the shortest depth, so
+# amendment chains are a single hop to read.
+MERGE_RELATIONSHIPS = """
+UNWIND $rows AS row
+MATCH (parent:Gazette {gazette_id: row.parent_id})
+MATCH (child:Gazette {gazette_id: row.child_id})
+MERGE (child)-[r:AMENDS]->(parent)
+SET r.parent_date = row.parent_date, r.child_date = row.child_date
+WITH child, parent
+CALL {
+    WITH child, parent
+    OPTIONAL MATCH (below:Gazette)-[down:AMENDS_CLOSURE]->(child)
+    WITH child, parent, [{node: child, depth: 0}] + collect({node: below, depth: down.depth}) AS lower
+    OPTIONAL MATCH (parent)-[up:AMENDS_CLOSURE]->(above:Gazette)
+    WITH lower, [{node: parent, depth: 0}] + collect({node: above, depth: up.depth}) AS upper
+    UNWIND lower AS l
+    UNWIND upper AS u
+    WITH l.node AS descendant, u.node AS ancestor, l.depth + 1 + u.depth AS depth
+    WHERE descendant IS NOT NULL AND ancestor IS NOT NULL AND descendant <> ancestor
+    MERGE (descendant)-[c:AMENDS_CLOSURE]->(ancestor)
+    ON CREATE SET c.depth = depth
+    ON MATCH SET c.depth = CASE WHEN depth < c.depth THEN depth ELSE c.depth END
+}
+"""
+
+DELETE_CLOSURE = """
+MATCH (:Gazette)-[c:AMENDS_CLOSURE]->(:Gazette)
+DELETE c
+"""
+
+BUILD_CLOSURE = """
+MATCH path = (descendant:Gazette)-[:AMENDS*1..]->(ancestor:Gazette)
+WHERE descendant <> ancestor
+WITH descendant, ancestor, min(length(path)) AS depth
+MERGE (descendant)-[c:AMENDS_CLOSURE]->(ancestor)
+SET c.depth = depth
+"""
+
+# A stamp replaced on every write, so readers can tell cached results are stale.
+SET_DATA_VERSION = """
+MERGE (m:GazetteMeta {key: 'data_version'})
+SET m.version = $version
+"""
+
+GET_DATA_VERSION = """
+MATCH (m:GazetteMeta {key: 'data_version'})
+RETURN m.version AS version
+"""
+
+
+def iter_csv_batches(csv_file: str, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Stream a CSV as lists of up to `batch_size` row dicts, with empty cells as None."""
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        rows = ({key: value if value != "" else None for key, value in row.items()} for row in csv.DictReader(f))
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+def ensure_constraints(driver: Neo4jInterface):
+    driver.execute_query(GAZETTE_CONSTRAINT)
+
+
+def load_gazette_data_from_csv(driver: Neo4jInterface, csv_file: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Upsert Gazette nodes from a CSV in UNWIND batches; safe to re-run. Returns the rows loaded."""
+    ensure_constraints(driver)
+    return driver.execute_batches(MERGE_GAZETTES, iter_csv_batches(csv_file, batch_size))
 
 # Load relationships CSV
-def load_relationships_from_csv(driver: Neo4jInterface, rel_csv_file: str):
-    relationships = pd.read_csv(rel_csv_file)
-    
-    for _, row in relationships.iterrows():
-        query = """
-        MATCH (parent:Gazette {gazette_id: $parent_id}), (child:Gazette {gazette_id: $child_id})
-        CREATE (child)-[:AMENDS {parent_date: $parent_date, child_date: $child_date}]->(parent)
-        """
-        parameters = {
-            "parent_id": row["parent_id"],
-            "child_id": row["child_id"],
-            "parent_date": row["parent_date"],
-            "child_date": row["child_date"]
-        }
-        driver.execute_query(query, parameters)
+def load_relationships_from_csv(driver: Neo4jInterface, rel_csv_file: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Upsert AMENDS edges from a CSV in UNWIND batches; safe to re-run. Returns the rows loaded."""
+    ensure_constraints(driver)
+    return driver.execute_batches(MERGE_RELATIONSHIPS, iter_csv_batches(rel_csv_file, batch_size))
+
+
+def bump_data_version(driver: Neo4jInterface) -> str:
+    version = uuid.uuid4().hex
+    driver.execute_write(SET_DATA_VERSION, {"version": version})
+    return version
+
+
+def get_data_version(driver: Neo4jInterface) -> str:
+    records = driver.execute_query(GET_DATA_VERSION)
+    return records[0]["version"] if records else ""
+
+
+def rebuild_closure(driver: Neo4jInterface):
+    """Recompute AMENDS_CLOSURE from the AMENDS edges, e.g. for data loaded before it existed."""
+    driver.execute_write(DELETE_CLOSURE)
+    driver.execute_write(BUILD_CLOSURE)
 
 
 def delete_gazette_data(driver: Neo4jInterface):
@@ -57,19 +131,22 @@ def cli():
 @cli.command()
 @click.argument('gazette_file', type=click.Path(exists=True))
 @click.argument('gazette_relationship_file', type=click.Path(exists=True))
-def insert(gazette_file, gazette_relationship_file):
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows per transaction.')
+def insert(gazette_file, gazette_relationship_file, batch_size):
     """Insert data from CSV files into the database."""
-    load_gazette_data_from_csv(neo4j_interface, gazette_file)
-    load_relationships_from_csv(neo4j_interface, gazette_relationship_file)
+    with Neo4jInterface() as neo4j_interface:
+        load_gazette_data_from_csv(neo4j_interface, gazette_file, batch_size)
+        load_relationships_from_csv(neo4j_interface, gazette_relationship_file, batch_size)
+        bump_data_version(neo4j_interface)
     print("Data and relationships loaded successfully.")
 
 @cli.command()
 def delete():
     """Delete all Gazette data from the database."""
-    delete_gazette_data(neo4j_interface)
+    with Neo4jInterface() as neo4j_interface:
+        delete_gazette_data(neo4j_interface)
+        bump_data_version(neo4j_interface)
     print("All Gazette data deleted successfully.")
 
 if __name__ == '__main__':
     cli()
-
-# delete_gazette_data(neo4j_interface)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import gazettetracer from this checkout whether or not it is installed.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+
+from gazettetracer.backends import GAZETTE_COLUMNS, GRAPH_COLUMNS, EmbeddedBackend
+from gazettetracer.setup_database import iter_csv_batches
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DATA = os.path.join(APP_DIR, "data")
+
+
+def _gazette(gazette_id, date):
+    return {"gazette_id": gazette_id, "date": date, "url": f"http://example.org/{gazette_id}.pdf",
+            "name": f"{gazette_id} Extra Ordinary Gazette", "description": "Functions and Amendments"}
+
+
+def _load_sample(backend):
+    backend.load_gazettes([[_gazette("100-1", "2020-01-05"), _gazette("101-1", "2020-03-01")],
+                           [_gazette("102-1", "2020-02-10"), _gazette("103-1", None)]])
+    backend.load_relationships([[
+        {"child_id": "101-1", "parent_id": "100-1", "parent_date": "2020-01-05", "child_date": "2020-03-01"},
+        {"child_id": "102-1", "parent_id": "100-1", "parent_date": "2020-01-05", "child_date": "2020-02-10"},
+        # Like the Neo4j MATCH, edges to gazettes that were never loaded are dropped.
+        {"child_id": "102-1", "parent_id": "999-9", "parent_date": None, "child_date": "2020-02-10"},
+    ]])
+
+
+def test_load_and_upsert(tmp_path):
+    backend = EmbeddedBackend(str(tmp_path / "gazettes.sqlite"))
+    _load_sample(backend)
+    version = backend.data_version()
+
+    assert backend.load_gazettes([[dict(_gazette("101-1", "2020-03-02"), name="Renamed")]]) == 1
+    assert backend.data_version() != version
+    assert len(backend.get_timeline()) == 4
+    assert ("101-1", "2020-03-02", "Renamed", "http://example.org/101-1.pdf") in backend.get_timeline()
+
+    backend.close()
+    reopened = EmbeddedBackend(backend.path)
+    assert reopened.get_timeline() == [
+        ("100-1", "2020-01-05", "100-1 Extra Ordinary Gazette", "http://example.org/100-1.pdf"),
+        ("102-1", "2020-02-10", "102-1 Extra Ordinary Gazette", "http://example.org/102-1.pdf"),
+        ("101-1", "2020-03-02", "Renamed", "http://example.org/101-1.pdf"),
+        ("103-1", None, "103-1 Extra Ordinary Gazette", "http://example.org/103-1.pdf"),
+    ]
+    assert len(reopened.get_graph()) == 2
+
+
+def test_reads_return_the_neo4j_row_shapes(tmp_path):
+    backend = EmbeddedBackend(str(tmp_path / "gazettes.sqlite"))
+    _load_sample(backend)
+
+    timeline = backend.get_timeline()
+    assert all(isinstance(row, tuple) and len(row) == len(GAZETTE_COLUMNS) for row in timeline)
+    # ORDER BY g.date, with undated gazettes last as in Cypher.
+    assert [row[0] for row in timeline] == ["100-1", "102-1", "101-1", "103-1"]
+
+    graph = backend.get_graph()
+    assert all(len(row) == len(GRAPH_COLUMNS) for row in graph)
+    assert sorted(graph) == [
+        ("101-1", "100-1", "2020-03-01", "2020-01-05", "http://example.org/101-1.pdf", "http://example.org/100-1.pdf"),
+        ("102-1", "100-1", "2020-02-10", "2020-01-05", "http://example.org/102-1.pdf", "http://example.org/100-1.pdf"),
+    ]
+
+    # Amended gazettes and those without relationships; the UNION has no order.
+    assert sorted(row[0] for row in backend.get_parents()) == ["100-1", "103-1"]
+    assert all(len(row) == len(GAZETTE_COLUMNS) for row in backend.get_parents())
+
+
+def test_loads_the_sample_csvs(tmp_path):
+    backend = EmbeddedBackend(str(tmp_path / "gazettes.sqlite"))
+    assert backend.load_gazettes(iter_csv_batches(os.path.join(DATA, "gazettes_v2.csv"), 5)) == 16
+    assert backend.load_relationships(
+        iter_csv_batches(os.path.join(DATA, "gazette_relationships_with_dates_v2.csv"), 5)) == 15
+
+    assert [row[0] for row in backend.get_parents()] == ["2187-27"]
+    assert {row[1] for row in backend.get_graph()} == {"2187-27"}
+    assert len(backend.get_descendants("2187-27")) == 15
+
+
+def test_reloads_after_another_process_writes(tmp_path):
+    path = str(tmp_path / "gazettes.sqlite")
+    backend = EmbeddedBackend(path)
+    _load_sample(backend)
+    version = backend.data_version()
+
+    script = (
+        "import sys\n"
+        "from gazettetracer.backends import EmbeddedBackend\n"
+        "backend = EmbeddedBackend(sys.argv[1])\n"
+        "backend.load_gazettes([[{'gazette_id': '104-1', 'date': '2020-04-01'}]])\n"
+        "backend.load_relationships([[{'child_id': '104-1', 'parent_id': '101-1'}]])\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([APP_DIR, os.environ.get("PYTHONPATH", "")]))
+    subprocess.run([sys.executable, "-c", script, path], check=True, env=env)
+
+    # Reads keep serving memory until data_version notices the new stamp.
+    assert len(backend.get_timeline()) == 4
+    assert backend.data_version() != version
+    assert [row[0] for row in backend.get_timeline()][-2:] == ["104-1", "103-1"]
+    assert [row[0] for row in backend.get_ancestors("104-1")] == ["101-1", "100-1"]
@@ -0,0 +1,109 @@
+import random
+from collections import deque
+
+from gazettetracer.backends import EmbeddedBackend, Neo4jBackend
+
+
+def _random_dag(rng, nodes=30, edges=70):
+    """child -> parent edges pointing from later to earlier gazettes, so there are no cycles."""
+    pairs = set()
+    while len(pairs) < edges:
+        parent, child = sorted(rng.sample(range(nodes), 2))
+        pairs.add((f"g{child:02d}", f"g{parent:02d}"))
+    return sorted(pairs)
+
+
+def _shortest_depths(edges):
+    """Breadth-first shortest depth from every gazette to each gazette it transitively amends."""
+    parents = {}
+    for child_id, parent_id in edges:
+        parents.setdefault(child_id, []).append(parent_id)
+    depths = {}
+    for start in parents:
+        seen = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            for parent_id in parents.get(current, []):
+                if parent_id not in seen:
+                    seen[parent_id] = seen[current] + 1
+                    queue.append(parent_id)
+        del seen[start]
+        depths[start] = seen
+    return depths
+
+
+def test_incremental_closure_matches_a_rebuild_and_survives_reload(tmp_path):
+    rng = random.Random(7)
+    edges = _random_dag(rng)
+    ids = sorted({gazette_id for edge in edges for gazette_id in edge})
+    backend = EmbeddedBackend(str(tmp_path / "gazettes.sqlite"))
+    backend.load_gazettes([[{"gazette_id": gazette_id, "date": f"2020-01-{i + 1:02d}"}
+                            for i, gazette_id in enumerate(ids)]])
+    # Edges arrive in random order and batches, as successive inserts would add them.
+    shuffled = rng.sample(edges, len(edges))
+    backend.load_relationships([
+        [{"child_id": child_id, "parent_id": parent_id} for child_id, parent_id in shuffled[i:i + 9]]
+        for i in range(0, len(shuffled), 9)
+    ])
+
+    expected = _shortest_depths(edges)
+    assert {k: v for k, v in backend.ancestors.items() if v} == {k: v for k, v in expected.items() if v}
+    chains = {gazette_id: (backend.get_ancestors(gazette_id), backend.get_descendants(gazette_id),
+                           backend.get_roots(gazette_id)) for gazette_id in ids}
+
+    backend.rebuild_closure()
+    assert {gazette_id: (backend.get_ancestors(gazette_id), backend.get_descendants(gazette_id),
+                         backend.get_roots(gazette_id)) for gazette_id in ids} == chains
+
+    backend.close()
+    reopened = EmbeddedBackend(backend.path)
+    assert {gazette_id: (reopened.get_ancestors(gazette_id), reopened.get_descendants(gazette_id),
+                         reopened.get_roots(gazette_id)) for gazette_id in ids} == chains
+
+    for gazette_id in ids:
+        ancestors, descendants, roots = chains[gazette_id]
+        assert [(row[0], row[4]) for row in ancestors] == sorted(
+            expected.get(gazette_id, {}).items(), key=lambda item: (item[1], item[0]))
+        assert {row[0] for row in descendants} == {d for d, a in expected.items() if gazette_id in a}
+        originals = {row[0] for row in ancestors if not any(edge[0] == row[0] for edge in edges)}
+        assert {row[0] for row in roots} == (originals or {gazette_id})
+
+
+def test_chains_are_ordered_by_gazette_date(tmp_path):
+    backend = EmbeddedBackend(str(tmp_path / "gazettes.sqlite"))
+    # As strings these sort 2020-SEP-25, 2020-Aug-09, 2020-Dec-21, 2020-OCT-06.
+    backend.load_gazettes([[{"gazette_id": "root", "date": "2020-Jan-01"},
+                            {"gazette_id": "aug", "date": "2020-Aug-09"},
+                            {"gazette_id": "sep", "date": "2020-SEP-25"},
+                            {"gazette_id": "oct", "date": "2020-OCT-06"},
+                            {"gazette_id": "dec", "date": "2020-Dec-21"}]])
+    backend.load_relationships([[{"child_id": child_id, "parent_id": "root"}
+                                 for child_id in ("sep", "dec", "aug", "oct")]])
+
+    assert [row[0] for row in backend.get_descendants("root")] == ["aug", "sep", "oct", "dec"]
+
+
+class _Record:
+    def __init__(self, row):
+        self.row = row
+
+    def values(self):
+        return list(self.row)
+
+
+class _StubNeo4j:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute_query(self, query, parameters=None):
+        return [_Record(row) for row in self.rows]
+
+
+def test_neo4j_chains_are_ordered_by_gazette_date():
+    rows = [("dec", "2020-Dec-21", None, None, 1), ("far", "2019-May-01", None, None, 2),
+            ("sep", "2020-SEP-25", None, None, 1), ("aug", "2020-08-09", None, None, 1)]
+    backend = Neo4jBackend(_StubNeo4j(rows))
+
+    assert [row[0] for row in backend.get_descendants("root")] == ["aug", "sep", "dec", "far"]
+    assert [row[0] for row in backend.get_roots("root")] == ["far", "aug", "sep", "dec"]
@@ -0,0 +1,29 @@
+import threading
+from concurrent.futures import Future
+
+from doctracer.extract.pdf_extractor import PageTextCache
+from gazettetracer.extraction import TextExtractor, UrlIndex
+
+
+def _finished(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def test_submit_does_not_deadlock_when_the_job_has_already_finished(tmp_path, monkeypatch):
+    extractor = TextExtractor(UrlIndex(str(tmp_path / "urls.sqlite")),
+                              page_cache=PageTextCache(str(tmp_path / "pages.sqlite")))
+    # The pool hands back a job that is already done, so its done callback runs as soon as it is added.
+    monkeypatch.setattr(extractor._pool, "submit", lambda fn, *args: _finished("text"))
+
+    job_ids = []
+    submitter = threading.Thread(target=lambda: job_ids.append(extractor.submit("http://example.org/a.pdf")),
+                                 daemon=True)
+    submitter.start()
+    submitter.join(timeout=5)
+
+    assert not submitter.is_alive(), "submit deadlocked"
+    assert extractor._inflight == {}
+    assert extractor.status(job_ids[0]) == {"job_id": job_ids[0], "status": "done", "text": "text"}
+    extractor.close()
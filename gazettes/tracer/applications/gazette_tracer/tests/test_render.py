@@ -0,0 +1,210 @@
+import os
+import time
+
+import pytest
+import requests
+
+from doctracer.extract.pdf_extractor import PageTextCache
+from gazettetracer.backends import EmbeddedBackend
+from gazettetracer.cache import ResponseCache
+from gazettetracer.dates import parse_gazette_date
+from gazettetracer.extraction import TextExtractor, UrlIndex
+from gazettetracer.render import GazetteTracer
+from gazettetracer.services import GazetteService
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "doctracer", "data",
+                          "testdata", "sample_gazette.pdf")
+PDF_URL = "http://documents.example.org/sample_gazette.pdf"
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "June", "July", "Aug", "SEP", "OCT", "Nov", "Dec"]
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    tracer = GazetteTracer()
+    tracer._backend = EmbeddedBackend(str(tmp_path / "gazettes.sqlite"))
+    # Re-read the data version on every request rather than once a second.
+    tracer._cache = ResponseCache(tracer._backend.data_version, check_interval=0)
+    # Written as in the sample CSVs, so the raw strings are not in date order.
+    tracer._backend.load_gazettes([[
+        {"gazette_id": f"{2100 + i}-{i:02d}", "date": f"202{i % 3}-{MONTHS[i % 12]}-{i % 28 + 1:02d}",
+         "url": f"http://example.org/{i}.pdf", "name": f"Gazette {i}"}
+        for i in range(25)
+    ]])
+    yield tracer
+    tracer._backend.close()
+
+
+@pytest.fixture
+def client(tracer):
+    return tracer.create_app().test_client()
+
+
+def test_cursor_paging_returns_the_full_timeline(client):
+    full = client.get("/timeline").get_json()
+    assert len(full) == 25
+    dates = [parse_gazette_date(row[1]) for row in full]
+    assert dates == sorted(dates)
+
+    pages, url = [], "/timeline?limit=7"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.get_json())
+        # Follow the Link header, as a client would; X-Next-Cursor carries the same cursor.
+        link = response.headers.get("Link")
+        assert (link is None) == ("X-Next-Cursor" not in response.headers)
+        url = link[1:link.index(">")] if link else None
+
+    assert [len(page) for page in pages] == [7, 7, 7, 4]
+    assert [row for page in pages for row in page] == full
+
+
+def test_if_none_match_returns_304(client):
+    for path in ("/timeline", "/timeline?limit=5", "/graph", "/parents?format=objects"):
+        response = client.get(path)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        revalidated = client.get(path, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.data == b""
+
+
+def test_bad_cursor_returns_400(client):
+    response = client.get("/timeline?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.get_json()["error"]
+    assert client.get("/timeline?limit=0").status_code == 400
+    assert client.get("/graph?format=xml").status_code == 400
+
+
+def test_cache_is_invalidated_when_the_data_version_changes(tracer, client):
+    first = client.get("/timeline")
+    assert client.get("/timeline").headers["ETag"] == first.headers["ETag"]
+    assert tracer.cache.hits >= 1
+
+    tracer.backend.load_gazettes([[{"gazette_id": "9999-01", "date": "2019-Jan-01", "name": "New"}]])
+
+    second = client.get("/timeline", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.get_json()[0][0] == "9999-01"
+
+
+class _StubResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class _StubSession:
+    """Serves one PDF with an ETag, answering 304 to a matching If-None-Match."""
+
+    def __init__(self, body, etag='"v1"', content_length=True):
+        self.body = body
+        self.etag = etag
+        self.content_length = content_length
+        self.requests = []
+
+    def get(self, url, stream=False, timeout=None, headers=None):
+        self.requests.append(dict(headers or {}))
+        if (headers or {}).get("If-None-Match") == self.etag:
+            return _StubResponse(304)
+        response_headers = {"ETag": self.etag}
+        if self.content_length:
+            response_headers["Content-Length"] = str(len(self.body))
+        return _StubResponse(200, self.body, response_headers)
+
+
+def _extraction_client(tracer, tmp_path, session, **options):
+    extractor = TextExtractor(UrlIndex(str(tmp_path / "urls.sqlite")), session,
+                              PageTextCache(str(tmp_path / "pages.sqlite")), workers=2, **options)
+    tracer._service = GazetteService(tracer.backend, extractor)
+    return tracer.create_app().test_client(), extractor
+
+
+@pytest.fixture
+def sample_pdf():
+    with open(SAMPLE_PDF, "rb") as f:
+        return f.read()
+
+
+def test_extract_text_revalidates_with_a_conditional_request(tracer, tmp_path, sample_pdf):
+    session = _StubSession(sample_pdf)
+    client, extractor = _extraction_client(tracer, tmp_path, session)
+
+    first = client.post("/extract-text", json={"pdf_url": PDF_URL, "pages": "2-3"})
+    assert first.status_code == 200
+    assert first.get_json()["text"]
+    assert session.requests == [{}]
+
+    # Fresh entries are answered from the cache without a request.
+    assert client.post("/extract-text", json={"pdf_url": PDF_URL, "pages": "2-3"}).get_json() == first.get_json()
+    assert len(session.requests) == 1
+
+    extractor.max_age = -1
+    revalidated = client.post("/extract-text", json={"pdf_url": PDF_URL, "pages": "2-3"})
+    assert revalidated.status_code == 200
+    assert revalidated.get_json() == first.get_json()
+    assert session.requests[-1] == {"If-None-Match": '"v1"'}
+    extractor.close()
+
+
+@pytest.mark.parametrize("content_length", [True, False])
+def test_extract_text_refuses_pdfs_over_the_size_cap(tracer, tmp_path, sample_pdf, content_length):
+    client, extractor = _extraction_client(tracer, tmp_path, _StubSession(sample_pdf, content_length=content_length),
+                                           max_bytes=len(sample_pdf) // 2)
+
+    response = client.post("/extract-text", json={"pdf_url": PDF_URL})
+    assert response.status_code == 413
+    assert "byte limit" in response.get_json()["error"]
+    extractor.close()
+
+
+def test_extract_text_async_job_flow(tracer, tmp_path, sample_pdf):
+    client, extractor = _extraction_client(tracer, tmp_path, _StubSession(sample_pdf))
+
+    accepted = client.post("/extract-text", json={"pdf_url": PDF_URL, "pages": "1", "async": True})
+    assert accepted.status_code == 202
+    body = accepted.get_json()
+    assert body["status"] == "running"
+    assert accepted.headers["Location"].endswith(body["status_url"])
+
+    deadline = time.monotonic() + 30
+    while True:
+        status = client.get(body["status_url"]).get_json()
+        if status["status"] != "running" or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert status["status"] == "done"
+    assert status["text"] == client.post("/extract-text", json={"pdf_url": PDF_URL, "pages": "1"}).get_json()["text"]
+    assert client.get("/extract-text/jobs/unknown").status_code == 404
+    extractor.close()
+
+
+def test_extract_text_rejects_pages_past_the_end_of_the_document(tracer, tmp_path, sample_pdf):
+    client, extractor = _extraction_client(tracer, tmp_path, _StubSession(sample_pdf))
+
+    # Discovered after the download, on a document not seen before.
+    response = client.post("/extract-text", json={"pdf_url": PDF_URL, "pages": "10-"})
+    assert response.status_code == 400
+    assert "6 pages" in response.get_json()["error"]
+
+    # Checked against the cached page count, with or without async.
+    for body in ({"pages": "8-9"}, {"pages": "8-9", "async": True}, {"pages": "1-2,x"}):
+        assert client.post("/extract-text", json={"pdf_url": PDF_URL, **body}).status_code == 400
+    extractor.close()
@@ -0,0 +1,73 @@
+"""
+Benchmark PDF text extraction backends on sample gazettes.
+
+For each backend, times the previous serial pdfplumber loop against
+extract_pages cold on one worker, cold on the process pool, and warm from
+the page text cache, and reports how many pages "auto" sent to pdfplumber.
+
+Usage (from gazettes/tracer/doctracer):
+    python -m benchmarks.bench_text_extraction [PDF ...] [--workers 8]
+"""
+import argparse
+import glob
+import time
+
+import pdfplumber
+
+from doctracer.extract.pdf_extractor import (
+    BACKENDS, DEFAULT_WORKERS, PageTextCache, _get_pool, _has_columns, extract_pages, page_count, pymupdf,
+)
+
+DEFAULT_PDFS = ["data/testdata/sample_gazette.pdf"] + sorted(glob.glob("../../extractor/assets/pdf/*.pdf"))
+
+
+def legacy_extract(pdf_path: str) -> str:
+    """The extraction loop as it ran before (minus the crash on empty pages)."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", default=DEFAULT_PDFS, help="PDFs to extract")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Process pool size")
+    args = parser.parse_args()
+
+    backends = [b for b in BACKENDS if b == "pdfplumber" or pymupdf is not None]
+    pages = sum(page_count(pdf) for pdf in args.pdfs)
+    print(f"{len(args.pdfs)} PDF(s), {pages} pages, {args.workers} workers")
+
+    # Start the pool outside the timings; a long-running service pays this once.
+    _get_pool(args.workers).submit(int).result()
+
+    legacy = sum(timed(lambda: legacy_extract(pdf)) for pdf in args.pdfs)
+    print(f"{'legacy pdfplumber loop':32}: {legacy:7.2f} s  ({pages / legacy:6.1f} pages/s)")
+
+    for backend in backends:
+        cache = PageTextCache(":memory:")
+        serial = sum(timed(lambda: extract_pages(pdf, backend=backend, workers=1, cache=False)) for pdf in args.pdfs)
+        pooled = sum(timed(lambda: extract_pages(pdf, backend=backend, workers=args.workers, cache=cache))
+                     for pdf in args.pdfs)
+        warm = sum(timed(lambda: extract_pages(pdf, backend=backend, workers=args.workers, cache=cache))
+                   for pdf in args.pdfs)
+        print(f"{backend + ' (1 worker)':32}: {serial:7.2f} s  ({legacy / serial:5.1f}x)")
+        print(f"{backend + f' (pool of {args.workers})':32}: {pooled:7.2f} s  ({legacy / pooled:5.1f}x)")
+        print(f"{backend + ' (cached)':32}: {warm:7.2f} s  ({legacy / warm:5.0f}x)")
+        cache.close()
+
+    if pymupdf is not None:
+        flagged = 0
+        for pdf in args.pdfs:
+            with pymupdf.open(pdf) as doc:
+                flagged += sum(_has_columns(page) for page in doc)
+        print(f"auto: {flagged}/{pages} pages laid out in columns, extracted with pdfplumber")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,10 @@ from pathlib import Path
 from doctracer.extract.gazette.extragazetteamendment import ExtraGazetteAmendmentProcessor
 import json
 
-from doctracer.extract.gazette.extragazettetable import ExtraGazetteTableProcessor
+from doctracer.prompt import AIModelProvider, PromptExecutor, ServiceProvider, SimpleMessageConfig
+
+from doctracer.extract.gazette.extragazettetable import DEFAULT_MAX_SHORT_SIDE, ExtraGazetteTableProcessor, process_table_images
+from doctracer.extract.pdf_extractor import DEFAULT_WORKERS
 
 PROCESSOR_TYPES = {
     'extragazette_amendment': ExtraGazetteAmendmentProcessor,
@@ -35,9 +38,34 @@ PROCESSOR_TYPES = {
     required=True,
     help='Output file path'
 )
-def extract(processor_type: str, input_path: str, output_path: str):
+@click.option(
+    '--concurrency',
+    type=int,
+    default=8,
+    show_default=True,
+    help='Maximum images sent to the vision model at once (extragazette_table)'
+)
+@click.option(
+    '--max-image-side',
+    type=int,
+    default=DEFAULT_MAX_SHORT_SIDE,
+    show_default=True,
+    help='Downsample images so their short side is at most this many pixels (extragazette_table)'
+)
+@click.option(
+    '--provider',
+    type=click.Choice(['openai', 'local']),
+    default='openai',
+    show_default=True,
+    help='LLM provider; local serves fixture or rule-generated responses offline (see DOCTRACER_FIXTURES)'
+)
+def extract(processor_type: str, input_path: str, output_path: str, concurrency: int, max_image_side: int,
+            provider: str):
     """Extract information from gazette PDFs."""
     input_path = Path(input_path)
+    executor = None
+    if provider == 'local':
+        executor = PromptExecutor(ServiceProvider.LOCAL, AIModelProvider.GPT_4O_MINI, SimpleMessageConfig())
     
     # Initialize the appropriate processor class
     processor_class = PROCESSOR_TYPES[processor_type]
@@ -47,13 +75,16 @@ def extract(processor_type: str, input_path: str, output_path: str):
         if not input_path.is_file():
             raise click.BadParameter("Input must be a single PDF file for 'extragazette_amendment'")
         
-        processor = processor_class(input_path)
+        # The CLI uses the page text cache and worker pool; library callers opt in.
+        processor = processor_class(input_path, executor, text_workers=DEFAULT_WORKERS, text_cache=True)
         output: str = processor.process_gazettes()
 
         with open(output_path, 'w') as text_file:
             text_file.write(output)
         
         click.echo(f"✓ Processed. Results saved to {output_path}")
+        for name, result in zip(("metadata", "changes"), processor.metrics):
+            click.echo(f"  {name}: {result.total_tokens} tokens, {result.latency:.2f}s, {result.attempts} attempt(s)")
 
     # For 'extragazette_table', process all files in a directory
     elif processor_type == 'extragazette_table':
@@ -65,15 +96,10 @@ def extract(processor_type: str, input_path: str, output_path: str):
             [f for f in os.listdir(input_path) if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
         )
 
-        results = {}
+        image_paths = [os.path.join(input_path, image_filename) for image_filename in image_filenames]
+        failures = process_table_images(image_paths, output_path, executor=executor, max_concurrency=concurrency,
+                                        max_short_side=max_image_side)
+        for image_path, error in failures:
+            click.echo(f"✗ {image_path}: {error}", err=True)
 
-        for image_filename in image_filenames:
-            print(f"Processing file: {os.path.join(input_path, image_filename)}\n")  # Print the current file being processed
-            processor = processor_class(os.path.join(input_path, image_filename))
-            results[image_filename] = processor.process_gazettes()
-
-        with open(output_path, 'w', encoding='utf-8') as file:
-            for image, response in results.items():
-                    file.write(f"{response}\n\n")  # Write the response followed by a new line
-        
         click.echo(f"✓ Processed all files in the directory. Results saved to {output_path}")
\ No newline at end of file
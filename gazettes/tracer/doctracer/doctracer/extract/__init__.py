@@ -1,10 +1,16 @@
-from .pdf_extractor import extract_text_from_pdfplumber
+from .pdf_extractor import (
+    PageTextCache, extract_pages, extract_text, extract_text_from_pdfplumber, parse_page_range,
+)
 from .gazette.gazette import BaseGazetteProcessor
 from .gazette.extragazetteamendment import ExtraGazetteAmendmentProcessor
 
 # Explicitly specify what is exported when importing from `doctracer.extract`
 __all__ = ["extract_text_from_pdf", 
            "extract_text_from_pdfplumber",
+           "extract_text",
+           "extract_pages",
+           "parse_page_range",
+           "PageTextCache",
              "BaseGazetteProcessor",
               "ExtraGazetteAmendmentProcessor"
         ]
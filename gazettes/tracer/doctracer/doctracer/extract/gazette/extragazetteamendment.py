@@ -8,12 +8,10 @@ class ExtraGazetteAmendmentProcessor(BaseGazetteProcessor):
     def _initialize_executor(self) -> PromptExecutor:
         return PromptExecutor(ServiceProvider.OPENAI, AIModelProvider.GPT_4O_MINI, SimpleMessageConfig())
 
-    def _extract_metadata(self, gazette_text: str) -> str:
+    def _metadata_prompt(self, gazette_text: str) -> PromptConfigChat:
         metadata_prompt = PromptCatalog.get_prompt(PromptCatalog.METADATA_EXTRACTION, gazette_text)
-        prompt_config = PromptConfigChat(prompt=metadata_prompt)
-        return self.executor.execute_prompt(prompt_config)
+        return PromptConfigChat(prompt=metadata_prompt)
 
-    def _extract_changes(self, gazette_text: str) -> str:
+    def _changes_prompt(self, gazette_text: str) -> PromptConfigChat:
         changes_prompt = PromptCatalog.get_prompt(PromptCatalog.CHANGES_AMENDMENT_EXTRACTION, gazette_text)
-        prompt_config = PromptConfigChat(prompt=changes_prompt)
-        return self.executor.execute_prompt(prompt_config)
\ No newline at end of file
+        return PromptConfigChat(prompt=changes_prompt)
\ No newline at end of file
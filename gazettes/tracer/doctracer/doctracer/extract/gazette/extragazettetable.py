@@ -1,36 +1,131 @@
 from doctracer.extract.gazette.gazette import BaseGazetteProcessor
 from doctracer.prompt.catalog import PromptCatalog
 from doctracer.prompt.config import SimpleMessageConfig
-from doctracer.prompt.executor import PromptConfigImage, PromptExecutor
+from doctracer.prompt.executor import PromptConfigChat, PromptConfigImage, PromptExecutor
 from doctracer.prompt.provider import AIModelProvider, ServiceProvider
-import os
+from typing import List, Optional, TextIO, Tuple
+import asyncio
 import base64
+import io
+import os
+
+from PIL import Image
+
+# OpenAI scales high-detail images so the short side is at most 768px and bills
+# them per 512px tile, so anything larger is only extra upload bytes.
+DEFAULT_MAX_SHORT_SIDE = 768
+DEFAULT_JPEG_QUALITY = 80
+TILE_SIZE = 512
+# Shrink a further few percent if that drops a whole row or column of tiles.
+TILE_SNAP = 0.1
+
+
+def target_size(width: int, height: int, max_short_side: int = DEFAULT_MAX_SHORT_SIDE) -> Tuple[int, int]:
+    """Smallest size worth sending for a `width` x `height` image; never upscales."""
+    scale = min(1.0, max_short_side / min(width, height))
+    width, height = width * scale, height * scale
+    factor = 1.0
+    for side in (width, height):
+        fitted = (side // TILE_SIZE) * TILE_SIZE
+        if fitted and side - fitted <= side * TILE_SNAP:
+            factor = min(factor, fitted / side)
+    return max(1, round(width * factor)), max(1, round(height * factor))
+
+
+def encode_image(image_path, max_short_side: int = DEFAULT_MAX_SHORT_SIDE,
+                 quality: int = DEFAULT_JPEG_QUALITY) -> str:
+    """Downsample a scanned page to grayscale JPEG and return it base64 encoded."""
+    with Image.open(image_path) as image:
+        image = image.convert("L")
+        size = target_size(*image.size, max_short_side=max_short_side)
+        if size != image.size:
+            image = image.resize(size, Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
 
 
 class ExtraGazetteTableProcessor(BaseGazetteProcessor):
+    def __init__(self, pdf_path: str, executor: PromptExecutor = None,
+                 max_short_side: int = DEFAULT_MAX_SHORT_SIDE, quality: int = DEFAULT_JPEG_QUALITY):
+        super().__init__(pdf_path, executor)
+        self.max_short_side = max_short_side
+        self.quality = quality
+
     def _initialize_executor(self) -> PromptExecutor:
         return PromptExecutor(ServiceProvider.OPENAI_VISION, AIModelProvider.GPT_4O_MINI, SimpleMessageConfig())
 
-    def _extract_metadata(self, gazette_text: str) -> str:
+    def _metadata_prompt(self, gazette_text: str) -> PromptConfigChat:
         metadata_prompt = PromptCatalog.get_prompt(PromptCatalog.METADATA_EXTRACTION, gazette_text)
-        return self.executor.execute_prompt(metadata_prompt)
-  
-    def _extract_changes(self, gazette_text: str = None) -> str:
+        return PromptConfigChat(prompt=metadata_prompt)
+
+    def _changes_prompt(self, gazette_text: str = None) -> PromptConfigImage:
         changes_prompt = PromptCatalog.get_prompt(PromptCatalog.CHANGES_TABLE_EXTRACTION)
         filename = self.pdf_path
 
         base64_image = self._encode_image(filename)
 
-        prompt_config = PromptConfigImage(prompt=changes_prompt, image=base64_image)
+        return PromptConfigImage(prompt=changes_prompt, image=base64_image)
+
+    def _extract_changes(self, gazette_text: str = None) -> str:
+        return self.executor.execute_prompt(self._changes_prompt(gazette_text))
 
-        return self.executor.execute_prompt(prompt_config)
-        
     # Function to encode an image in base64
     def _encode_image(self,image_path):
-        """Encodes an image file in base64 format."""
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
-        
+        """Encodes an image file in base64 format, downsampled for the vision model."""
+        return encode_image(image_path, self.max_short_side, self.quality)
+
+    async def aprocess_changes(self) -> str:
+        config = await asyncio.to_thread(self._changes_prompt)
+        result = await self.executor.aexecute_prompt(config)
+        self.metrics = [result]
+        return result.content
+
     def process_gazettes(self):
         changes = self._extract_changes()
-        return changes
\ No newline at end of file
+        return changes
+
+
+async def aprocess_table_images(image_paths: List[str], output: TextIO, executor: Optional[PromptExecutor] = None,
+                                max_concurrency: int = 8, **image_options) -> List[Tuple[str, Exception]]:
+    """
+    Extract the table of every image with one shared executor, at most
+    `max_concurrency` images encoded or in flight at a time. Each response is
+    written to `output` as soon as it and all images before it have finished,
+    so the file keeps the input order. Failed images are skipped and returned
+    as (path, error) pairs.
+    """
+    executor = executor or PromptExecutor(ServiceProvider.OPENAI_VISION, AIModelProvider.GPT_4O_MINI, SimpleMessageConfig())
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(idx, image_path):
+        async with semaphore:
+            print(f"Processing file: {image_path}")
+            processor = ExtraGazetteTableProcessor(image_path, executor, **image_options)
+            try:
+                return idx, await processor.aprocess_changes()
+            except Exception as e:
+                return idx, e
+
+    finished = {}
+    next_idx = 0
+    failures = []
+    for task in asyncio.as_completed([run(idx, path) for idx, path in enumerate(image_paths)]):
+        idx, response = await task
+        finished[idx] = response
+        while next_idx in finished:
+            response = finished.pop(next_idx)
+            if isinstance(response, Exception):
+                failures.append((image_paths[next_idx], response))
+            else:
+                output.write(f"{response}\n\n")
+                output.flush()
+            next_idx += 1
+    return failures
+
+
+def process_table_images(image_paths: List[str], output_path: str, executor: Optional[PromptExecutor] = None,
+                         max_concurrency: int = 8, **image_options) -> List[Tuple[str, Exception]]:
+    """Blocking wrapper around `aprocess_table_images` writing to `output_path`."""
+    with open(output_path, 'w', encoding='utf-8') as file:
+        return asyncio.run(aprocess_table_images(image_paths, file, executor, max_concurrency, **image_options))
@@ -1,13 +1,19 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-from doctracer.prompt.executor import PromptExecutor
-from doctracer.extract.pdf_extractor import extract_text_from_pdfplumber
+from typing import Dict, Any, List, Union
+from doctracer.prompt.executor import PromptConfig, PromptExecutor, PromptResult
+from doctracer.extract.pdf_extractor import PageTextCache, extract_text_from_pdfplumber
 
 
 class BaseGazetteProcessor(ABC):
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, executor: PromptExecutor = None, text_workers: int = 1,
+                 text_cache: Union[PageTextCache, bool] = False):
         self.pdf_path = pdf_path
-        self.executor = self._initialize_executor()
+        # Passed to extract_text_from_pdfplumber: worker processes and page text cache
+        self.text_workers = text_workers
+        self.text_cache = text_cache
+        self.executor = executor or self._initialize_executor()
+        self.metrics: List[PromptResult] = []
 
     @abstractmethod
     def _initialize_executor(self) -> PromptExecutor:
@@ -15,22 +21,35 @@ class BaseGazetteProcessor(ABC):
         pass
 
     @abstractmethod
-    def _extract_metadata(self, gazette_text: str) -> str:
-        """Extract metadata from gazette text."""
+    def _metadata_prompt(self, gazette_text: str) -> PromptConfig:
+        """Build the metadata extraction prompt."""
         pass
 
     @abstractmethod
+    def _changes_prompt(self, gazette_text: str) -> PromptConfig:
+        """Build the changes extraction prompt."""
+        pass
+
+    def _extract_metadata(self, gazette_text: str) -> str:
+        """Extract metadata from gazette text."""
+        return self.executor.execute_prompt(self._metadata_prompt(gazette_text))
+
     def _extract_changes(self, gazette_text: str) -> str:
         """Extract changes from gazette text."""
-        pass
+        return self.executor.execute_prompt(self._changes_prompt(gazette_text))
+
+    async def aprocess_gazettes(self) -> str:
+        """Extract metadata and changes concurrently and return them as one JSON string."""
+        gazette_text = extract_text_from_pdfplumber(self.pdf_path, workers=self.text_workers, cache=self.text_cache)
+        metadata, changes = await self.executor.aexecute_many(
+            [self._metadata_prompt(gazette_text), self._changes_prompt(gazette_text)]
+        )
+        self.metrics = [metadata, changes]
 
-    def process_gazettes(self) -> str:
-        """Process all gazette PDFs and return results."""
-        
-        gazette_text = extract_text_from_pdfplumber(self.pdf_path)
-        metadata = self._extract_metadata(gazette_text)
-        changes = self._extract_changes(gazette_text)
-        
         # Combine metadata and changes into a single JSON object
-        combined_data = f'{{"metadata": {metadata}, "changes": {changes}}}'
+        combined_data = f'{{"metadata": {metadata.content}, "changes": {changes.content}}}'
         return combined_data
+
+    def process_gazettes(self) -> str:
+        """Process all gazette PDFs and return results."""
+        return asyncio.run(self.aprocess_gazettes())
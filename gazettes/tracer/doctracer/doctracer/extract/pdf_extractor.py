@@ -1,9 +1,202 @@
 from pdf2image import convert_from_path
 import pdfplumber
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Union
+import hashlib
+import math
+import multiprocessing
+import os
+import sqlite3
+import threading
 
+try:
+    import pymupdf
+except ImportError:  # optional, much faster text backend
+    pymupdf = None
 
-# Function to extract text from the PDF
-def extract_text_from_pdfplumber(pdf_path):
+BACKENDS = ("pdfplumber", "pymupdf", "auto")
+DEFAULT_CACHE_PATH = os.environ.get(
+    "DOCTRACER_TEXT_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "doctracer", "page_text.sqlite")
+)
+DEFAULT_WORKERS = int(os.environ.get("DOCTRACER_PDF_WORKERS", min(os.cpu_count() or 1, 8)))
+# Below this many uncached pages the process pool costs more than it saves.
+PARALLEL_MIN_PAGES = 8
+
+
+class PageTextCache:
+    """SQLite store of extracted page text keyed by (file sha256, backend, page index)."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS page_text ("
+                "file_hash TEXT, backend TEXT, page INTEGER, text TEXT, "
+                "PRIMARY KEY (file_hash, backend, page))"
+            )
+
+    def get_many(self, file_hash: str, backend: str, pages: Sequence[int]) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, text FROM page_text WHERE file_hash = ? AND backend = ?", (file_hash, backend)
+            ).fetchall()
+        wanted = set(pages)
+        return {page: text for page, text in rows if page in wanted}
+
+    def put_many(self, file_hash: str, backend: str, texts: dict):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO page_text (file_hash, backend, page, text) VALUES (?, ?, ?, ?)",
+                [(file_hash, backend, page, text) for page, text in texts.items()],
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def get_page_text_cache(path: str = DEFAULT_CACHE_PATH) -> PageTextCache:
+    return PageTextCache(path)
+
+
+@lru_cache(maxsize=None)
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # Spawned rather than forked: callers include threaded web servers.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def file_hash(pdf_path) -> str:
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def page_count(pdf_path) -> int:
+    if pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
     with pdfplumber.open(pdf_path) as pdf:
-        return "\n".join(page.extract_text() for page in pdf.pages)
\ No newline at end of file
+        return len(pdf.pages)
+
+
+def parse_page_range(spec: str, count: int) -> List[int]:
+    """
+    Turn a page range such as "1-3,7,10-" into sorted 1-based page numbers,
+    clipped to the `count` pages of the document.
+    """
+    pages = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        try:
+            first = int(start) if start else 1
+            last = (int(end) if end else count) if sep else first
+        except ValueError:
+            raise ValueError(f"Invalid page range: {spec!r}")
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range: {spec!r}")
+        pages.update(range(first, min(last, count) + 1))
+    return sorted(pages)
+
+
+def _has_columns(page) -> bool:
+    """True if two text blocks sit side by side, i.e. the page is laid out as a table or in columns."""
+    blocks = [b[:4] for b in page.get_text("blocks") if b[6] == 0 and b[4].strip()]
+    for i, (x0, y0, x1, y1) in enumerate(blocks):
+        for a0, b0, a1, b1 in blocks[i + 1:]:
+            overlap = min(y1, b1) - max(y0, b0)
+            if overlap > 0.5 * min(y1 - y0, b1 - b0) and (a0 >= x1 or x0 >= a1):
+                return True
+    return False
+
+
+def _extract_range(pdf_path: str, backend: str, indices: List[int]) -> List[str]:
+    """Extract the 0-based page `indices` of one PDF; runs in pool workers."""
+    if backend == "pdfplumber":
+        with pdfplumber.open(pdf_path) as pdf:
+            return [pdf.pages[idx].extract_text() or "" for idx in indices]
+
+    texts = []
+    plumber = None
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            for idx in indices:
+                page = doc[idx]
+                # pdfplumber keeps table rows on one line, which the prompts rely on.
+                if backend == "auto" and _has_columns(page):
+                    plumber = plumber or pdfplumber.open(pdf_path)
+                    texts.append(plumber.pages[idx].extract_text() or "")
+                else:
+                    texts.append(page.get_text(sort=True))
+    finally:
+        if plumber is not None:
+            plumber.close()
+    return texts
+
+
+def extract_pages(pdf_path, pages: Optional[Iterable[int]] = None, backend: str = "pdfplumber",
+                  workers: int = DEFAULT_WORKERS, cache: Union[PageTextCache, bool] = True) -> List[str]:
+    """
+    Return the text of each requested 1-based page (all pages by default).
+
+    Pages already extracted from the same file contents with the same backend
+    come from `cache` (the shared on-disk cache if True, none if False). The
+    rest are split into contiguous ranges across a pool of `workers` processes.
+    `backend` is "pdfplumber", "pymupdf" or "auto" (PyMuPDF, with pdfplumber
+    for pages laid out in columns).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported backend: {backend}")
+    if backend != "pdfplumber" and pymupdf is None:
+        raise ImportError(f"The {backend!r} backend requires PyMuPDF (pip install pymupdf)")
+    pdf_path = str(pdf_path)
+    count = page_count(pdf_path)
+    indices = list(range(count)) if pages is None else [page - 1 for page in pages]
+    for idx in indices:
+        if not 0 <= idx < count:
+            raise ValueError(f"Page {idx + 1} is out of range for a {count} page document")
+
+    if cache is True:
+        cache = get_page_text_cache()
+    key = file_hash(pdf_path) if cache else None
+    texts = cache.get_many(key, backend, indices) if cache else {}
+    missing = [idx for idx in dict.fromkeys(indices) if idx not in texts]
+
+    if missing:
+        if workers > 1 and len(missing) >= PARALLEL_MIN_PAGES:
+            # A few ranges per worker so pages of uneven cost still balance.
+            size = math.ceil(len(missing) / (workers * 2))
+            ranges = [missing[i:i + size] for i in range(0, len(missing), size)]
+            pool = _get_pool(workers)
+            results = pool.map(_extract_range, [pdf_path] * len(ranges), [backend] * len(ranges), ranges)
+            extracted = [text for texts_in_range in results for text in texts_in_range]
+        else:
+            extracted = _extract_range(pdf_path, backend, missing)
+        new_texts = dict(zip(missing, extracted))
+        texts.update(new_texts)
+        if cache:
+            cache.put_many(key, backend, new_texts)
+
+    return [texts[idx] for idx in indices]
+
+
+def extract_text(pdf_path, pages: Optional[Iterable[int]] = None, backend: str = "pdfplumber",
+                 workers: int = DEFAULT_WORKERS, cache: Union[PageTextCache, bool] = True) -> str:
+    """Text of the requested pages joined by newlines; see `extract_pages`."""
+    return "\n".join(extract_pages(pdf_path, pages, backend, workers, cache))
+
+
+# Function to extract text from the PDF
+def extract_text_from_pdfplumber(pdf_path, pages: Optional[Iterable[int]] = None,
+                                 workers: int = 1, cache: Union[PageTextCache, bool] = False):
+    """pdfplumber text in-process and uncached unless asked for; see `extract_pages`."""
+    return extract_text(pdf_path, pages, "pdfplumber", workers, cache)
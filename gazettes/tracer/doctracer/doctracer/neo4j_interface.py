@@ -16,6 +16,23 @@ class Neo4jInterface:
             result = session.run(query, parameters)
             return [record for record in result]
 
+    def execute_write(self, query, parameters=None):
+        """Run a write query in one explicit transaction, retried on transient errors."""
+        with self.driver.session() as session:
+            return session.execute_write(lambda tx: [record for record in tx.run(query, parameters)])
+
+    def execute_batches(self, query, batches):
+        """
+        Run `query` once per batch of rows, passed as `$rows`, each batch in its
+        own transaction on a single session. Returns the number of rows sent.
+        """
+        count = 0
+        with self.driver.session() as session:
+            for rows in batches:
+                session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+                count += len(rows)
+        return count
+
     def __enter__(self):
         return self
 
@@ -1,7 +1,18 @@
 from abc import ABC, abstractmethod
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache
+import random
+import time
+from typing import List, Optional
+import weakref
+
+import httpx
+import openai
+
 from doctracer.prompt.config import MessageConfig
+from doctracer.prompt.local import DEFAULT_RECORD_PATH, FixtureStore, LatencyModel, estimate_tokens, prompt_key
 from doctracer.prompt.provider import ServiceProvider, AIModelProvider
-import openai
 
 class PromptConfig(ABC):
     """Base class for prompt configuration."""
@@ -16,44 +27,181 @@ class PromptConfigImage(PromptConfig):
         self.prompt = prompt
         self.image = image
 
+@dataclass
+class PromptResult:
+    """Response text of one prompt with its usage and timing."""
+    content: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    latency: float = 0.0
+    attempts: int = 1
+
+@dataclass
+class RetryPolicy:
+    """Per-call timeout and jittered exponential backoff for retryable API errors."""
+    max_retries: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    timeout: float = 60.0
+
+    RETRYABLE_ERRORS = (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError, openai.InternalServerError)
+
+    def is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, self.RETRYABLE_ERRORS):
+            return True
+        status = getattr(error, "status_code", None)
+        return status == 429 or (status is not None and 500 <= status < 600)
+
+    def delay(self, attempt: int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+# Clients are shared by every strategy so connections are pooled across prompts.
+# The async client is bound to an event loop, so one is kept per loop.
+_POOL_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+_async_clients = weakref.WeakKeyDictionary()
+
+@lru_cache(maxsize=None)
+def get_openai_client() -> openai.OpenAI:
+    return openai.OpenAI(max_retries=0, http_client=httpx.Client(limits=_POOL_LIMITS))
+
+def get_async_openai_client() -> openai.AsyncOpenAI:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = openai.AsyncOpenAI(max_retries=0, http_client=httpx.AsyncClient(limits=_POOL_LIMITS))
+        _async_clients[loop] = client
+    return client
+
+def _as_config(config) -> PromptConfig:
+    return PromptConfigChat(prompt=config) if isinstance(config, str) else config
+
 class PromptStrategy:
-    def __init__(self, model: AIModelProvider):
+    def __init__(self, model: AIModelProvider, retry_policy: Optional[RetryPolicy] = None):
         self.model = model
+        self.retry_policy = retry_policy or RetryPolicy()
 
-    def execute(self, config: PromptConfigChat):
+    def execute(self, config: PromptConfig) -> str:
+        return self.execute_with_metrics(config).content
+
+    def execute_with_metrics(self, config: PromptConfig) -> PromptResult:
         raise NotImplementedError("Subclasses should implement this method.")
 
+    async def aexecute(self, config: PromptConfig) -> PromptResult:
+        """Async execution; runs the blocking call on a worker thread unless overridden."""
+        return await asyncio.to_thread(self.execute_with_metrics, config)
+
 class OpenAIStrategy(PromptStrategy):
-    def __init__(self, message_config: MessageConfig, model: AIModelProvider):
-        super().__init__(model)
+    def __init__(self, message_config: MessageConfig, model: AIModelProvider, retry_policy: Optional[RetryPolicy] = None):
+        super().__init__(model, retry_policy)
         self.message_config = message_config
-        self.client = openai.OpenAI()
 
-    def execute(self, config: PromptConfigChat):
-        messages = self.message_config.get_messages(config.prompt)
-        response = self.client.chat.completions.create(
-            model=self.model.value,
-            messages=messages
+    def _messages(self, config: PromptConfig):
+        return self.message_config.get_messages(config.prompt)
+
+    def _result(self, response, started: float, attempts: int) -> PromptResult:
+        usage = response.usage
+        return PromptResult(
+            content=response.choices[0].message.content,
+            model=response.model or self.model.value,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            total_tokens=usage.total_tokens if usage else 0,
+            latency=time.perf_counter() - started,
+            attempts=attempts,
         )
-        # TODO: Handle errors and exceptions
-        response_msg = response.choices[0].message.content
-        return response_msg
 
-class OpenAIVisionStrategy(PromptStrategy):
-    def __init__(self, message_config: MessageConfig, model: AIModelProvider):
-        super().__init__(model)
-        self.message_config = message_config
-        self.client = openai.OpenAI()
+    def execute_with_metrics(self, config: PromptConfig) -> PromptResult:
+        config = _as_config(config)
+        messages = self._messages(config)
+        policy = self.retry_policy
+        started = time.perf_counter()
+        for attempt in range(policy.max_retries + 1):
+            try:
+                response = get_openai_client().chat.completions.create(
+                    model=self.model.value, messages=messages, timeout=policy.timeout
+                )
+                return self._result(response, started, attempt + 1)
+            except Exception as e:
+                if attempt >= policy.max_retries or not policy.is_retryable(e):
+                    raise
+                time.sleep(policy.delay(attempt))
+
+    async def aexecute(self, config: PromptConfig) -> PromptResult:
+        config = _as_config(config)
+        messages = self._messages(config)
+        policy = self.retry_policy
+        started = time.perf_counter()
+        for attempt in range(policy.max_retries + 1):
+            try:
+                response = await get_async_openai_client().chat.completions.create(
+                    model=self.model.value, messages=messages, timeout=policy.timeout
+                )
+                return self._result(response, started, attempt + 1)
+            except Exception as e:
+                if attempt >= policy.max_retries or not policy.is_retryable(e):
+                    raise
+                await asyncio.sleep(policy.delay(attempt))
+
+class OpenAIVisionStrategy(OpenAIStrategy):
+    def _messages(self, config: PromptConfig):
+        if isinstance(config, PromptConfigImage):
+            return self.message_config.get_image_messages(config.prompt, config.image)
+        return self.message_config.get_messages(config.prompt)
 
-    def execute(self, config: PromptConfigImage):
-        messages = self.message_config.get_image_messages(config.prompt, config.image)
-        response = self.client.chat.completions.create(
+class LocalStrategy(PromptStrategy):
+    """Serves recorded or rule-generated responses with simulated latency, without network access."""
+    def __init__(self, model: AIModelProvider, fixtures: Optional[FixtureStore] = None,
+                 latency: Optional[LatencyModel] = None, retry_policy: Optional[RetryPolicy] = None):
+        super().__init__(model, retry_policy)
+        self.fixtures = fixtures or FixtureStore()
+        self.latency = latency or LatencyModel()
+
+    def _respond(self, config: PromptConfig):
+        config = _as_config(config)
+        image = getattr(config, "image", None)
+        content = self.fixtures.get(config.prompt, image)
+        return config.prompt, content, self.latency.sample(prompt_key(config.prompt, image))
+
+    def _result(self, prompt: str, content: str, latency: float) -> PromptResult:
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(content)
+        return PromptResult(
+            content=content,
             model=self.model.value,
-            messages=messages
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            latency=latency,
         )
 
-        response_msg = response.choices[0].message.content
-        return response_msg
+    def execute_with_metrics(self, config: PromptConfig) -> PromptResult:
+        prompt, content, latency = self._respond(config)
+        time.sleep(latency)
+        return self._result(prompt, content, latency)
+
+    async def aexecute(self, config: PromptConfig) -> PromptResult:
+        prompt, content, latency = self._respond(config)
+        await asyncio.sleep(latency)
+        return self._result(prompt, content, latency)
+
+class RecordingStrategy(PromptStrategy):
+    """Passes prompts to another strategy and records its responses in a FixtureStore for LocalStrategy to replay."""
+    def __init__(self, strategy: PromptStrategy, fixtures: FixtureStore):
+        super().__init__(strategy.model, strategy.retry_policy)
+        self.strategy = strategy
+        self.fixtures = fixtures
+
+    def _record(self, config: PromptConfig, result: PromptResult) -> PromptResult:
+        config = _as_config(config)
+        self.fixtures.record(config.prompt, result.content, getattr(config, "image", None))
+        return result
+
+    def execute_with_metrics(self, config: PromptConfig) -> PromptResult:
+        return self._record(config, self.strategy.execute_with_metrics(config))
+
+    async def aexecute(self, config: PromptConfig) -> PromptResult:
+        return self._record(config, await self.strategy.aexecute(config))
 
 class AnthropicStrategy(PromptStrategy):
     def __init__(self, message_config: MessageConfig, model: AIModelProvider):
@@ -66,19 +214,46 @@ class AnthropicStrategy(PromptStrategy):
         pass
 
 class PromptExecutor:
-    def __init__(self, provider: ServiceProvider, model: AIModelProvider, message_config: MessageConfig):
+    def __init__(self, provider: ServiceProvider, model: AIModelProvider, message_config: MessageConfig,
+                 retry_policy: Optional[RetryPolicy] = None, max_concurrency: int = 8):
         self.message_config = message_config
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.max_concurrency = max_concurrency
         self.strategy = self._get_strategy(provider, model)
+        if DEFAULT_RECORD_PATH and provider != ServiceProvider.LOCAL:
+            self.strategy = RecordingStrategy(self.strategy, FixtureStore(DEFAULT_RECORD_PATH))
 
     def _get_strategy(self, provider: ServiceProvider, model: AIModelProvider) -> PromptStrategy:
         if provider == ServiceProvider.OPENAI:
-            return OpenAIStrategy(self.message_config, model)
+            return OpenAIStrategy(self.message_config, model, self.retry_policy)
         if provider == ServiceProvider.OPENAI_VISION:
-            return OpenAIVisionStrategy(self.message_config, model)
+            return OpenAIVisionStrategy(self.message_config, model, self.retry_policy)
+        if provider == ServiceProvider.LOCAL:
+            return LocalStrategy(model, retry_policy=self.retry_policy)
         elif provider == ServiceProvider.ANTHROPIC:
             return AnthropicStrategy(self.message_config, model)
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
-    def execute_prompt(self, config: PromptConfig):
+    def execute_prompt(self, config: PromptConfig) -> str:
         return self.strategy.execute(config)
+
+    def execute_prompt_with_metrics(self, config: PromptConfig) -> PromptResult:
+        return self.strategy.execute_with_metrics(config)
+
+    async def aexecute_prompt(self, config: PromptConfig) -> PromptResult:
+        return await self.strategy.aexecute(config)
+
+    async def aexecute_many(self, configs: List[PromptConfig]) -> List[PromptResult]:
+        """Run independent prompts concurrently (at most `max_concurrency` at a time), results in input order."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(config):
+            async with semaphore:
+                return await self.strategy.aexecute(config)
+
+        return await asyncio.gather(*(run(config) for config in configs))
+
+    def execute_many(self, configs: List[PromptConfig]) -> List[PromptResult]:
+        """Blocking wrapper around `aexecute_many`."""
+        return asyncio.run(self.aexecute_many(configs))
@@ -0,0 +1,142 @@
+"""
+Offline responses for the LOCAL provider, used to run extraction end to end
+and to benchmark throughput without network access.
+
+Responses come from a fixture store: a JSON lines file of
+{"prompt_sha256": ..., "response": ...} records, written by
+`executor.RecordingStrategy` while running against OpenAI with
+DOCTRACER_RECORD_FIXTURES set. Prompts without a recording get a
+rule-generated response in the shape the prompt asks for. Latency is drawn
+from a configurable distribution, seeded per prompt so runs are repeatable
+regardless of scheduling order.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_LATENCY = os.environ.get("DOCTRACER_LOCAL_LATENCY", "fixed:0")
+DEFAULT_FIXTURES_PATH = os.environ.get("DOCTRACER_FIXTURES")
+DEFAULT_RECORD_PATH = os.environ.get("DOCTRACER_RECORD_FIXTURES")
+
+GAZETTE_ID = re.compile(r"No\.\s*(\d{3,4}/\d{1,3})")
+DATE_WORDS = re.compile(
+    r"(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),\s*(\d{4})"
+)
+DATE_DOTS = re.compile(r"\b(\d{4})[./-](\d{2})[./-](\d{2})\b")
+PUBLISHED_BY = re.compile(r"Published\s+by\s+(\w+)", re.IGNORECASE)
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December"]
+
+
+def prompt_key(prompt: str, image: Optional[str] = None) -> str:
+    """Fixture key of a prompt; vision prompts also hash their base64 image."""
+    digest = hashlib.sha256(prompt.encode("utf-8"))
+    if image:
+        digest.update(image.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count for PromptResult usage, at about 4 characters per token."""
+    return len(text) // 4
+
+
+class LatencyModel:
+    """
+    Simulated latency of the LOCAL provider (DOCTRACER_LOCAL_LATENCY), one of
+    fixed:<seconds>, uniform:<low>,<high>, normal:<mean>,<sd> or
+    lognormal:<mu>,<sigma>. `sample` draws from a generator seeded with the
+    prompt key, so a prompt gets the same latency on every run.
+    """
+    DISTRIBUTIONS = {
+        "fixed": lambda rng, value: value,
+        "uniform": lambda rng, low, high: rng.uniform(low, high),
+        "normal": lambda rng, mean, sd: rng.gauss(mean, sd),
+        "lognormal": lambda rng, mu, sigma: rng.lognormvariate(mu, sigma),
+    }
+
+    def __init__(self, spec: str = DEFAULT_LATENCY, seed: int = 0):
+        name, _, params = spec.partition(":")
+        if name not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unsupported latency distribution: {name}")
+        self.spec = spec
+        self.seed = seed
+        self._sample = self.DISTRIBUTIONS[name]
+        self._params = [float(p) for p in params.split(",") if p]
+
+    def sample(self, key: str) -> float:
+        rng = random.Random(f"{self.seed}:{key}")
+        return max(0.0, self._sample(rng, *self._params))
+
+
+def _metadata_response(prompt: str) -> str:
+    text = prompt.split("Input Text:", 1)[-1]
+    gazette_id = GAZETTE_ID.search(text)
+    date = ""
+    words = DATE_WORDS.search(text)
+    dots = DATE_DOTS.search(text)
+    if words:
+        date = f"{words.group(3)}-{MONTHS.index(words.group(1)) + 1:02d}-{int(words.group(2)):02d}"
+    elif dots:
+        date = "-".join(dots.groups())
+    published_by = PUBLISHED_BY.search(text)
+    return json.dumps({
+        "Gazette ID": gazette_id.group(1) if gazette_id else "",
+        "Gazette Published Date": date,
+        "Gazette Published by": published_by.group(1) if published_by else "",
+    })
+
+
+def _changes_response(prompt: str) -> str:
+    return json.dumps({"RENAME": [], "MERGE": [], "MOVE": [], "ADD": [], "TERMINATE": []})
+
+
+def _table_response(prompt: str) -> str:
+    return json.dumps({"ministers": []})
+
+
+# (marker found in the prompt, generator), checked in order.
+RULES: List[Tuple[str, Callable[[str], str]]] = [
+    ("extracting metadata", _metadata_response),
+    ("extracting changes", _changes_response),
+    ("What are the ministers found in the image", _table_response),
+]
+
+
+class FixtureStore:
+    """
+    Responses keyed by `prompt_key`, loaded from `path` and appended to it by
+    `record`. `get` falls back to the first matching entry of RULES.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_FIXTURES_PATH):
+        self.path = path
+        self.responses: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.responses[record["prompt_sha256"]] = record["response"]
+
+    def get(self, prompt: str, image: Optional[str] = None) -> str:
+        recorded = self.responses.get(prompt_key(prompt, image))
+        if recorded is not None:
+            return recorded
+        for marker, rule in RULES:
+            if marker in prompt:
+                return rule(prompt)
+        return ""
+
+    def record(self, prompt: str, response: str, image: Optional[str] = None):
+        key = prompt_key(prompt, image)
+        with self._lock:
+            self.responses[key] = response
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"prompt_sha256": key, "response": response}, ensure_ascii=False) + "\n")
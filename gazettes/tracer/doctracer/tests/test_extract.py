@@ -1,6 +1,99 @@
-from doctracer.extract import extract_text_from_pdfplumber
+import asyncio
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from doctracer.extract import (
+    PageTextCache, extract_pages, extract_text, extract_text_from_pdfplumber, parse_page_range,
+)
+from doctracer.extract import pdf_extractor
+from doctracer.extract.gazette.extragazettetable import aprocess_table_images, encode_image, target_size
+from doctracer.prompt.config import SimpleMessageConfig
+from doctracer.prompt.executor import PromptExecutor, PromptResult, PromptStrategy
+from doctracer.prompt.provider import AIModelProvider, ServiceProvider
 
 def test_extract_text_from_pdfplumber():
     pdf_path = "data/testdata/simple.pdf"
     text = extract_text_from_pdfplumber(pdf_path)
     assert text == "Hello Lanka Data Foundation"
+
+
+def test_extract_text_from_pdfplumber_skips_cache_and_pool_by_default(monkeypatch):
+    def unexpected(*args):
+        raise AssertionError("the legacy entry point should not use the cache or the pool")
+
+    monkeypatch.setattr(pdf_extractor, "get_page_text_cache", unexpected)
+    monkeypatch.setattr(pdf_extractor, "_get_pool", unexpected)
+    monkeypatch.setattr(pdf_extractor, "PARALLEL_MIN_PAGES", 1)
+    assert extract_text_from_pdfplumber("data/testdata/sample_gazette.pdf") == \
+        extract_text("data/testdata/sample_gazette.pdf", workers=1, cache=False)
+
+
+def test_parse_page_range():
+    assert parse_page_range("1-3, 5,8-", 9) == [1, 2, 3, 5, 8, 9]
+    assert parse_page_range("4", 9) == [4]
+    with pytest.raises(ValueError):
+        parse_page_range("3-1", 9)
+
+
+def test_extract_pages_caches_and_matches_serial_extraction(monkeypatch):
+    pdf_path = "data/testdata/sample_gazette.pdf"
+    cache = PageTextCache(":memory:")
+    expected = extract_pages(pdf_path, workers=1, cache=False)
+
+    assert extract_pages(pdf_path, pages=[2, 4], workers=2, cache=cache) == [expected[1], expected[3]]
+
+    # Cached pages are not extracted again; the rest are.
+    extracted = []
+    real_extract_range = pdf_extractor._extract_range
+    monkeypatch.setattr(pdf_extractor, "_extract_range",
+                        lambda path, backend, indices: extracted.extend(indices) or real_extract_range(path, backend, indices))
+    assert extract_pages(pdf_path, workers=1, cache=cache) == expected
+    assert extracted == [0, 2, 4, 5]
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "auto"])
+def test_extract_pages_pymupdf_backends(backend):
+    pytest.importorskip("pymupdf")
+    assert extract_text("data/testdata/simple.pdf", backend=backend, cache=False).strip() == "Hello Lanka Data Foundation"
+
+
+def test_target_size_downsamples_to_tile_grid():
+    # A 300 dpi A4 scan fits 2x2 tiles instead of 2x3 at the model's 768px short side.
+    assert target_size(2481, 3508) == (724, 1024)
+    assert target_size(400, 300) == (400, 300)
+
+
+def test_encode_image_recompresses_to_grayscale_jpeg():
+    image = Image.open(io.BytesIO(base64.b64decode(encode_image("data/gzt_images/gzt-images-01.jpg"))))
+    assert image.format == "JPEG"
+    assert image.mode == "L"
+    assert image.size == (724, 1024)
+
+
+class _ReverseDelayStrategy(PromptStrategy):
+    """Finishes later images first and fails on the second image."""
+    def __init__(self, model, images):
+        super().__init__(model)
+        self.images = images
+
+    async def aexecute(self, config):
+        idx = self.images.index(config.image)
+        await asyncio.sleep(0.02 * (len(self.images) - idx))
+        if idx == 1:
+            raise RuntimeError("vision call failed")
+        return PromptResult(content=str(idx), model=self.model.value)
+
+
+def test_table_images_stream_in_input_order():
+    paths = [f"data/gzt_images/gzt-images-0{i}.jpg" for i in range(1, 7)]
+    executor = PromptExecutor(ServiceProvider.OPENAI_VISION, AIModelProvider.GPT_4O_MINI, SimpleMessageConfig())
+    executor.strategy = _ReverseDelayStrategy(AIModelProvider.GPT_4O_MINI, [encode_image(path) for path in paths])
+    output = io.StringIO()
+
+    failures = asyncio.run(aprocess_table_images(paths, output, executor, max_concurrency=6))
+
+    assert [path for path, _ in failures] == [paths[1]]
+    assert output.getvalue() == "0\n\n2\n\n3\n\n4\n\n5\n\n"
@@ -1,9 +1,95 @@
-from doctracer.prompt.executor import OpenAIStrategy
-from doctracer.prompt.provider import AIModelProvider
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from doctracer.prompt import executor as executor_module
+from doctracer.prompt.catalog import PromptCatalog
+from doctracer.prompt.executor import (
+    OpenAIStrategy, PromptConfigChat, PromptExecutor, PromptResult, PromptStrategy, RecordingStrategy, RetryPolicy,
+)
+from doctracer.prompt.local import FixtureStore, LatencyModel
+from doctracer.prompt.provider import AIModelProvider, ServiceProvider
 from doctracer.prompt.config import SimpleMessageConfig
 
 def test_openai_prompt():
     message_config = SimpleMessageConfig()
     strategy = OpenAIStrategy(message_config, AIModelProvider.GPT_4O_MINI)
     res = strategy.execute("Add 1 + 10 and return the result. The result should be a number and nothing else.")
-    assert res == "11"
\ No newline at end of file
+    assert res == "11"
+
+
+class _SleepyStrategy(PromptStrategy):
+    async def aexecute(self, config):
+        await asyncio.sleep(0.2)
+        return PromptResult(content=config.prompt.upper(), model=self.model.value)
+
+
+def test_execute_many_runs_prompts_concurrently_in_order():
+    executor = PromptExecutor(ServiceProvider.OPENAI, AIModelProvider.GPT_4O_MINI, SimpleMessageConfig())
+    executor.strategy = _SleepyStrategy(AIModelProvider.GPT_4O_MINI)
+
+    started = time.perf_counter()
+    results = executor.execute_many([PromptConfigChat(prompt=p) for p in ("a", "b", "c")])
+
+    assert [r.content for r in results] == ["A", "B", "C"]
+    assert time.perf_counter() - started < 0.5
+
+
+def test_openai_strategy_retries_and_reports_usage(monkeypatch):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+            raise openai.RateLimitError("slow down", response=httpx.Response(429, request=request), body=None)
+        return SimpleNamespace(
+            model="gpt-4o-mini",
+            choices=[SimpleNamespace(message=SimpleNamespace(content="11"))],
+            usage=SimpleNamespace(prompt_tokens=20, completion_tokens=1, total_tokens=21),
+        )
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(executor_module, "get_openai_client", lambda: client)
+
+    strategy = OpenAIStrategy(SimpleMessageConfig(), AIModelProvider.GPT_4O_MINI, RetryPolicy(base_delay=0, timeout=5))
+    result = strategy.execute_with_metrics(PromptConfigChat(prompt="Add 1 + 10"))
+
+    assert result.content == "11"
+    assert result.total_tokens == 21
+    assert result.attempts == 2
+    assert calls[0]["timeout"] == 5
+
+
+def test_local_provider_serves_fixtures_and_rules(tmp_path):
+    fixtures = FixtureStore(str(tmp_path / "fixtures.jsonl"))
+    fixtures.record("Add 1 + 10", "11")
+    executor = PromptExecutor(ServiceProvider.LOCAL, AIModelProvider.GPT_4O_MINI, SimpleMessageConfig())
+    executor.strategy.fixtures = FixtureStore(fixtures.path)
+    executor.strategy.latency = LatencyModel("uniform:0.01,0.05")
+
+    assert executor.execute_prompt(PromptConfigChat(prompt="Add 1 + 10")) == "11"
+
+    prompt = PromptCatalog.get_prompt(
+        PromptCatalog.METADATA_EXTRACTION, "No. 2205/14 - WEDNESDAY, December 09, 2020 (Published by Authority)"
+    )
+    results = executor.execute_many([PromptConfigChat(prompt=prompt)] * 2)
+    assert results[0].content == (
+        '{"Gazette ID": "2205/14", "Gazette Published Date": "2020-12-09", "Gazette Published by": "Authority"}'
+    )
+    assert results[0].latency == results[1].latency
+    assert 0.01 <= results[0].latency <= 0.05
+
+
+def test_recorded_responses_replay_on_the_local_provider(tmp_path):
+    path = str(tmp_path / "fixtures.jsonl")
+    recorder = PromptExecutor(ServiceProvider.OPENAI, AIModelProvider.GPT_4O_MINI, SimpleMessageConfig())
+    recorder.strategy = RecordingStrategy(_SleepyStrategy(AIModelProvider.GPT_4O_MINI), FixtureStore(path))
+    recorder.execute_many([PromptConfigChat(prompt=p) for p in ("a", "b")])
+
+    replay = PromptExecutor(ServiceProvider.LOCAL, AIModelProvider.GPT_4O_MINI, SimpleMessageConfig())
+    replay.strategy.fixtures = FixtureStore(path)
+    assert [replay.execute_prompt(PromptConfigChat(prompt=p)) for p in ("a", "b", "c")] == ["A", "B", ""]
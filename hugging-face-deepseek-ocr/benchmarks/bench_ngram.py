@@ -0,0 +1,82 @@
+"""
+CPU microbenchmark of the no-repeat n-gram logits processors: the window
+rescan of NoRepeatNGramLogitsProcessor against the incremental index of
+IncrementalNoRepeatNGramLogitsProcessor, on synthetic token streams.
+
+Sequences are decoded in lockstep through one processor instance, the way
+vLLM calls it for a batch, and stretches of earlier tokens are copied into the
+stream so bans actually occur. Every step asserts both processors produce the
+same scores.
+
+Usage (from hugging-face-deepseek-ocr):
+    python benchmarks/bench_ngram.py [--tokens 2000] [--sequences 8] [--ngram 20] [--window 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from ldf.deepseek.ocr.logits_process import IncrementalNoRepeatNGramLogitsProcessor, NoRepeatNGramLogitsProcessor
+
+VOCAB_SIZE = 129280
+WHITELIST = {128821, 128822}
+
+
+def synthetic_stream(rng, length, repeat_rate):
+    """Random tokens with runs copied from earlier in the stream, like a model starting to loop."""
+    tokens = []
+    while len(tokens) < length:
+        if tokens and rng.random() < repeat_rate:
+            start = rng.randrange(len(tokens))
+            tokens.extend(tokens[start:start + rng.randint(5, 40)])
+        else:
+            tokens.append(rng.choice((128821, 128822)) if rng.random() < 0.05 else rng.randrange(VOCAB_SIZE))
+    return tokens[:length]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=2000, help="Tokens decoded per sequence")
+    parser.add_argument("--sequences", type=int, default=8, help="Sequences sharing one processor")
+    parser.add_argument("--ngram", type=int, default=20)
+    parser.add_argument("--window", type=int, default=50)
+    parser.add_argument("--repeat-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    streams = [synthetic_stream(rng, args.tokens, args.repeat_rate) for _ in range(args.sequences)]
+    scores = torch.randn(VOCAB_SIZE)
+    processors = {
+        "rescan": NoRepeatNGramLogitsProcessor(args.ngram, args.window, WHITELIST),
+        "incremental": IncrementalNoRepeatNGramLogitsProcessor(args.ngram, args.window, WHITELIST),
+    }
+    elapsed = dict.fromkeys(processors, 0.0)
+    banned_steps = 0
+
+    for length in range(1, args.tokens + 1):
+        for stream in streams:
+            input_ids = stream[:length]
+            outputs = {}
+            for name, processor in processors.items():
+                start = time.perf_counter()
+                outputs[name] = processor(input_ids, scores)
+                elapsed[name] += time.perf_counter() - start
+            assert torch.equal(outputs["rescan"], outputs["incremental"]), f"outputs differ at token {length}"
+            banned_steps += outputs["rescan"] is not scores
+
+    steps = args.tokens * args.sequences
+    print(f"{args.sequences} sequences x {args.tokens} tokens, ngram {args.ngram}, window {args.window}, "
+          f"{banned_steps} steps with bans; outputs identical")
+    for name, seconds in elapsed.items():
+        print(f"{name:12} {seconds:8.3f}s {seconds / steps * 1e6:8.1f} us/token")
+    print(f"speedup      {elapsed['rescan'] / elapsed['incremental']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
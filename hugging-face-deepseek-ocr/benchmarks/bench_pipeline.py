@@ -0,0 +1,104 @@
+"""
+CPU check of the OCR preprocessing stage with a stub engine: rasterizing and
+tokenizing pages inline before each generate call (as ExtractorAgent and
+ocr_app did) against ldf.deepseek.ocr.pipeline.PreprocessPipeline.
+
+The stub engine sleeps a fixed time per page in place of the GPU, and at each
+call records how many prepared batches were waiting in the queue. The report
+shows how long the engine sat idle and how much preprocessing overlapped
+with it.
+
+Usage (from hugging-face-deepseek-ocr):
+    python benchmarks/bench_pipeline.py [PDF ...] [--copies 3] [--batch-size 8] [--workers 8] [--engine-ms 150]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from ldf.deepseek.config import CROP_MODE, NUM_WORKERS, PROMPT
+from ldf.deepseek.ocr.pipeline import DEFAULT_QUEUE_SIZE, PreprocessPipeline
+from ldf.deepseek.ocr.process import DeepseekOCRProcessor
+from ldf.deepseek.raster import iter_page_batches
+
+
+class StubEngine:
+    """Stands in for vLLM's LLM: sleeps per page and records when it was busy and how full the queue was."""
+
+    def __init__(self, seconds_per_page, pipeline=None):
+        self.seconds_per_page = seconds_per_page
+        self.pipeline = pipeline
+        self.busy_seconds = 0.0
+        self.occupancy = []
+
+    def generate(self, inputs, sampling_params=None):
+        if self.pipeline is not None:
+            self.occupancy.append(self.pipeline.queued())
+        start = time.perf_counter()
+        time.sleep(self.seconds_per_page * len(inputs))
+        self.busy_seconds += time.perf_counter() - start
+        return [None] * len(inputs)
+
+
+def run_inline(pdf_paths, args):
+    processor = DeepseekOCRProcessor()
+    engine = StubEngine(args.engine_ms / 1000)
+    preprocess_seconds = 0.0
+    start = time.perf_counter()
+    for pdf_path in pdf_paths:
+        batches = iter_page_batches(pdf_path, args.batch_size)
+        while True:
+            batch_start = time.perf_counter()
+            batch = next(batches, None)
+            if batch is None:
+                break
+            inputs = [{"prompt": PROMPT, "multi_modal_data": {"image": processor.tokenize_with_images(
+                images=[image], bos=True, eos=True, cropping=CROP_MODE)}} for _, image in batch]
+            preprocess_seconds += time.perf_counter() - batch_start
+            engine.generate(inputs)
+    return time.perf_counter() - start, engine, preprocess_seconds
+
+
+def run_pipeline(pdf_paths, args):
+    pipeline = PreprocessPipeline(batch_size=args.batch_size, workers=args.workers, queue_size=args.queue_size)
+    engine = StubEngine(args.engine_ms / 1000, pipeline)
+    start = time.perf_counter()
+    for prepared in pipeline.run(pdf_paths):
+        if prepared.inputs:
+            engine.generate(prepared.inputs)
+    return time.perf_counter() - start, engine, pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", default=["input/orgchart/tb_gzt.pdf"], help="PDFs to process")
+    parser.add_argument("--copies", type=int, default=3, help="Process the PDF list this many times over")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS, help="Preprocessing threads")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--engine-ms", type=float, default=150.0, help="Stub engine time per page")
+    args = parser.parse_args()
+
+    pdf_paths = args.pdfs * args.copies
+    print(f"{len(pdf_paths)} PDFs, batches of {args.batch_size}, {args.workers} workers, "
+          f"queue of {args.queue_size}, stub engine {args.engine_ms:.0f} ms/page, {os.cpu_count()} CPUs")
+
+    wall, engine, preprocess_seconds = run_inline(pdf_paths, args)
+    print(f"inline    wall {wall:7.2f}s  engine busy {engine.busy_seconds:7.2f}s  "
+          f"engine idle {wall - engine.busy_seconds:7.2f}s  preprocess {preprocess_seconds:7.2f}s")
+
+    wall, engine, pipeline = run_pipeline(pdf_paths, args)
+    stats = pipeline.stats
+    overlap = max(0.0, stats["preprocess_seconds"] + engine.busy_seconds - wall)
+    mean_queued = sum(engine.occupancy) / len(engine.occupancy) if engine.occupancy else 0.0
+    print(f"pipeline  wall {wall:7.2f}s  engine busy {engine.busy_seconds:7.2f}s  "
+          f"engine idle {stats['wait_seconds']:7.2f}s  preprocess {stats['preprocess_seconds']:7.2f}s")
+    print(f"          {stats['batches']} batches, {stats['pages']} pages; queued at each generate: "
+          f"mean {mean_queued:.2f}, max {max(engine.occupancy, default=0)}; "
+          f"preprocessing overlapped the engine for {overlap:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
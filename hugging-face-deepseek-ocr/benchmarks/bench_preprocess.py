@@ -0,0 +1,109 @@
+"""
+CPU benchmark of per-page image preprocessing in DeepseekOCRProcessor: the
+previous path (ratio table rebuilt per image, a PIL crop and a
+ToTensor+Normalize per tile, then torch.stack) against tokenize_with_images,
+which resizes once, cuts tiles with a reshape and normalizes the stacked
+uint8 tensors once.
+
+Pages come from ldf.deepseek.raster, as in the OCR loop. For every page
+the pixel_values and images_crop must be identical and the prompt must hold
+the same number of image tokens.
+
+Usage (from hugging-face-deepseek-ocr):
+    python benchmarks/bench_preprocess.py [PDF] [--pages 20] [--dpi 144]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import torch
+from PIL import ImageOps
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from ldf.deepseek.config import IMAGE_SIZE, MAX_CROPS, MIN_CROPS
+from ldf.deepseek.ocr.process import DeepseekOCRProcessor, find_closest_aspect_ratio
+from ldf.deepseek.raster import iter_pdf_pages
+
+
+def legacy_dynamic_preprocess(image, min_num=MIN_CROPS, max_num=MAX_CROPS, image_size=IMAGE_SIZE):
+    """dynamic_preprocess as it was: ratio table rebuilt per image, one PIL crop per tile."""
+    orig_width, orig_height = image.size
+    target_ratios = set(
+        (i, j) for n in range(min_num, max_num + 1) for i in range(1, n + 1) for j in range(1, n + 1) if
+        i * j <= max_num and i * j >= min_num)
+    target_ratios = sorted(target_ratios, key=lambda x: x[0] * x[1])
+    ratio = find_closest_aspect_ratio(orig_width / orig_height, target_ratios, orig_width, orig_height, image_size)
+    target_width, target_height = image_size * ratio[0], image_size * ratio[1]
+    resized = image.resize((target_width, target_height))
+    columns = target_width // image_size
+    tiles = [resized.crop(((i % columns) * image_size, (i // columns) * image_size,
+                           (i % columns + 1) * image_size, (i // columns + 1) * image_size))
+             for i in range(ratio[0] * ratio[1])]
+    return tiles, ratio
+
+
+def legacy_preprocess(processor, image):
+    """The image half of the previous tokenize_with_images: (pixel_values, images_crop, image token count)."""
+    if image.size[0] <= 640 and image.size[1] <= 640:
+        tiles, crop_ratio = [], [1, 1]
+    else:
+        tiles, crop_ratio = legacy_dynamic_preprocess(image)
+    global_view = ImageOps.pad(image, (processor.base_size, processor.base_size),
+                               color=tuple(int(x * 255) for x in processor.image_transform.mean))
+    pixel_values = torch.stack([processor.image_transform(global_view)], dim=0)
+    num_width_tiles, num_height_tiles = crop_ratio
+    num_queries = math.ceil((processor.image_size // processor.patch_size) / processor.downsample_ratio)
+    num_queries_base = math.ceil((processor.base_size // processor.patch_size) / processor.downsample_ratio)
+    num_tokens = (num_queries_base + 1) * num_queries_base + 1
+    if num_width_tiles > 1 or num_height_tiles > 1:
+        images_crop = torch.stack([processor.image_transform(tile) for tile in tiles], dim=0).unsqueeze(0)
+        num_tokens += (num_queries * num_width_tiles + 1) * num_queries * num_height_tiles
+    else:
+        images_crop = torch.zeros((1, 3, processor.image_size, processor.image_size)).unsqueeze(0)
+    return pixel_values, images_crop, num_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", default="input/orgchart/tb_gzt.pdf", help="PDF to preprocess")
+    parser.add_argument("--pages", type=int, default=20, help="Pages to preprocess (repeating the PDF if short)")
+    parser.add_argument("--dpi", type=int, default=None, help="Render DPI (default: chosen per PDF)")
+    args = parser.parse_args()
+
+    processor = DeepseekOCRProcessor()
+    images = [image for _, image in iter_pdf_pages(args.pdf, dpi=args.dpi, workers=1)]
+    images = [images[i % len(images)] for i in range(args.pages)]
+    # Decode up front so neither path pays for it.
+    for image in images:
+        image.load()
+
+    legacy_seconds = 0.0
+    current_seconds = 0.0
+    for image in images:
+        start = time.perf_counter()
+        pixel_values, images_crop, num_tokens = legacy_preprocess(processor, image)
+        legacy_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        input_ids, current_pixel_values, current_images_crop, _, _, num_image_tokens, _ = \
+            processor.tokenize_with_images(images=[image], bos=True, eos=True, cropping=True)[0]
+        current_seconds += time.perf_counter() - start
+
+        assert torch.equal(pixel_values, current_pixel_values), "pixel_values differ"
+        assert torch.equal(images_crop, current_images_crop), "images_crop differ"
+        assert num_image_tokens == [num_tokens], "image token counts differ"
+        assert int((input_ids == processor.image_token_id).sum()) == num_tokens, "image token layout differs"
+
+    print(f"{os.path.basename(args.pdf)}, {len(images)} pages of {images[0].size[0]}x{images[0].size[1]}, "
+          f"{torch.get_num_threads()} torch threads; outputs identical")
+    # The legacy column covers image work only; the current one is the whole tokenize_with_images call.
+    for name, seconds in (("legacy", legacy_seconds), ("current", current_seconds)):
+        print(f"{name:8} {seconds / len(images) * 1000:8.1f} ms/page")
+    print(f"speedup  {legacy_seconds / current_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
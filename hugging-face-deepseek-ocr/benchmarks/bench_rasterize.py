@@ -0,0 +1,113 @@
+"""
+CPU benchmark of PDF rasterization: the previous pdf_to_images (PNG round
+trip, every page kept in a list) against ldf.deepseek.raster, serially
+and across a process pool.
+
+Each variant runs in its own subprocess so its peak RSS is measured alone.
+The engine variants consume pages as a stream, the way the OCR loop does,
+so their peak RSS stays flat as the page count grows.
+
+Usage (from hugging-face-deepseek-ocr):
+    python benchmarks/bench_rasterize.py [PDF] [--pages 300] [--dpi 144] [--workers 4]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+VARIANTS = ("legacy", "engine-serial", "engine-pool")
+
+
+def legacy_pdf_to_images(pdf_path, dpi=144):
+    """The function previously copied into ocr_app.py, ocr_workflow.py and ldf.deepseek.ocr.utils."""
+    import fitz
+    from PIL import Image
+
+    images = []
+    pdf_document = fitz.open(pdf_path)
+    zoom = dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom)
+    for page_num in range(pdf_document.page_count):
+        page = pdf_document[page_num]
+        pixmap = page.get_pixmap(matrix=matrix, alpha=False)
+        Image.MAX_IMAGE_PIXELS = None
+        img_data = pixmap.tobytes("png")
+        img = Image.open(io.BytesIO(img_data))
+        images.append(img)
+    pdf_document.close()
+    return images
+
+
+def run_variant(variant, pdf_path, dpi, workers):
+    start = time.perf_counter()
+    if variant == "legacy":
+        images = legacy_pdf_to_images(pdf_path, dpi)
+        # Image.open is lazy; decode as the OCR preprocessing would.
+        for image in images:
+            image.load()
+        pages = len(images)
+    else:
+        from ldf.deepseek.raster import iter_pdf_pages
+        pages = 0
+        for _, image in iter_pdf_pages(pdf_path, dpi=dpi, workers=1 if variant == "engine-serial" else workers):
+            image.load()
+            pages += 1
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux.
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"pages": pages, "seconds": elapsed, "peak_rss_mb": peak_mb}))
+
+
+def build_pdf(source, pages, dest):
+    """Repeat `source` until `dest` has `pages` pages, to stand in for a long gazette."""
+    import fitz
+
+    with fitz.open(source) as src, fitz.open() as out:
+        while out.page_count < pages:
+            last = min(src.page_count, pages - out.page_count) - 1
+            out.insert_pdf(src, to_page=last)
+        out.save(dest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", default="input/orgchart/tb_gzt.pdf", help="PDF to rasterize")
+    parser.add_argument("--pages", type=int, default=None, help="Repeat the PDF to this many pages")
+    parser.add_argument("--dpi", type=int, default=144)
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 4), help="Pool size")
+    parser.add_argument("--run", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_variant(args.run, args.pdf, args.dpi, args.workers)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if args.pages:
+            pdf_path = os.path.join(tmp, "bench.pdf")
+            build_pdf(args.pdf, args.pages, pdf_path)
+
+        print(f"{os.path.basename(args.pdf)}, {args.pages or 'all'} pages at {args.dpi} DPI, "
+              f"{args.workers} workers, {os.cpu_count()} CPUs")
+        print(f"{'variant':15} {'pages':>6} {'seconds':>8} {'pages/s':>8} {'peak RSS':>10}")
+        for variant in VARIANTS:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), pdf_path, "--run", variant,
+                 "--dpi", str(args.dpi), "--workers", str(args.workers)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{variant:15} {result['pages']:6} {result['seconds']:8.2f} "
+                  f"{result['pages'] / result['seconds']:8.1f} {result['peak_rss_mb']:8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
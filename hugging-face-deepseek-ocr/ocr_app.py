@@ -26,6 +26,8 @@ from pathlib import Path
 current_dir = os.getcwd()
 deepseek_vllm_path = os.path.join(current_dir, "external/DeepSeek-OCR/DeepSeek-OCR-master/DeepSeek-OCR-vllm")
 sys.path.append(deepseek_vllm_path)
+# Local ldf package, for the shared PDF rasterizer
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
 
 # Verify imports work
 try:
@@ -42,6 +44,7 @@ try:
     from process.ngram_norepeat import NoRepeatNGramLogitsProcessor
     from process.image_process import DeepseekOCRProcessor
     import config # Import config to get defaults if needed
+    from ldf.deepseek.ocr.pipeline import PreprocessPipeline
 except ImportError as e:
     print(f"Error importing modules: {e}")
     print(f"Please define 'external/DeepSeek-OCR' submodule and run 'pip install -r external/DeepSeek-OCR/requirements.txt'")
@@ -83,25 +86,6 @@ def setup_llm():
     
     return llm, sampling_params
 
-def pdf_to_images(pdf_path, dpi=144):
-    images = []
-    try:
-        pdf_document = fitz.open(pdf_path)
-        zoom = dpi / 72.0
-        matrix = fitz.Matrix(zoom, zoom)
-        
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document[page_num]
-            pixmap = page.get_pixmap(matrix=matrix, alpha=False)
-            Image.MAX_IMAGE_PIXELS = None
-            img_data = pixmap.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
-            images.append(img)
-        pdf_document.close()
-    except Exception as e:
-        print(f"Error converting PDF to images: {e}")
-    return images
-
 # Reuse the re_match logic from run_dpsk_ocr_pdf.py
 def re_match(text):
     pattern = r'(<\|ref\|>(.*?)<\|/ref\|><\|det\|>(.*?)<\|/det\|>)'
@@ -277,57 +261,48 @@ def main():
     
     results = [] # List to store JSON results
     
-    for pdf_path in pdf_files:
-        filename = os.path.basename(pdf_path)
-        base_name = os.path.splitext(filename)[0]
-        print(f"Processing: {filename}")
-        
-        pdf_images = pdf_to_images(pdf_path)
-        if not pdf_images:
-            print(f"No images extracted from {filename}")
-            continue
-            
-        # Prepare inputs
-        batch_inputs = []
-        for img in pdf_images:
-            # Preprocess using DeepseekOCRProcessor logic
-            # Note: We create a new processor instance or reuse one.
-            # Original code: DeepseekOCRProcessor().tokenize_with_images(...)
-            
-            tokenized = DeepseekOCRProcessor().tokenize_with_images(
-                images=[img], 
-                bos=True, 
-                eos=True, 
-                cropping=config.CROP_MODE
-            )
-            
-            batch_inputs.append({
-                "prompt": prompt_str,
-                "multi_modal_data": {"image": tokenized}
-            })
-            
-        # Generate
-        print(f"Generating for {len(batch_inputs)} pages...")
-        outputs = llm.generate(batch_inputs, sampling_params=sampling_params)
-        
-        doc_data = {
-            "file": filename,
-            "pages": []
-        }
-        
-        for idx, (output, img) in enumerate(zip(outputs, pdf_images)):
+    # Pages are rasterized and tokenized on NUM_WORKERS threads ahead of the engine, in batches of
+    # MAX_CONCURRENCY (what vLLM runs at once anyway), so the next batch, or the first pages of the
+    # next PDF, are prepared while the current batch is OCR'd, and only a few batches of images are in memory.
+    pipeline = PreprocessPipeline(
+        DeepseekOCRProcessor(),
+        prompt=prompt_str,
+        batch_size=config.MAX_CONCURRENCY,
+        workers=config.NUM_WORKERS,
+        cropping=config.CROP_MODE,
+    )
+    doc_data = None
+    for prepared in pipeline.run(pdf_files):
+        if doc_data is None:
+            filename = os.path.basename(prepared.pdf_path)
+            base_name = os.path.splitext(filename)[0]
+            print(f"Processing: {filename}")
+
+            doc_data = {
+                "file": filename,
+                "pages": []
+            }
+
+        batch = prepared.pages
+        outputs = []
+        if batch:
+            # Generate
+            print(f"Generating for pages {batch[0][0] + 1}-{batch[-1][0] + 1}...")
+            outputs = llm.generate(prepared.inputs, sampling_params=sampling_params)
+
+        for (idx, img), output in zip(batch, outputs):
             text_content = output.outputs[0].text
-            
+        
             # Clean generic eos token if present
             text_content = text_content.replace('<｜end▁of▁sentence｜>', '')
-            
+        
             # Extract Images/Figures
             # 1. Regex Match for refs
             matches_all, matches_images, matches_other = re_match(text_content)
-            
+        
             # 2. Crop and Save Images
             saved_img_paths = crop_and_save_images(img, matches_images, images_out_dir, idx, base_name)
-            
+        
             # 3. Tables?
             # We can't easily ground tables specifically without a specific prompt OR parsing the markdown.
             # We will just verify if markdown tables exist.
@@ -341,15 +316,15 @@ def main():
 
             # 4. Clean Content (Replace image refs with local paths, remove other refs)
             cleaned_content = text_content
-            
+        
             # Replace image refs with actual paths in markdown?
             # The original code replaces matched image refs with ![](images/...)
             # We should replace with our new paths.
-            
+        
             # Recalculate img_idx for replacement alignment
             # This is tricky because crop_and_save_images iterates matches_images.
             # We need to loop again or coordinate.
-            
+        
             current_img_idx = 0
             for match_str in matches_images:
                 # Construct path that was saved
@@ -359,17 +334,17 @@ def main():
                      rel_path = os.path.relpath(saved_img_paths[current_img_idx], args.output_dir)
                      cleaned_content = cleaned_content.replace(match_str, f'\n![Figure]({rel_path})\n')
                 current_img_idx += 1
-                
+            
             # Remove other refs
             for match_str in matches_other:
                 cleaned_content = cleaned_content.replace(match_str, '')
 
             # Cleanup formatting
             cleaned_content = cleaned_content.replace('\\coloneqq', ':=').replace('\\eqqcolon', '=:')
-            
+        
             # 5. Parse and Save Artifacts (CSVs, Metadata)
             artifacts = parse_and_save_artifacts(cleaned_content, args.output_dir, idx, base_name)
-            
+        
             page_record = {
                 "page": idx + 1,
                 "content": cleaned_content,
@@ -379,8 +354,14 @@ def main():
                 "metadata": artifacts["metadata"]
             }
             doc_data["pages"].append(page_record)
-            
-        results.append(doc_data)
+
+        if not prepared.last:
+            continue
+        if not doc_data["pages"]:
+            print(f"No images extracted from {filename}")
+        else:
+            results.append(doc_data)
+        doc_data = None
         
     # Save Output JSON
     json_path = os.path.join(args.output_dir, "output.json")
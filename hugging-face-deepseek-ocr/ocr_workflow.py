@@ -27,6 +27,8 @@ os.environ["CUDA_VISIBLE_DEVICES"] = '0'
 current_dir = os.getcwd()
 deepseek_vllm_path = os.path.join(current_dir, "external/DeepSeek-OCR/DeepSeek-OCR-master/DeepSeek-OCR-vllm")
 sys.path.append(deepseek_vllm_path)
+# Local ldf package, for the shared PDF rasterizer
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
 
 # ==========================================
 # Imports
@@ -43,6 +45,7 @@ try:
     from process.ngram_norepeat import NoRepeatNGramLogitsProcessor
     from process.image_process import DeepseekOCRProcessor
     import config
+    from ldf.deepseek.raster import iter_page_batches
 except ImportError as e:
     print(f"Error importing modules: {e}")
     print(f"Please define 'external/DeepSeek-OCR' submodule properly.")
@@ -54,24 +57,6 @@ ModelRegistry.register_model("DeepseekOCRForCausalLM", DeepseekOCRForCausalLM)
 # ==========================================
 # Logic Helpers (Reused from ocr_app.py)
 # ==========================================
-def pdf_to_images(pdf_path, dpi=144):
-    images = []
-    try:
-        pdf_document = fitz.open(pdf_path)
-        zoom = dpi / 72.0
-        matrix = fitz.Matrix(zoom, zoom)
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document[page_num]
-            pixmap = page.get_pixmap(matrix=matrix, alpha=False)
-            Image.MAX_IMAGE_PIXELS = None
-            img_data = pixmap.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
-            images.append(img)
-        pdf_document.close()
-    except Exception as e:
-        print(f"Error converting PDF to images: {e}")
-    return images
-
 def re_match(text):
     pattern = r'(<\|ref\|>(.*?)<\|/ref\|><\|det\|>(.*?)<\|/det\|>)'
     matches = re.findall(pattern, text, re.DOTALL)
@@ -132,7 +117,7 @@ class ExtractorAgent(Agent):
     Agent 1: Extraction
     Role: Raw OCR using DeepSeek-OCR.
     Input: PDF Path
-    Output: List of {page_num, raw_content, image object}
+    Output: List of {page_num, raw_content, content}
     """
     def __init__(self, llm_engine: LLM):
         super().__init__("Extractor")
@@ -151,37 +136,9 @@ class ExtractorAgent(Agent):
         )
 
     def process(self, pdf_path: str, output_dir: Optional[str] = None) -> (List[Dict[str, Any]], Dict[str, int]):
-        self.log(f"Converting PDF to images: {pdf_path}")
-        images = pdf_to_images(pdf_path)
-        if not images:
-            self.log("No images found.")
-            return [], {'input': 0, 'output': 0}
-
-        # Prepare Batch
-        batch_inputs = []
+        self.log(f"Rasterizing PDF: {pdf_path}")
         processor = DeepseekOCRProcessor()
-        
-        for img in images:
-            tokenized = processor.tokenize_with_images(
-                images=[img], 
-                bos=True, 
-                eos=True, 
-                cropping=config.CROP_MODE
-            )
-            batch_inputs.append({
-                "prompt": self.ocr_prompt,
-                "multi_modal_data": {"image": tokenized}
-            })
 
-        self.log(f"Running OCR on {len(batch_inputs)} pages...")
-        outputs = self.llm.generate(batch_inputs, sampling_params=self.sampling_params)
-        
-        # Calculate Token Usage
-        total_input_tokens = sum(len(o.prompt_token_ids) for o in outputs)
-        total_output_tokens = sum(len(o.outputs[0].token_ids) for o in outputs)
-        self.log(f"OCR Token Usage - Input: {total_input_tokens}, Output: {total_output_tokens}")
-        usage_stats = {'input': total_input_tokens, 'output': total_output_tokens}
-        
         results = []
         intermediate_data = [] # For JSON serialization
         
@@ -193,60 +150,89 @@ class ExtractorAgent(Agent):
             inter_dir = os.path.join(output_dir, "intermediate", base_name)
             images_out_dir = os.path.join(inter_dir, "images")
             os.makedirs(images_out_dir, exist_ok=True)
-        
-        for idx, (output, img) in enumerate(zip(outputs, images)):
-            text = output.outputs[0].text
-            # Clean generic eos token
-            text = text.replace('<｜end▁of▁sentence｜>', '')
+
+        # Pages stream from the rasterizer in batches, so only one batch of images is held at a time.
+        total_input_tokens = 0
+        total_output_tokens = 0
+        for batch in iter_page_batches(pdf_path, config.MAX_CONCURRENCY):
+            batch_inputs = []
+            for _, img in batch:
+                tokenized = processor.tokenize_with_images(
+                    images=[img], 
+                    bos=True, 
+                    eos=True, 
+                    cropping=config.CROP_MODE
+                )
+                batch_inputs.append({
+                    "prompt": self.ocr_prompt,
+                    "multi_modal_data": {"image": tokenized}
+                })
+
+            self.log(f"Running OCR on pages {batch[0][0] + 1}-{batch[-1][0] + 1}...")
+            outputs = self.llm.generate(batch_inputs, sampling_params=self.sampling_params)
+            total_input_tokens += sum(len(o.prompt_token_ids) for o in outputs)
+            total_output_tokens += sum(len(o.outputs[0].token_ids) for o in outputs)
+
+            for (idx, img), output in zip(batch, outputs):
+                text = output.outputs[0].text
+                # Clean generic eos token
+                text = text.replace('<｜end▁of▁sentence｜>', '')
             
-            # 1. Parse Image Refs
-            matches_all, matches_images, matches_other = re_match(text)
+                # 1. Parse Image Refs
+                matches_all, matches_images, matches_other = re_match(text)
             
-            # 2. Crop and Save Images (if intermediate saving enabled)
-            saved_img_paths = []
-            if save_intermediate and images_out_dir:
-                # Also save the full page for reference
-                full_page_path = os.path.join(images_out_dir, f"{base_name}_p{idx+1}_full.png")
-                img.save(full_page_path)
+                # 2. Crop and Save Images (if intermediate saving enabled)
+                saved_img_paths = []
+                if save_intermediate and images_out_dir:
+                    # Also save the full page for reference
+                    full_page_path = os.path.join(images_out_dir, f"{base_name}_p{idx+1}_full.png")
+                    img.save(full_page_path)
                 
-                # Crop detections
-                saved_img_paths = crop_and_save_images(img, matches_images, images_out_dir, idx, base_name)
+                    # Crop detections
+                    saved_img_paths = crop_and_save_images(img, matches_images, images_out_dir, idx, base_name)
             
-            # 3. Create Cleaned Content (Replace refs with markdown)
-            cleaned_content = text
-            current_img_idx = 0
-            for match_str in matches_images:
-                if current_img_idx < len(saved_img_paths) and save_intermediate:
-                     rel_path = os.path.relpath(saved_img_paths[current_img_idx], output_dir)
-                     cleaned_content = cleaned_content.replace(match_str, f'\n![Figure]({rel_path})\n')
-                else:
-                     # If not saving intermediate, strictly we can't link images easily.
-                     # Just remove or leave placeholder? User wants content. 
-                     # Let's remove if we can't link, or keep placeholder.
-                     # "content: cleaner version". 
-                     cleaned_content = cleaned_content.replace(match_str, '')
-                current_img_idx += 1
+                # 3. Create Cleaned Content (Replace refs with markdown)
+                cleaned_content = text
+                current_img_idx = 0
+                for match_str in matches_images:
+                    if current_img_idx < len(saved_img_paths) and save_intermediate:
+                         rel_path = os.path.relpath(saved_img_paths[current_img_idx], output_dir)
+                         cleaned_content = cleaned_content.replace(match_str, f'\n![Figure]({rel_path})\n')
+                    else:
+                         # If not saving intermediate, strictly we can't link images easily.
+                         # Just remove or leave placeholder? User wants content. 
+                         # Let's remove if we can't link, or keep placeholder.
+                         # "content: cleaner version". 
+                         cleaned_content = cleaned_content.replace(match_str, '')
+                    current_img_idx += 1
             
-            # Remove other refs
-            for match_str in matches_other:
-                cleaned_content = cleaned_content.replace(match_str, '')
-
-            # Cleanup formatting
-            cleaned_content = cleaned_content.replace('\\coloneqq', ':=').replace('\\eqqcolon', '=:')
-
-            results.append({
-                "page_num": idx + 1,
-                "raw_content": text,
-                "content": cleaned_content, # New field
-                "image": img
-            })
+                # Remove other refs
+                for match_str in matches_other:
+                    cleaned_content = cleaned_content.replace(match_str, '')
+
+                # Cleanup formatting
+                cleaned_content = cleaned_content.replace('\\coloneqq', ':=').replace('\\eqqcolon', '=:')
+
+                results.append({
+                    "page_num": idx + 1,
+                    "raw_content": text,
+                    "content": cleaned_content, # New field
+                })
             
-            intermediate_data.append({
-                "page_num": idx + 1,
-                "raw_content": text,
-                "content": cleaned_content,
-                "image_paths": [os.path.relpath(p, output_dir) for p in saved_img_paths] if save_intermediate else []
-            })
+                intermediate_data.append({
+                    "page_num": idx + 1,
+                    "raw_content": text,
+                    "content": cleaned_content,
+                    "image_paths": [os.path.relpath(p, output_dir) for p in saved_img_paths] if save_intermediate else []
+                })
+
+        if not results:
+            self.log("No images found.")
+            return [], {'input': 0, 'output': 0}
+
+        # Calculate Token Usage
+        self.log(f"OCR Token Usage - Input: {total_input_tokens}, Output: {total_output_tokens}")
+        usage_stats = {'input': total_input_tokens, 'output': total_output_tokens}
             
         # Save Intermediate JSON
         if save_intermediate:
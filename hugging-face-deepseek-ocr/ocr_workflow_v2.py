@@ -18,6 +18,10 @@ def main():
     parser.add_argument("--output_dir", type=str, required=True, help="Output directory")
     parser.add_argument("--prompt_file", type=str, required=True, help="Path to prompt text file")
     parser.add_argument("--model_path", type=str, default="deepseek-ai/DeepSeek-OCR", help="Path to OCR model")
+    parser.add_argument("--schedule", choices=["phased", "interleaved"], default="phased",
+                        help="phased: OCR every PDF, then structure them; interleaved: keep both models loaded and alternate per chunk")
+    parser.add_argument("--chunk_size", type=int, default=4, help="PDFs per chunk in interleaved mode")
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints in the output directory and start over")
     
     args = parser.parse_args()
     
@@ -37,7 +41,10 @@ def main():
         input_dir=args.input_dir,
         output_dir=args.output_dir,
         prompt_file=args.prompt_file,
-        model_path=args.model_path
+        model_path=args.model_path,
+        schedule=args.schedule,
+        chunk_size=args.chunk_size,
+        resume=not args.restart,
     )
     
     agent.run()
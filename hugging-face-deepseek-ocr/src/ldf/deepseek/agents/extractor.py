@@ -1,16 +1,17 @@
 import os
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
 from vllm import LLM, SamplingParams
 
 # Internal Imports
 from ldf.deepseek.agents.base import Agent
-from ldf.deepseek.ocr.utils import pdf_to_images, re_match, crop_and_save_images
+from ldf.deepseek.ocr.pipeline import DEFAULT_QUEUE_SIZE, PreprocessPipeline
+from ldf.deepseek.ocr.utils import re_match, crop_and_save_images
 # We need these from the deepseek submodule...
-from ldf.deepseek.ocr.logits_process import NoRepeatNGramLogitsProcessor
+from ldf.deepseek.ocr.logits_process import IncrementalNoRepeatNGramLogitsProcessor
 from ldf.deepseek.ocr.process import DeepseekOCRProcessor
-from ldf.deepseek.config import PROMPT
+from ldf.deepseek.config import PROMPT, MAX_CONCURRENCY, NUM_WORKERS
 # How to handle config? We might need to pass config or import it.
 # For now, hardcode or accept as init params.
 
@@ -19,16 +20,23 @@ class ExtractorAgent(Agent):
     Agent 1: Extraction
     Role: Raw OCR using DeepSeek-OCR.
     Input: PDF Path
-    Output: List of {page_num, raw_content, image object}
+    Output: List of {page_num, raw_content, content}
     """
-    def __init__(self, llm_engine: LLM):
+    def __init__(self, llm_engine: LLM, batch_size: int = MAX_CONCURRENCY, workers: int = NUM_WORKERS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
         super().__init__("Extractor")
         self.llm = llm_engine
+        self.processor = DeepseekOCRProcessor()
+        # Pages rasterized and sent to the engine at a time
+        self.batch_size = batch_size
+        # Preprocessing threads, and prepared batches allowed to wait for the engine
+        self.workers = workers
+        self.queue_size = queue_size
         # OCR Prompt
         self.ocr_prompt = PROMPT 
 
         # Setup Sampling Params for OCR
-        logits_processors = [NoRepeatNGramLogitsProcessor(ngram_size=20, window_size=50, whitelist_token_ids={128821, 128822})]
+        logits_processors = [IncrementalNoRepeatNGramLogitsProcessor(ngram_size=20, window_size=50, whitelist_token_ids={128821, 128822})]
         self.sampling_params = SamplingParams(
             temperature=0.0,
             max_tokens=8192,
@@ -38,70 +46,88 @@ class ExtractorAgent(Agent):
         )
 
     def process(self, pdf_path: str, output_dir: Optional[str] = None) -> (List[Dict[str, Any]], Dict[str, int]):
-        self.log(f"Converting PDF to images: {pdf_path}")
-        images = pdf_to_images(pdf_path)
-        if not images:
-            self.log("No images found.")
-            return [], {'input': 0, 'output': 0}
+        for _, results, usage_stats in self.process_all([pdf_path], output_dir):
+            return results, usage_stats
 
-        # Prepare Batch
-        batch_inputs = []
-        processor = DeepseekOCRProcessor()
-        
-        # Hardcoded crop mode 'd' from original config for now
-        crop_mode = 'd' 
-        
-        for img in images:
-            tokenized = processor.tokenize_with_images(
-                images=[img], 
-                bos=True, 
-                eos=True, 
-                cropping=crop_mode
-            )
-            batch_inputs.append({
-                "prompt": self.ocr_prompt,
-                "multi_modal_data": {"image": tokenized}
-            })
+    def process_all(self, pdf_paths: Iterable[str], output_dir: Optional[str] = None) -> Iterator[Tuple[str, List[Dict[str, Any]], Dict[str, int]]]:
+        """
+        Yield (pdf_path, results, usage_stats) for each PDF as its OCR finishes.
+        Pages are rasterized and tokenized by a PreprocessPipeline while the
+        engine works on the previous batch, including across PDFs.
+        """
+        pipeline = PreprocessPipeline(
+            self.processor,
+            prompt=self.ocr_prompt,
+            batch_size=self.batch_size,
+            workers=self.workers,
+            queue_size=self.queue_size,
+            # Hardcoded crop mode 'd' from original config for now
+            cropping='d',
+        )
+        state = None
+        for batch in pipeline.run(pdf_paths):
+            if state is None:
+                self.log(f"Processing PDF: {batch.pdf_path}")
+                state = self._start_pdf(batch.pdf_path, output_dir)
 
-        self.log(f"Running OCR on {len(batch_inputs)} pages...")
-        outputs = self.llm.generate(batch_inputs, sampling_params=self.sampling_params)
-        
-        # Calculate Token Usage
-        total_input_tokens = sum(len(o.prompt_token_ids) for o in outputs)
-        total_output_tokens = sum(len(o.outputs[0].token_ids) for o in outputs)
-        self.log(f"OCR Token Usage - Input: {total_input_tokens}, Output: {total_output_tokens}")
-        usage_stats = {'input': total_input_tokens, 'output': total_output_tokens}
-        
-        results = []
-        intermediate_data = [] # For JSON serialization
-        
+            if batch.pages:
+                self.log(f"Running OCR on pages {batch.pages[0][0] + 1}-{batch.pages[-1][0] + 1}...")
+                outputs = self.llm.generate(batch.inputs, sampling_params=self.sampling_params)
+                self._collect(state, batch.pages, outputs)
+
+            if batch.last:
+                yield (batch.pdf_path,) + self._finish_pdf(state)
+                state = None
+
+    @staticmethod
+    def output_path(output_dir: str, pdf_path: str) -> str:
+        """Where process() saves a PDF's OCR pages (without images) when given an output_dir."""
+        return os.path.join(output_dir, "intermediate", Path(pdf_path).stem, "ocr_raw_output.json")
+
+    def _start_pdf(self, pdf_path: str, output_dir: Optional[str]) -> Dict[str, Any]:
+        state = {
+            "output_dir": output_dir,
+            "base_name": Path(pdf_path).stem,
+            "json_path": None,
+            "images_out_dir": None,
+            "results": [],
+            "intermediate_data": [], # For JSON serialization
+            "input_tokens": 0,
+            "output_tokens": 0,
+        }
         # Setup Intermediate Directory if output_dir provided
+        if output_dir is not None:
+            state["json_path"] = self.output_path(output_dir, pdf_path)
+            state["images_out_dir"] = os.path.join(os.path.dirname(state["json_path"]), "images")
+            os.makedirs(state["images_out_dir"], exist_ok=True)
+        return state
+
+    def _collect(self, state: Dict[str, Any], pages, outputs):
+        output_dir = state["output_dir"]
+        base_name = state["base_name"]
+        images_out_dir = state["images_out_dir"]
         save_intermediate = output_dir is not None
-        images_out_dir = None
-        if save_intermediate:
-            base_name = Path(pdf_path).stem
-            inter_dir = os.path.join(output_dir, "intermediate", base_name)
-            images_out_dir = os.path.join(inter_dir, "images")
-            os.makedirs(images_out_dir, exist_ok=True)
-        
-        for idx, (output, img) in enumerate(zip(outputs, images)):
+        state["input_tokens"] += sum(len(o.prompt_token_ids) for o in outputs)
+        state["output_tokens"] += sum(len(o.outputs[0].token_ids) for o in outputs)
+
+        for (idx, img), output in zip(pages, outputs):
             text = output.outputs[0].text
             # Clean generic eos token
             text = text.replace('<｜end▁of▁sentence｜>', '')
-            
+        
             # 1. Parse Image Refs
             matches_all, matches_images, matches_other = re_match(text)
-            
+        
             # 2. Crop and Save Images (if intermediate saving enabled)
             saved_img_paths = []
             if save_intermediate and images_out_dir:
                 # Also save the full page for reference
                 full_page_path = os.path.join(images_out_dir, f"{base_name}_p{idx+1}_full.png")
                 img.save(full_page_path)
-                
+            
                 # Crop detections
                 saved_img_paths = crop_and_save_images(img, matches_images, images_out_dir, idx, base_name)
-            
+        
             # 3. Create Cleaned Content (Replace refs with markdown)
             cleaned_content = text
             current_img_idx = 0
@@ -112,7 +138,7 @@ class ExtractorAgent(Agent):
                 else:
                      cleaned_content = cleaned_content.replace(match_str, '')
                 current_img_idx += 1
-            
+        
             # Remove other refs
             for match_str in matches_other:
                 cleaned_content = cleaned_content.replace(match_str, '')
@@ -120,25 +146,35 @@ class ExtractorAgent(Agent):
             # Cleanup formatting
             cleaned_content = cleaned_content.replace('\\coloneqq', ':=').replace('\\eqqcolon', '=:')
 
-            results.append({
+            state["results"].append({
                 "page_num": idx + 1,
                 "raw_content": text,
                 "content": cleaned_content, # New field
-                "image": img
             })
-            
-            intermediate_data.append({
+        
+            state["intermediate_data"].append({
                 "page_num": idx + 1,
                 "raw_content": text,
                 "content": cleaned_content,
                 "image_paths": [os.path.relpath(p, output_dir) for p in saved_img_paths] if save_intermediate else []
             })
+
+    def _finish_pdf(self, state: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        results = state["results"]
+        if not results:
+            self.log("No images found.")
+            return [], {'input': 0, 'output': 0}
+
+        # Calculate Token Usage
+        total_input_tokens, total_output_tokens = state["input_tokens"], state["output_tokens"]
+        self.log(f"OCR Token Usage - Input: {total_input_tokens}, Output: {total_output_tokens}")
+        usage_stats = {'input': total_input_tokens, 'output': total_output_tokens}
             
         # Save Intermediate JSON
-        if save_intermediate:
-            json_path = os.path.join(inter_dir, "ocr_raw_output.json")
+        if state["output_dir"] is not None:
+            json_path = state["json_path"]
             with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(intermediate_data, f, indent=2, ensure_ascii=False)
+                json.dump(state["intermediate_data"], f, indent=2, ensure_ascii=False)
             self.log(f"Saved intermediate OCR results to: {json_path}")
             
         return results, usage_stats
@@ -0,0 +1,83 @@
+import os
+import json
+import time
+from typing import Any, Dict, Optional
+
+# Per-PDF stages, in order: OCR, LLM structuring, then aggregation and final output.
+STAGES = ("ocr", "structure", "final")
+
+
+class WorkflowManifest:
+    """
+    Per-PDF stage checkpoints of the workflow, kept as JSON in the output directory.
+
+    Each stage's output is spilled to disk by the agent that produces it; the
+    manifest records which stages of which PDF have completed, where their
+    output is and the tokens they used, so an interrupted run resumes from the
+    last completed stage. A PDF's entry starts over if the file changes size or
+    modification time. The manifest is rewritten atomically after every stage.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.data = {"version": 1, "pdfs": {}}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    @staticmethod
+    def _fingerprint(pdf_path: str) -> Dict[str, int]:
+        stat = os.stat(pdf_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def entry(self, pdf_path: str) -> Dict[str, Any]:
+        name = os.path.basename(pdf_path)
+        fingerprint = self._fingerprint(pdf_path)
+        entry = self.data["pdfs"].get(name)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            entry = {"fingerprint": fingerprint, "stages": {}}
+            self.data["pdfs"][name] = entry
+        return entry
+
+    def stage(self, pdf_path: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Checkpoint of a completed stage, or None if it still has to run (or its output has gone missing)."""
+        stages = self.entry(pdf_path)["stages"]
+        checkpoint = stages.get(stage)
+        if checkpoint is not None and checkpoint["path"] and not os.path.exists(checkpoint["path"]):
+            for later in STAGES[STAGES.index(stage):]:
+                stages.pop(later, None)
+            return None
+        return checkpoint
+
+    def done(self, pdf_path: str, stage: str) -> bool:
+        return self.stage(pdf_path, stage) is not None
+
+    def complete(self, pdf_path: str, stage: str, path: Optional[str] = None, usage: Optional[Dict[str, int]] = None, **info):
+        """Record `stage` of `pdf_path` as finished, with its spilled output at `path`."""
+        checkpoint = {"path": path, "usage": usage or {'input': 0, 'output': 0}, "completed_at": time.time()}
+        checkpoint.update(info)
+        stages = self.entry(pdf_path)["stages"]
+        stages[stage] = checkpoint
+        # A redone stage invalidates the ones after it.
+        for later in STAGES[STAGES.index(stage) + 1:]:
+            stages.pop(later, None)
+        self.save()
+
+    def usage(self) -> Dict[str, int]:
+        """Tokens used by every completed stage, including those of earlier runs."""
+        total = {'input': 0, 'output': 0}
+        for entry in self.data["pdfs"].values():
+            for checkpoint in entry["stages"].values():
+                total['input'] += checkpoint["usage"].get('input', 0)
+                total['output'] += checkpoint["usage"].get('output', 0)
+        return total
+
+    def reset(self):
+        self.data = {"version": 1, "pdfs": {}}
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
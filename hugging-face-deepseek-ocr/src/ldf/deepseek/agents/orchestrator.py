@@ -1,8 +1,10 @@
 import os
 import gc
+import json
+import time
 import torch
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from vllm import LLM
 
 from ldf.deepseek.agents.base import Agent
@@ -10,130 +12,227 @@ from ldf.deepseek.agents.extractor import ExtractorAgent, DeepseekOCRProcessor
 from ldf.deepseek.agents.processor import ProcessorAgent
 from ldf.deepseek.agents.aggregator import AggregatorAgent
 from ldf.deepseek.agents.finalizer import FinalizerAgent
+from ldf.deepseek.agents.manifest import WorkflowManifest
 # We need to register the model for VLLM
 # We need to register the model for VLLM
 import ldf.deepseek.ocr
- 
+
+# Both models loaded and PDFs alternated between them in chunks, vs. all OCR first (the default).
+SCHEDULES = ("phased", "interleaved")
+# GPU memory fractions (OCR, text) when both models are resident in interleaved mode.
+INTERLEAVED_MEMORY = (0.35, 0.55)
+
 
 class OrchestratorAgent(Agent):
-    def __init__(self, input_dir, output_dir, prompt_file, model_path, processor_model_path="Qwen/Qwen2.5-7B-Instruct"):
+    """
+    Runs the workflow PDF by PDF: OCR, LLM structuring, then aggregation and
+    final output. Each stage's output is spilled to disk as it completes and
+    checkpointed in `workflow_manifest.json`, so a rerun skips finished stages
+    and the structuring phase reads OCR text back from disk one PDF at a time.
+
+    `schedule="phased"` OCRs every pending PDF, unloads the OCR model, then
+    loads the text model. `schedule="interleaved"` keeps both models loaded
+    and alternates between them every `chunk_size` PDFs.
+    """
+    def __init__(self, input_dir, output_dir, prompt_file, model_path, processor_model_path="Qwen/Qwen2.5-7B-Instruct",
+                 schedule: str = "phased", chunk_size: int = 4, resume: bool = True):
         super().__init__("Orchestrator")
+        if schedule not in SCHEDULES:
+            raise ValueError(f"`schedule` has to be one of {SCHEDULES}, but is {schedule!r}")
+        if chunk_size <= 0:
+            raise ValueError(f"`chunk_size` has to be a strictly positive integer, but is {chunk_size}")
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.prompt_file = prompt_file
         self.model_path = model_path
         self.processor_model_path = processor_model_path
-        
+        self.schedule = schedule
+        self.chunk_size = chunk_size
+
         # Load User Prompt
         with open(prompt_file, 'r', encoding='utf-8') as f:
             self.user_prompt_content = f.read()
 
+        self.manifest = WorkflowManifest(os.path.join(output_dir, "workflow_manifest.json"))
+        if not resume:
+            self.manifest.reset()
+
         # Agents (initialized on demand or here)
         self.aggregator = AggregatorAgent()
         self.finalizer = FinalizerAgent()
+        self.extractor = None
+        self.ocr_llm = None
+        self.processor = None
+        self.text_llm = None
 
-    def run(self):
-        import time
-        start_time = time.time()
-        
-        # Token Counters
-        workflow_input_tokens = 0
-        workflow_output_tokens = 0
-        
-        # Scan Inputs
-        input_path = Path(self.input_dir)
-        pdf_files = list(input_path.glob("*.pdf"))
-        self.log(f"Found {len(pdf_files)} PDF files.")
-        
-        # --- PHASE 1: EXTRACTION (OCR MODEL) ---
-        self.log("--- PHASE 1: STARTING EXTRACTION (OCR) ---")
-        phase1_start = time.time()
-        
-        # Initialize OCR Engine
-        ocr_llm = LLM(
-            model=self.model_path,
-            hf_overrides={"architectures": ["DeepseekOCRForCausalLM"]},
-            block_size=256,
-            trust_remote_code=True,
-            max_model_len=8192,
-            max_num_seqs=10, # Configurable?
-            enforce_eager=True # Optimization
-        )
-        
-        extractor = ExtractorAgent(ocr_llm)
-        
-        all_workflow_data = {} # Map pdf_name -> extracted_pages
-        
-        for pdf_file in pdf_files:
-            self.log(f"Processing PDF (OCR): {pdf_file.name}")
-            pages_data, usage = extractor.process(str(pdf_file), self.output_dir)
-            all_workflow_data[pdf_file.name] = pages_data
-            
-            workflow_input_tokens += usage.get('input', 0)
-            workflow_output_tokens += usage.get('output', 0)
-            
+        # Token usage of this run
+        self.workflow_input_tokens = 0
+        self.workflow_output_tokens = 0
+
+    def _add_usage(self, usage: Dict[str, int]):
+        self.workflow_input_tokens += usage.get('input', 0)
+        self.workflow_output_tokens += usage.get('output', 0)
+
+    def _memory_fraction(self, index: int, default: Optional[float]) -> Dict[str, Any]:
+        if self.schedule == "interleaved":
+            return {"gpu_memory_utilization": INTERLEAVED_MEMORY[index]}
+        return {} if default is None else {"gpu_memory_utilization": default}
+
+    def _get_extractor(self) -> ExtractorAgent:
+        if self.extractor is None:
+            # Initialize OCR Engine
+            self.ocr_llm = LLM(
+                model=self.model_path,
+                hf_overrides={"architectures": ["DeepseekOCRForCausalLM"]},
+                block_size=256,
+                trust_remote_code=True,
+                max_model_len=8192,
+                max_num_seqs=10, # Configurable?
+                enforce_eager=True, # Optimization
+                **self._memory_fraction(0, None)
+            )
+            self.extractor = ExtractorAgent(self.ocr_llm)
+        return self.extractor
+
+    def _unload_extractor(self):
+        if self.extractor is None:
+            return
         # Clean up OCR Model
-        del extractor
-        del ocr_llm
+        self.extractor = None
+        self.ocr_llm = None
         gc.collect()
         torch.cuda.empty_cache()
         self.log("OCR Model Unloaded.")
-        phase1_duration = time.time() - phase1_start
-        self.log(f"Phase 1 (OCR) Duration: {phase1_duration:.2f} seconds")
-        
-        # --- PHASE 2: PROCESSING (TEXT MODEL) ---
-        self.log("--- PHASE 2: STARTING PROCESSING (TEXT) ---")
-        phase2_start = time.time()
-        
-        # Initialize Text Engine
-        text_llm = LLM(
-            model=self.processor_model_path,
-            trust_remote_code=True,
-            gpu_memory_utilization=0.95 # Use full available memory
-        )
-        
-        processor = ProcessorAgent(text_llm, self.user_prompt_content, self.processor_model_path)
-        
-        for pdf_name, pages_data in all_workflow_data.items():
-            self.log(f"Processing PDF (Struct): {pdf_name}")
-            
+
+    def _get_processor(self) -> ProcessorAgent:
+        if self.processor is None:
+            # Initialize Text Engine
+            self.text_llm = LLM(
+                model=self.processor_model_path,
+                trust_remote_code=True,
+                **self._memory_fraction(1, 0.95) # Use full available memory when alone
+            )
+            self.processor = ProcessorAgent(self.text_llm, self.user_prompt_content, self.processor_model_path)
+        return self.processor
+
+    def run_ocr(self, pdf_files: List[Path]):
+        """OCR the PDFs without a completed OCR checkpoint, spilling each as it finishes."""
+        pending = [pdf for pdf in pdf_files if not self.manifest.done(str(pdf), "ocr")]
+        if not pending:
+            return
+        extractor = self._get_extractor()
+        # The next PDF is rasterized and tokenized while the engine OCRs the current one.
+        for pdf_path, pages_data, usage in extractor.process_all([str(p) for p in pending], self.output_dir):
+            self.log(f"Finished PDF (OCR): {Path(pdf_path).name}")
+            # Pages with no text leave nothing on disk; phase 2 then sees an empty PDF.
+            spill_path = ExtractorAgent.output_path(self.output_dir, pdf_path) if pages_data else None
+            self.manifest.complete(pdf_path, "ocr", spill_path, usage, pages=len(pages_data))
+            self._add_usage(usage)
+
+    def _load_pages(self, checkpoint: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not checkpoint["path"]:
+            return []
+        with open(checkpoint["path"], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def run_structure(self, pdf_files: List[Path]):
+        """Structure, aggregate and finalize the PDFs, reading their OCR output back from disk one at a time."""
+        for pdf_file in pdf_files:
+            pdf_path = str(pdf_file)
+            if self.manifest.done(pdf_path, "final"):
+                continue
+            if not self.manifest.done(pdf_path, "ocr"):
+                self.log(f"Skipping {pdf_file.name}: OCR has not completed")
+                continue
+            self.log(f"Processing PDF (Struct): {pdf_file.name}")
+
             # 1. Structure (Processor)
-            structured_pages, usage = processor.process(pages_data, self.output_dir, pdf_name)
-            
-            workflow_input_tokens += usage.get('input', 0)
-            workflow_output_tokens += usage.get('output', 0)
-            
+            structured = self.manifest.stage(pdf_path, "structure")
+            if structured is not None:
+                self.log(f"Resuming from structured output: {structured['path']}")
+                structured_pages = self._load_pages(structured)
+            else:
+                pages_data = self._load_pages(self.manifest.stage(pdf_path, "ocr"))
+                if pages_data:
+                    structured_pages, usage = self._get_processor().process(pages_data, self.output_dir, pdf_file.name)
+                    spill_path = ProcessorAgent.output_path(self.output_dir, pdf_file.name)
+                else:
+                    structured_pages, usage, spill_path = [], {'input': 0, 'output': 0}, None
+                self.manifest.complete(pdf_path, "structure", spill_path, usage, pages=len(structured_pages))
+                self._add_usage(usage)
+
             # 2. Aggregate
-            consolidated_data = self.aggregator.process(structured_pages, self.output_dir, pdf_name)
-            
+            consolidated_data = self.aggregator.process(structured_pages, self.output_dir, pdf_file.name)
+
             # 3. Finalize
             # Create subfolder for this PDF's result? Or root output?
             # Existing workflow puts it in output_dir/pdf_name_no_ext usually or flat?
             # Original script did: os.path.join(args.output_dir, pdf_name_no_ext)
-            
-            pdf_out_dir = os.path.join(self.output_dir, Path(pdf_name).stem)
+
+            pdf_out_dir = os.path.join(self.output_dir, pdf_file.stem)
             self.finalizer.process(consolidated_data, pdf_out_dir)
-            
-        phase2_duration = time.time() - phase2_start
+            self.manifest.complete(pdf_path, "final", pdf_out_dir, entries=len(consolidated_data))
+
+    def run(self):
+        start_time = time.time()
+
+        # Scan Inputs
+        input_path = Path(self.input_dir)
+        pdf_files = sorted(input_path.glob("*.pdf"))
+        self.log(f"Found {len(pdf_files)} PDF files.")
+        remaining = [pdf for pdf in pdf_files if not self.manifest.done(str(pdf), "final")]
+        if len(remaining) < len(pdf_files):
+            self.log(f"Resuming: {len(pdf_files) - len(remaining)} PDFs already complete.")
+
+        if self.schedule == "phased":
+            chunks = [remaining] if remaining else []
+        else:
+            chunks = [remaining[i:i + self.chunk_size] for i in range(0, len(remaining), self.chunk_size)]
+            self.log(f"Interleaving OCR and structuring in chunks of {self.chunk_size} PDFs.")
+
+        phase1_duration = 0.0
+        phase2_duration = 0.0
+        for chunk in chunks:
+            # --- PHASE 1: EXTRACTION (OCR MODEL) ---
+            self.log("--- PHASE 1: STARTING EXTRACTION (OCR) ---")
+            phase1_start = time.time()
+            self.run_ocr(chunk)
+            if self.schedule == "phased":
+                self._unload_extractor()
+            phase1_duration += time.time() - phase1_start
+            self.log(f"Phase 1 (OCR) Duration: {phase1_duration:.2f} seconds")
+
+            # --- PHASE 2: PROCESSING (TEXT MODEL) ---
+            self.log("--- PHASE 2: STARTING PROCESSING (TEXT) ---")
+            phase2_start = time.time()
+            self.run_structure(chunk)
+            phase2_duration += time.time() - phase2_start
+            self.log(f"Phase 2 (Processing) Duration: {phase2_duration:.2f} seconds")
+
+        self._unload_extractor()
         total_duration = time.time() - start_time
-        
-        self.log(f"Phase 2 (Processing) Duration: {phase2_duration:.2f} seconds")
+        cumulative_usage = self.manifest.usage()
+
         self.log(f"Workflow Complete. Total Time: {total_duration:.2f} seconds")
-        self.log(f"Total Workflow Token Usage - Input: {workflow_input_tokens}, Output: {workflow_output_tokens}")
-        
+        self.log(f"Total Workflow Token Usage - Input: {self.workflow_input_tokens}, Output: {self.workflow_output_tokens}")
+
         # Save Metrics to Disk
         metrics = {
             "total_duration_seconds": total_duration,
             "phase1_duration_seconds": phase1_duration,
             "phase2_duration_seconds": phase2_duration,
+            "schedule": self.schedule,
+            "pdfs_total": len(pdf_files),
+            "pdfs_resumed_complete": len(pdf_files) - len(remaining),
             "token_usage": {
-                "total_input": workflow_input_tokens,
-                "total_output": workflow_output_tokens
+                "total_input": self.workflow_input_tokens,
+                "total_output": self.workflow_output_tokens,
+                # Including stages completed by earlier, interrupted runs
+                "cumulative_input": cumulative_usage['input'],
+                "cumulative_output": cumulative_usage['output'],
             }
         }
-        
-        # Use json module (already imported? No, let's assume it is or import it inside)
-        import json
+
         metrics_path = os.path.join(self.output_dir, "workflow_metrics.json")
         with open(metrics_path, 'w', encoding='utf-8') as f:
             json.dump(metrics, f, indent=2)
@@ -26,6 +26,11 @@ class ProcessorAgent(Agent):
         self.tokenizer = AutoTokenizer.from_pretrained(model_path, trust_remote_code=True)
 
 
+    @staticmethod
+    def output_path(output_dir: str, pdf_name: str) -> str:
+        """Where process() saves a PDF's structured pages when given output_dir and pdf_name."""
+        return os.path.join(output_dir, "intermediate", pdf_name, "llm_structured_output.json")
+
     def process(self, extracted_pages: List[Dict[str, Any]], output_dir: Optional[str] = None, pdf_name: str = "") -> (List[Dict[str, Any]], Dict[str, int]):
         self.log("Processing extracted text with LLM...")
         
@@ -62,8 +67,8 @@ class ProcessorAgent(Agent):
             
         # Save Intermediate Artifact
         if output_dir and pdf_name:
-             inter_dir = os.path.join(output_dir, "intermediate", pdf_name)
-             os.makedirs(inter_dir, exist_ok=True)
+             json_path = self.output_path(output_dir, pdf_name)
+             os.makedirs(os.path.dirname(json_path), exist_ok=True)
              
              structured_data = [
                  {
@@ -74,7 +79,6 @@ class ProcessorAgent(Agent):
                  for p in extracted_pages
              ]
              
-             json_path = os.path.join(inter_dir, "llm_structured_output.json")
              with open(json_path, 'w', encoding='utf-8') as f:
                  json.dump(structured_data, f, indent=2, ensure_ascii=False)
              self.log(f"Saved intermediate structured data to: {json_path}")
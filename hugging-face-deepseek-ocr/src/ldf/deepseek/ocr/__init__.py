@@ -1,8 +1,7 @@
-from vllm.model_executor.models.registry import ModelRegistry
-from .model import DeepseekOCRForCausalLM
-
 def setup_registry():
     try:
+        from vllm.model_executor.models.registry import ModelRegistry
+        from .model import DeepseekOCRForCausalLM
         ModelRegistry.register_model("DeepseekOCRForCausalLM", DeepseekOCRForCausalLM)
     except Exception as e:
         print(f"Warning: Failed to register DeepseekOCRForCausalLM: {e}")
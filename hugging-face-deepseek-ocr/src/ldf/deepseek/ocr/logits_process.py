@@ -3,9 +3,10 @@
 # Please refer to the original repository for license and attribution.
 
 import torch
+from collections import OrderedDict
 from transformers import LogitsProcessor
 from transformers.generation.logits_process import _calc_banned_ngram_tokens
-from typing import List, Set
+from typing import Dict, List, Set, Tuple
 
 
 class NoRepeatNGramLogitsProcessor(LogitsProcessor):
@@ -41,4 +42,79 @@ class NoRepeatNGramLogitsProcessor(LogitsProcessor):
             for token in banned_tokens:
                 scores[token] = -float("inf")
         
-        return scores
\ No newline at end of file
+        return scores
+
+
+class IncrementalNoRepeatNGramLogitsProcessor(NoRepeatNGramLogitsProcessor):
+    """
+    Bans exactly the tokens NoRepeatNGramLogitsProcessor does, from an index of
+    (n-1)-gram prefix -> next token counts over the window, updated with one
+    n-gram in and one out per generated token instead of rescanning the
+    window, and applied with a single index_fill.
+
+    vLLM shares one processor across every sequence of a request and passes
+    only the generated token ids. The bans depend on nothing but the last
+    `window_size` tokens, so each sequence's index is stored under the window
+    it was built for and picked up by the next step of whichever sequence
+    extends it. A missing index (first step, or evicted past `max_states`)
+    is rebuilt from the window.
+    """
+
+    def __init__(self, ngram_size: int, window_size: int = 100, whitelist_token_ids: set = None,
+                 max_states: int = 4096):
+        super().__init__(ngram_size, window_size, whitelist_token_ids)
+        self.max_states = max_states
+        self._states: "OrderedDict[Tuple[int, ...], Dict[Tuple[int, ...], Dict[int, int]]]" = OrderedDict()
+
+    @staticmethod
+    def _add(index, prefix, token):
+        counts = index.setdefault(prefix, {})
+        counts[token] = counts.get(token, 0) + 1
+
+    @staticmethod
+    def _remove(index, prefix, token):
+        counts = index[prefix]
+        if counts[token] == 1:
+            del counts[token]
+            if not counts:
+                del index[prefix]
+        else:
+            counts[token] -= 1
+
+    def _build(self, input_ids) -> Dict[Tuple[int, ...], Dict[int, int]]:
+        n = self.ngram_size
+        index = {}
+        for i in range(max(0, len(input_ids) - self.window_size), len(input_ids) - n + 1):
+            self._add(index, tuple(input_ids[i:i + n - 1]), input_ids[i + n - 1])
+        return index
+
+    def banned_tokens(self, input_ids: List[int]) -> List[int]:
+        """Tokens that would complete an n-gram already in the window, advancing the index by one step."""
+        n, window = self.ngram_size, self.window_size
+        length = len(input_ids)
+        # Like the reference: with a window shorter than an n-gram, or unigrams, nothing is ever banned.
+        if length < n or n == 1 or window < n:
+            return []
+
+        index = self._states.pop(tuple(input_ids[max(0, length - 1 - window):length - 1]), None)
+        if index is None:
+            index = self._build(input_ids)
+        else:
+            self._add(index, tuple(input_ids[length - n:length - 1]), input_ids[length - 1])
+            leaving = length - 1 - window
+            if leaving >= 0:
+                self._remove(index, tuple(input_ids[leaving:leaving + n - 1]), input_ids[leaving + n - 1])
+        self._states[tuple(input_ids[max(0, length - window):])] = index
+        while len(self._states) > self.max_states:
+            self._states.popitem(last=False)
+
+        following = index.get(tuple(input_ids[length - n + 1:]))
+        if not following:
+            return []
+        return [token for token in following if token not in self.whitelist_token_ids]
+
+    def __call__(self, input_ids: List[int], scores: torch.FloatTensor) -> torch.FloatTensor:
+        banned = self.banned_tokens(input_ids)
+        if banned:
+            scores = scores.index_fill(0, torch.tensor(banned, device=scores.device), -float("inf"))
+        return scores
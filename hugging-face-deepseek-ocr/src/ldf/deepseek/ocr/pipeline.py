@@ -0,0 +1,124 @@
+"""
+CPU preprocessing stage between the PDFs and the OCR engine.
+
+A producer thread walks the PDFs in order, rasterizes each as a stream (see
+`ldf.deepseek.raster`) and runs `tokenize_with_images` on its pages
+across a pool of `NUM_WORKERS` threads (PIL resizing and the torch tensor
+work release the GIL). Prepared batches wait in a bounded queue. While the
+engine runs one batch, the next ones are prepared, including the first pages
+of the next PDF. At most `queue_size` batches are held beyond the one being
+OCR'd.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from ..config import CROP_MODE, MAX_CONCURRENCY, NUM_WORKERS, PROMPT
+from .process import DeepseekOCRProcessor
+from ..raster import iter_page_batches, page_count
+
+DEFAULT_QUEUE_SIZE = 2
+
+_DONE = object()
+
+
+class PreparedBatch(NamedTuple):
+    pdf_path: str
+    # (0-based page index, image), as from the rasterizer
+    pages: List[Tuple[int, Image.Image]]
+    # One engine request per page
+    inputs: List[Dict[str, Any]]
+    # Last batch of its PDF; a PDF without pages gets a single empty batch
+    last: bool
+
+
+class PreprocessPipeline:
+    """
+    Rasterize and tokenize PDFs ahead of the engine. `stats` records batches,
+    pages, the producer's busy seconds, the seconds the consumer waited on an
+    empty queue and the most batches queued at once.
+    """
+
+    def __init__(self, processor: Optional[DeepseekOCRProcessor] = None, prompt: str = PROMPT,
+                 batch_size: int = MAX_CONCURRENCY, workers: int = NUM_WORKERS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, cropping=CROP_MODE, raster_options: Optional[Dict] = None):
+        self.processor = processor or DeepseekOCRProcessor()
+        self.prompt = prompt
+        self.batch_size = batch_size
+        self.workers = workers
+        self.queue_size = queue_size
+        self.cropping = cropping
+        self.raster_options = raster_options or {}
+        self.stats = {"batches": 0, "pages": 0, "preprocess_seconds": 0.0, "wait_seconds": 0.0, "max_queued": 0}
+        self._queue: Optional[queue.Queue] = None
+
+    def queued(self) -> int:
+        """Prepared batches waiting for the engine."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _tokenize(self, image: Image.Image):
+        return self.processor.tokenize_with_images(images=[image], bos=True, eos=True, cropping=self.cropping)
+
+    def _put(self, batches: queue.Queue, item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            self.stats["max_queued"] = max(self.stats["max_queued"], batches.qsize())
+            return True
+        return False
+
+    def _produce(self, pdf_paths: List[str], batches: queue.Queue, stop: threading.Event):
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr-tokenize") as pool:
+                for pdf_path in pdf_paths:
+                    remaining = page_count(pdf_path)
+                    if not remaining:
+                        if not self._put(batches, PreparedBatch(pdf_path, [], [], True), stop):
+                            return
+                        continue
+                    pages_iter = iter_page_batches(pdf_path, self.batch_size, **self.raster_options)
+                    while remaining:
+                        start = time.perf_counter()
+                        pages = next(pages_iter)
+                        tokenized = list(pool.map(self._tokenize, [image for _, image in pages]))
+                        inputs = [{"prompt": self.prompt, "multi_modal_data": {"image": t}} for t in tokenized]
+                        remaining -= len(pages)
+                        self.stats["preprocess_seconds"] += time.perf_counter() - start
+                        self.stats["batches"] += 1
+                        self.stats["pages"] += len(pages)
+                        if not self._put(batches, PreparedBatch(pdf_path, pages, inputs, not remaining), stop):
+                            pages_iter.close()
+                            return
+            self._put(batches, _DONE, stop)
+        except BaseException as e:
+            self._put(batches, e, stop)
+
+    def run(self, pdf_paths: Iterable[str]) -> Iterator[PreparedBatch]:
+        """Prepared batches of every PDF, in order; raises whatever preprocessing raised."""
+        batches = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        self._queue = batches
+        producer = threading.Thread(target=self._produce, args=(list(pdf_paths), batches, stop),
+                                    name="ocr-preprocess", daemon=True)
+        producer.start()
+        try:
+            while True:
+                start = time.perf_counter()
+                item = batches.get()
+                self.stats["wait_seconds"] += time.perf_counter() - start
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Stop the producer if the consumer gave up early, then let go of any queued images.
+            stop.set()
+            producer.join()
+            self._queue = None
@@ -3,8 +3,10 @@
 # Please refer to the original repository for license and attribution.
 
 import math
+from functools import lru_cache
 from typing import List, Tuple
 
+import numpy as np
 import torch
 import torchvision.transforms as T
 from PIL import Image, ImageOps
@@ -29,37 +31,30 @@ def find_closest_aspect_ratio(aspect_ratio, target_ratios, width, height, image_
     return best_ratio
 
 
-def count_tiles(orig_width, orig_height, min_num=MIN_CROPS, max_num=MAX_CROPS, image_size=640, use_thumbnail=False):
-    aspect_ratio = orig_width / orig_height
-
-    # calculate the existing image aspect ratio
+@lru_cache(maxsize=None)
+def get_target_ratios(min_num=MIN_CROPS, max_num=MAX_CROPS):
+    """(width tiles, height tiles) grids with min_num..max_num tiles, by tile count; built once per range."""
+    # Built from a set, as before, so ties keep the order find_closest_aspect_ratio has always seen.
     target_ratios = set(
         (i, j) for n in range(min_num, max_num + 1) for i in range(1, n + 1) for j in range(1, n + 1) if
         i * j <= max_num and i * j >= min_num)
-    # print(target_ratios)
-    target_ratios = sorted(target_ratios, key=lambda x: x[0] * x[1])
+    return tuple(sorted(target_ratios, key=lambda x: x[0] * x[1]))
+
+
+@lru_cache(maxsize=4096)
+def count_tiles(orig_width, orig_height, min_num=MIN_CROPS, max_num=MAX_CROPS, image_size=640, use_thumbnail=False):
+    aspect_ratio = orig_width / orig_height
 
     # find the closest aspect ratio to the target
     target_aspect_ratio = find_closest_aspect_ratio(
-        aspect_ratio, target_ratios, orig_width, orig_height, image_size)
+        aspect_ratio, get_target_ratios(min_num, max_num), orig_width, orig_height, image_size)
 
     return target_aspect_ratio
 
 
 def dynamic_preprocess(image, min_num=MIN_CROPS, max_num=MAX_CROPS, image_size=640, use_thumbnail=False):
     orig_width, orig_height = image.size
-    aspect_ratio = orig_width / orig_height
-
-    # calculate the existing image aspect ratio
-    target_ratios = set(
-        (i, j) for n in range(min_num, max_num + 1) for i in range(1, n + 1) for j in range(1, n + 1) if
-        i * j <= max_num and i * j >= min_num)
-    # print(target_ratios)
-    target_ratios = sorted(target_ratios, key=lambda x: x[0] * x[1])
-
-    # find the closest aspect ratio to the target
-    target_aspect_ratio = find_closest_aspect_ratio(
-        aspect_ratio, target_ratios, orig_width, orig_height, image_size)
+    target_aspect_ratio = count_tiles(orig_width, orig_height, min_num, max_num, image_size)
 
     # print(target_aspect_ratio)
     # calculate the target width and height
@@ -87,8 +82,28 @@ def dynamic_preprocess(image, min_num=MIN_CROPS, max_num=MAX_CROPS, image_size=6
     return processed_images, target_aspect_ratio
 
 
+def image_to_uint8(image: Image.Image) -> torch.Tensor:
+    """(C, H, W) uint8 tensor of an 8-bit PIL image."""
+    array = np.array(image)
+    if array.ndim == 2:
+        array = array[:, :, None]
+    return torch.from_numpy(array).permute(2, 0, 1)
 
 
+def tile_image(image: Image.Image, crop_ratio, image_size=640) -> torch.Tensor:
+    """
+    The tiles dynamic_preprocess would crop for `crop_ratio`, as one
+    (tiles, C, image_size, image_size) uint8 tensor: the image is resized once
+    and cut up with a reshape instead of a crop per tile.
+    """
+    num_width_tiles, num_height_tiles = crop_ratio
+    resized = image.resize((image_size * num_width_tiles, image_size * num_height_tiles))
+    pixels = image_to_uint8(resized)
+    channels = pixels.shape[0]
+    # (C, rows * S, cols * S) -> (rows, cols, C, S, S), tiles in row-major order like the crop boxes.
+    tiles = pixels.reshape(channels, num_height_tiles, image_size, num_width_tiles, image_size).permute(1, 3, 0, 2, 4)
+    return tiles.reshape(num_height_tiles * num_width_tiles, channels, image_size, image_size)
+
 
 class ImageTransform:
 
@@ -111,6 +126,19 @@ class ImageTransform:
         x = self.transform(pil_img)
         return x
 
+    def from_uint8(self, pixels: torch.Tensor) -> torch.Tensor:
+        """
+        The transform of a stack of uint8 (..., C, H, W) images in one pass;
+        the same float operations as ToTensor and Normalize, so the values match
+        __call__ on each image exactly.
+        """
+        x = pixels.to(dtype=torch.get_default_dtype()).div(255)
+        if self.normalize:
+            mean = torch.as_tensor(self.mean, dtype=x.dtype).view(-1, 1, 1)
+            std = torch.as_tensor(self.std, dtype=x.dtype).view(-1, 1, 1)
+            x.sub_(mean).div_(std)
+        return x
+
 
 class DeepseekOCRProcessor(ProcessorMixin):
     tokenizer_class = ("LlamaTokenizer", "LlamaTokenizerFast")
@@ -372,7 +400,7 @@ class DeepseekOCRProcessor(ProcessorMixin):
                     # best_width, best_height = select_best_resolution(image.size, self.candidate_resolutions)
                     # print('image ', image.size)
                     # print('open_size:', image.size)
-                    images_crop_raw, crop_ratio = dynamic_preprocess(image, image_size=IMAGE_SIZE)
+                    crop_ratio = count_tiles(image.size[0], image.size[1], image_size=IMAGE_SIZE)
                     # print('crop_ratio: ', crop_ratio)
                 else:
                     # best_width, best_height = self.image_size, self.image_size
@@ -389,7 +417,8 @@ class DeepseekOCRProcessor(ProcessorMixin):
 
             global_view = ImageOps.pad(image, (self.base_size, self.base_size),
                                     color=tuple(int(x * 255) for x in self.image_transform.mean))
-            images_list.append(self.image_transform(global_view))
+            # Kept as uint8 and normalized together once every image is done.
+            images_list.append(image_to_uint8(global_view))
 
             """record height / width crop num"""
             # width_crop_num, height_crop_num = best_width // self.image_size, best_height // self.image_size
@@ -407,8 +436,7 @@ class DeepseekOCRProcessor(ProcessorMixin):
                 #     for j in range(0, best_width, self.image_size):
                 #         images_crop_list.append(
                 #             self.image_transform(local_view.crop((j, i, j + self.image_size, i + self.image_size))))
-                for i in range(len(images_crop_raw)):
-                    images_crop_list.append(self.image_transform(images_crop_raw[i]))
+                images_crop_list.append(tile_image(image, crop_ratio, image_size=IMAGE_SIZE))
 
             # """process the global view"""
             # global_view = ImageOps.pad(image, (self.image_size, self.image_size),
@@ -490,10 +518,10 @@ class DeepseekOCRProcessor(ProcessorMixin):
             images_spatial_crop = torch.zeros((1, 1), dtype=torch.long)
             images_crop = torch.zeros((1, 3, self.image_size, self.image_size)).unsqueeze(0)
         else:
-            pixel_values = torch.stack(images_list, dim=0)
+            pixel_values = self.image_transform.from_uint8(torch.stack(images_list, dim=0))
             images_spatial_crop = torch.tensor(images_spatial_crop, dtype=torch.long)
             if images_crop_list:
-                images_crop = torch.stack(images_crop_list, dim=0).unsqueeze(0)
+                images_crop = self.image_transform.from_uint8(torch.cat(images_crop_list, dim=0)).unsqueeze(0)
             else:
                 images_crop = torch.zeros((1, 3, self.image_size, self.image_size)).unsqueeze(0)
 
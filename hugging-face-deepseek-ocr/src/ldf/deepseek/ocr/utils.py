@@ -3,28 +3,9 @@
 # Please refer to the original repository for license and attribution.
 
 import os
-import io
 import re
-from PIL import Image
-import fitz
 
-def pdf_to_images(pdf_path, dpi=144):
-    images = []
-    try:
-        pdf_document = fitz.open(pdf_path)
-        zoom = dpi / 72.0
-        matrix = fitz.Matrix(zoom, zoom)
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document[page_num]
-            pixmap = page.get_pixmap(matrix=matrix, alpha=False)
-            Image.MAX_IMAGE_PIXELS = None
-            img_data = pixmap.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
-            images.append(img)
-        pdf_document.close()
-    except Exception as e:
-        print(f"Error converting PDF to images: {e}")
-    return images
+from ..raster import pdf_to_images  # kept importable from here for existing callers
 
 def re_match(text):
     pattern = r'(<\|ref\|>(.*?)<\|/ref\|><\|det\|>(.*?)<\|/det\|>)'
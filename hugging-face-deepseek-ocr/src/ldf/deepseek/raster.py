@@ -0,0 +1,154 @@
+"""
+PDF rasterization for the OCR pipeline.
+
+Pages are rendered with PyMuPDF and wrapped as PIL images directly over the
+pixmap samples, without encoding to PNG and decoding back. Larger page
+ranges are rendered across a process pool, and pages are yielded in order
+from a bounded generator, so only a few pages are in memory at a time however
+long the PDF is.
+
+The resolution is chosen per PDF from its page size, so the long side of the
+largest page renders at about `TARGET_LONG_SIDE` pixels (an A4 page at 144
+DPI, the previous fixed setting), clamped to [MIN_DPI, MAX_DPI].
+
+This module sits outside `ldf.deepseek.ocr` and imports only PyMuPDF and
+PIL, so the spawned pool workers that unpickle `_render_range` never load
+vLLM or the OCR model.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import fitz
+from PIL import Image
+
+DEFAULT_DPI = 144
+TARGET_LONG_SIDE = 1684
+MIN_DPI = 72
+MAX_DPI = 300
+DEFAULT_WORKERS = int(os.environ.get("LDF_RASTER_WORKERS", min(os.cpu_count() or 1, 8)))
+# Pages per pool task; a few per task amortises opening the document in the worker.
+CHUNK_PAGES = 4
+# Below this many pages the pool costs more than it saves.
+PARALLEL_MIN_PAGES = 8
+
+# Gazette scans can exceed PIL's decompression bomb limit.
+Image.MAX_IMAGE_PIXELS = None
+
+RawPage = Tuple[int, int, int, bytes]
+
+
+def choose_dpi(pdf_path, target_long_side: int = TARGET_LONG_SIDE) -> int:
+    """DPI at which the long side of the PDF's largest page renders at about `target_long_side` pixels."""
+    with fitz.open(pdf_path) as doc:
+        long_side = max((max(page.rect.width, page.rect.height) for page in doc), default=0)
+    if not long_side:
+        return DEFAULT_DPI
+    return int(min(MAX_DPI, max(MIN_DPI, round(target_long_side * 72 / long_side))))
+
+
+def page_count(pdf_path) -> int:
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def _matrix(dpi: int) -> "fitz.Matrix":
+    zoom = dpi / 72.0
+    return fitz.Matrix(zoom, zoom)
+
+
+def pixmap_to_image(pixmap: "fitz.Pixmap") -> Image.Image:
+    """
+    PIL image sharing the pixmap's sample memory. The image keeps a reference
+    to the pixmap, which owns that memory, so it stays valid for the image's
+    lifetime; PIL copies it before any in-place change.
+    """
+    mode = {1: "L", 3: "RGB", 4: "RGBA"}[pixmap.n]
+    image = Image.frombuffer(mode, (pixmap.width, pixmap.height), pixmap.samples_mv, "raw", mode, pixmap.stride, 1)
+    image._pixmap = pixmap
+    return image
+
+
+def _raw_to_image(raw: RawPage) -> Image.Image:
+    width, height, stride, samples = raw
+    return Image.frombuffer("RGB", (width, height), samples, "raw", "RGB", stride, 1)
+
+
+def _render_range(pdf_path: str, indices: Sequence[int], dpi: int) -> List[RawPage]:
+    """Render pages in a pool worker, returned as raw samples (a pixmap can't be pickled)."""
+    matrix = _matrix(dpi)
+    rendered = []
+    with fitz.open(pdf_path) as doc:
+        for idx in indices:
+            pixmap = doc[idx].get_pixmap(matrix=matrix, alpha=False)
+            rendered.append((pixmap.width, pixmap.height, pixmap.stride, pixmap.samples))
+    return rendered
+
+
+@lru_cache(maxsize=None)
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # Spawned rather than forked: the callers hold CUDA and vLLM state.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def iter_pdf_pages(pdf_path, pages: Optional[Iterable[int]] = None, dpi: Optional[int] = None,
+                   workers: int = DEFAULT_WORKERS, prefetch: Optional[int] = None) -> Iterator[Tuple[int, Image.Image]]:
+    """
+    Yield (0-based page index, RGB image) for each requested page (all by
+    default), in order. `dpi` defaults to `choose_dpi`. With more than one
+    worker and enough pages, chunks of `CHUNK_PAGES` pages are rendered in a
+    process pool, at most `prefetch` chunks (default 2 per worker) ahead of
+    the consumer.
+    """
+    pdf_path = str(pdf_path)
+    dpi = dpi or choose_dpi(pdf_path)
+    indices = list(range(page_count(pdf_path))) if pages is None else list(pages)
+
+    if workers <= 1 or len(indices) < PARALLEL_MIN_PAGES:
+        matrix = _matrix(dpi)
+        with fitz.open(pdf_path) as doc:
+            for idx in indices:
+                yield idx, pixmap_to_image(doc[idx].get_pixmap(matrix=matrix, alpha=False))
+        return
+
+    pool = _get_pool(workers)
+    chunks = [indices[i:i + CHUNK_PAGES] for i in range(0, len(indices), CHUNK_PAGES)]
+    prefetch = prefetch or workers * 2
+    pending = []
+    next_chunk = 0
+    try:
+        while next_chunk < len(chunks) or pending:
+            while next_chunk < len(chunks) and len(pending) < prefetch:
+                chunk = chunks[next_chunk]
+                pending.append((chunk, pool.submit(_render_range, pdf_path, chunk, dpi)))
+                next_chunk += 1
+            chunk, future = pending.pop(0)
+            for idx, raw in zip(chunk, future.result()):
+                yield idx, _raw_to_image(raw)
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def iter_page_batches(pdf_path, batch_size: int, **options) -> Iterator[List[Tuple[int, Image.Image]]]:
+    """`iter_pdf_pages` grouped into lists of up to `batch_size` pages."""
+    batch = []
+    for page in iter_pdf_pages(pdf_path, **options):
+        batch.append(page)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def pdf_to_images(pdf_path, dpi: Optional[int] = None, **options) -> List[Image.Image]:
+    """Every page as an image, all held in memory; prefer `iter_pdf_pages` for long PDFs."""
+    images = []
+    try:
+        images = [image for _, image in iter_pdf_pages(pdf_path, dpi=dpi, **options)]
+    except Exception as e:
+        print(f"Error converting PDF to images: {e}")
+    return images
@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+# Import ldf from this checkout whether or not it is installed, and the benchmarks' reference implementations.
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from ldf.deepseek.ocr.logits_process import (  # noqa: E402
+    IncrementalNoRepeatNGramLogitsProcessor,
+    NoRepeatNGramLogitsProcessor,
+)
+
+# A small vocabulary so n-grams repeat by chance as well as through copied runs.
+VOCAB_SIZE = 12
+WHITELIST = {0, 1}
+
+
+def _stream(rng, length):
+    """Random tokens with runs copied from earlier in the stream, like a model starting to loop."""
+    tokens = []
+    while len(tokens) < length:
+        if tokens and rng.random() < 0.2:
+            start = rng.randrange(len(tokens))
+            tokens.extend(tokens[start:start + rng.randint(3, 12)])
+        else:
+            tokens.append(rng.randrange(VOCAB_SIZE))
+    return tokens[:length]
+
+
+def _streams(rng, count, length):
+    """Independent streams plus forks that share a prefix with one of them, as parallel samples of a request do."""
+    streams = [_stream(rng, length) for _ in range(count)]
+    for stream in list(streams):
+        fork = rng.randrange(1, length)
+        streams.append(stream[:fork] + _stream(rng, length - fork))
+    return streams
+
+
+@pytest.mark.parametrize("ngram, window, max_states", [
+    (3, 12, 4096),
+    (5, 30, 4096),
+    (2, 2, 4096),
+    # Evicted indexes are rebuilt from the window.
+    (3, 12, 2),
+])
+@pytest.mark.parametrize("seed", range(3))
+def test_interleaved_streams_get_the_bans_of_the_rescan(ngram, window, max_states, seed):
+    rng = random.Random(seed)
+    streams = _streams(rng, 3, 80)
+    reference = NoRepeatNGramLogitsProcessor(ngram, window, WHITELIST)
+    unfiltered = NoRepeatNGramLogitsProcessor(ngram, window)
+    # One instance for every sequence, as vLLM shares it across a request.
+    incremental = IncrementalNoRepeatNGramLogitsProcessor(ngram, window, WHITELIST, max_states=max_states)
+    scores = torch.randn(VOCAB_SIZE)
+
+    lengths = [0] * len(streams)
+    banned_steps = whitelisted_steps = 0
+    # Advance a random unfinished sequence by one token at a time.
+    while unfinished := [i for i, stream in enumerate(streams) if lengths[i] < len(stream)]:
+        i = rng.choice(unfinished)
+        lengths[i] += 1
+        input_ids = streams[i][:lengths[i]]
+
+        expected = reference(input_ids, scores)
+        assert torch.equal(incremental(input_ids, scores), expected), (i, lengths[i])
+        banned_steps += expected is not scores
+        whitelisted_steps += not torch.equal(unfiltered(input_ids, scores), expected)
+
+    assert banned_steps and whitelisted_steps
+
+
+@pytest.mark.parametrize("ngram, window", [(4, 3), (6, 1), (1, 10)])
+def test_nothing_is_banned_when_no_ngram_fits_the_window(ngram, window):
+    rng = random.Random(0)
+    reference = NoRepeatNGramLogitsProcessor(ngram, window)
+    incremental = IncrementalNoRepeatNGramLogitsProcessor(ngram, window)
+    scores = torch.randn(VOCAB_SIZE)
+
+    stream = [2, 3] * 20 + _stream(rng, 40)
+    for length in range(1, len(stream) + 1):
+        assert reference(stream[:length], scores) is scores
+        assert incremental(stream[:length], scores) is scores
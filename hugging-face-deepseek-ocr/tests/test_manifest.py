@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+from ldf.deepseek.agents.manifest import STAGES, WorkflowManifest
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "input" / "gazette.pdf"
+    path.parent.mkdir()
+    path.write_bytes(b"%PDF-1.4 one page")
+    return str(path)
+
+
+def _spill(tmp_path, name, pages):
+    path = tmp_path / "output" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(pages))
+    return str(path)
+
+
+def _manifest(tmp_path):
+    return WorkflowManifest(str(tmp_path / "output" / "workflow_manifest.json"))
+
+
+def test_completed_stages_survive_a_restart(tmp_path, pdf):
+    manifest = _manifest(tmp_path)
+    ocr = _spill(tmp_path, "ocr.json", [{"page": 1}])
+    manifest.complete(pdf, "ocr", ocr, {"input": 10, "output": 4}, pages=1)
+    manifest.complete(pdf, "structure", _spill(tmp_path, "structured.json", []), {"input": 3, "output": 2})
+
+    resumed = _manifest(tmp_path)
+    assert [stage for stage in STAGES if resumed.done(pdf, stage)] == ["ocr", "structure"]
+    assert resumed.stage(pdf, "ocr")["path"] == ocr
+    assert resumed.stage(pdf, "ocr")["pages"] == 1
+    assert resumed.usage() == {"input": 13, "output": 6}
+    # The manifest is replaced in one step, leaving no temp file behind.
+    assert sorted(os.listdir(tmp_path / "output")) == ["ocr.json", "structured.json", "workflow_manifest.json"]
+
+
+def test_a_changed_pdf_starts_over(tmp_path, pdf):
+    manifest = _manifest(tmp_path)
+    manifest.complete(pdf, "ocr", _spill(tmp_path, "ocr.json", []))
+    stat = os.stat(pdf)
+
+    # Same size, new modification time.
+    os.utime(pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not _manifest(tmp_path).done(pdf, "ocr")
+
+    manifest.complete(pdf, "ocr", _spill(tmp_path, "ocr.json", []))
+    # Same modification time, new size.
+    with open(pdf, "ab") as f:
+        f.write(b" and another")
+    os.utime(pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not _manifest(tmp_path).done(pdf, "ocr")
+
+
+def test_redoing_a_stage_invalidates_the_later_ones(tmp_path, pdf):
+    manifest = _manifest(tmp_path)
+    for stage in STAGES:
+        manifest.complete(pdf, stage, _spill(tmp_path, f"{stage}.json", []))
+
+    manifest.complete(pdf, "ocr", _spill(tmp_path, "ocr.json", [{"page": 1}]))
+
+    assert [stage for stage in STAGES if _manifest(tmp_path).done(pdf, stage)] == ["ocr"]
+
+
+def test_a_stage_whose_output_went_missing_is_redone(tmp_path, pdf):
+    manifest = _manifest(tmp_path)
+    for stage in STAGES:
+        manifest.complete(pdf, stage, _spill(tmp_path, f"{stage}.json", []))
+    os.remove(tmp_path / "output" / "structure.json")
+
+    manifest = _manifest(tmp_path)
+    assert manifest.done(pdf, "ocr")
+    assert manifest.stage(pdf, "structure") is None
+    # The final output was built from the lost structured pages, so it has to be redone too.
+    assert not manifest.done(pdf, "final")
+
+
+def test_a_stage_without_output_stays_done(tmp_path, pdf):
+    manifest = _manifest(tmp_path)
+    # A PDF whose pages have no text spills nothing.
+    manifest.complete(pdf, "ocr", None, pages=0)
+
+    assert _manifest(tmp_path).stage(pdf, "ocr")["path"] is None
+    assert _manifest(tmp_path).done(pdf, "ocr")
+
+
+def test_reset_forgets_every_pdf(tmp_path, pdf):
+    manifest = _manifest(tmp_path)
+    manifest.complete(pdf, "ocr", _spill(tmp_path, "ocr.json", []), {"input": 5, "output": 1})
+
+    manifest.reset()
+
+    resumed = _manifest(tmp_path)
+    assert not resumed.done(pdf, "ocr")
+    assert resumed.usage() == {"input": 0, "output": 0}
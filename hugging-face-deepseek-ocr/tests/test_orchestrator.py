@@ -0,0 +1,123 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+# The orchestrator imports torch and vLLM at module level; the agents below stand in for the models.
+pytest.importorskip("torch")
+pytest.importorskip("vllm")
+pytest.importorskip("transformers")
+
+from ldf.deepseek.agents.orchestrator import OrchestratorAgent  # noqa: E402
+from ldf.deepseek.agents.processor import ProcessorAgent  # noqa: E402
+
+OCR_PAGES = [{"page": 1, "content": "Minister of Finance"}, {"page": 2, "content": "Minister of Health"}]
+STRUCTURED_PAGES = [{"page": 1, "data": [{"ministry": "Minister of Finance"}]},
+                    {"page": 2, "data": [{"ministry": "Minister of Health"}]}]
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.calls = []
+
+    def process(self, pages, output_dir, pdf_name):
+        self.calls.append(pages)
+        path = ProcessorAgent.output_path(output_dir, pdf_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(STRUCTURED_PAGES, f)
+        return STRUCTURED_PAGES, {"input": 7, "output": 3}
+
+
+class FakeAggregator:
+    def __init__(self):
+        self.calls = []
+
+    def process(self, pages, output_dir, pdf_name):
+        self.calls.append((pages, pdf_name))
+        return [entry for page in pages for entry in page["data"]]
+
+
+class FakeFinalizer:
+    def __init__(self):
+        self.calls = []
+
+    def process(self, data, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        self.calls.append((data, output_dir))
+
+
+@pytest.fixture
+def orchestrator(tmp_path):
+    prompt_file = tmp_path / "prompt.txt"
+    prompt_file.write_text("Structure this page.")
+    orchestrator = OrchestratorAgent(str(tmp_path / "input"), str(tmp_path / "output"), str(prompt_file),
+                                     model_path="deepseek-ai/DeepSeek-OCR")
+    orchestrator.processor = FakeProcessor()
+    orchestrator.aggregator = FakeAggregator()
+    orchestrator.finalizer = FakeFinalizer()
+    return orchestrator
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "input" / "gazette.pdf"
+    path.parent.mkdir()
+    path.write_bytes(b"%PDF-1.4 two pages")
+    return path
+
+
+def _spill(path, pages):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(pages, f)
+    return str(path)
+
+
+def _ocr_done(orchestrator, pdf):
+    ocr = _spill(os.path.join(orchestrator.output_dir, "ocr", "gazette.json"), OCR_PAGES)
+    orchestrator.manifest.complete(str(pdf), "ocr", ocr, {"input": 100, "output": 40}, pages=2)
+
+
+def test_run_structure_resumes_from_the_spilled_structured_pages(orchestrator, pdf):
+    _ocr_done(orchestrator, pdf)
+    structured = _spill(ProcessorAgent.output_path(orchestrator.output_dir, pdf.name), STRUCTURED_PAGES)
+    orchestrator.manifest.complete(str(pdf), "structure", structured, {"input": 7, "output": 3})
+
+    orchestrator.run_structure([pdf])
+
+    # The text model is never needed; aggregation starts from the structured pages on disk.
+    assert orchestrator.processor.calls == []
+    assert orchestrator.aggregator.calls == [(STRUCTURED_PAGES, "gazette.pdf")]
+    final = orchestrator.manifest.stage(str(pdf), "final")
+    assert (final["path"], final["entries"]) == (os.path.join(orchestrator.output_dir, "gazette"), 2)
+    assert orchestrator.finalizer.calls == [([{"ministry": "Minister of Finance"}, {"ministry": "Minister of Health"}],
+                                             final["path"])]
+    assert orchestrator.workflow_input_tokens == 0
+
+    # Once final, a rerun does nothing.
+    orchestrator.run_structure([pdf])
+    assert len(orchestrator.aggregator.calls) == 1
+
+
+def test_run_structure_redoes_structuring_whose_output_went_missing(orchestrator, pdf):
+    _ocr_done(orchestrator, pdf)
+    structured = _spill(ProcessorAgent.output_path(orchestrator.output_dir, pdf.name), STRUCTURED_PAGES)
+    orchestrator.manifest.complete(str(pdf), "structure", structured, {"input": 7, "output": 3})
+    os.remove(structured)
+
+    orchestrator.run_structure([pdf])
+
+    assert orchestrator.processor.calls == [OCR_PAGES]
+    assert orchestrator.aggregator.calls == [(STRUCTURED_PAGES, "gazette.pdf")]
+    assert orchestrator.manifest.done(str(pdf), "structure")
+    assert orchestrator.manifest.done(str(pdf), "final")
+    assert orchestrator.workflow_input_tokens == 7
+
+
+def test_run_structure_skips_pdfs_without_ocr(orchestrator, pdf):
+    orchestrator.run_structure([Path(pdf)])
+
+    assert orchestrator.processor.calls == orchestrator.aggregator.calls == []
+    assert not orchestrator.manifest.done(str(pdf), "final")
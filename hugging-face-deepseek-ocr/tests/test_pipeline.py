@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+# The pipeline module imports the real processor (torch) and the tokenizer config (transformers).
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from ldf.deepseek.ocr import pipeline as pipeline_module  # noqa: E402
+from ldf.deepseek.ocr.pipeline import PreprocessPipeline  # noqa: E402
+
+RASTER = {"dpi": 20, "workers": 1}
+
+
+class StandInProcessor:
+    """Tokenizes a page into a marker naming the image, optionally failing on one page size."""
+
+    def __init__(self, fail_on=None, delay=0.0):
+        self.fail_on = fail_on
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def tokenize_with_images(self, images, bos, eos, cropping):
+        assert (bos, eos, cropping) == (True, True, False)
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        [image] = images
+        if image.size == self.fail_on:
+            raise ValueError(f"cannot tokenize {image.size}")
+        return ("tokens", id(image))
+
+
+class StubEngine:
+    """Stands in for vLLM's LLM: one output per input, recording how many batches were queued as each call ends."""
+
+    def __init__(self, pipeline, seconds=0.0):
+        self.pipeline = pipeline
+        self.seconds = seconds
+        self.queued = []
+
+    def generate(self, inputs):
+        time.sleep(self.seconds)
+        self.queued.append(self.pipeline.queued())
+        return [f"text for {item['multi_modal_data']['image'][1]}" for item in inputs]
+
+
+def _pdf(path, pages):
+    # Page widths differ so each page can be told apart by its rendered size.
+    with fitz.open() as doc:
+        for idx in range(pages):
+            doc.new_page(width=144 + 36 * idx, height=288).insert_text((20, 40), f"page {idx + 1}")
+        doc.save(path)
+    return str(path)
+
+
+def _pipeline(processor, **options):
+    return PreprocessPipeline(processor=processor, prompt="<image>\nFree OCR.", cropping=False,
+                              raster_options=RASTER, **options)
+
+
+def test_batches_come_in_pdf_and_page_order_with_the_last_flag(tmp_path):
+    pdfs = [_pdf(tmp_path / "a.pdf", 5), _pdf(tmp_path / "b.pdf", 1), _pdf(tmp_path / "c.pdf", 3)]
+    pipeline = _pipeline(StandInProcessor(delay=0.01), batch_size=2, workers=4)
+    engine = StubEngine(pipeline)
+
+    seen = []
+    for batch in pipeline.run(pdfs):
+        outputs = engine.generate(batch.inputs)
+        assert outputs == [f"text for {id(image)}" for _, image in batch.pages]
+        assert all(item["prompt"] == "<image>\nFree OCR." for item in batch.inputs)
+        seen.append((batch.pdf_path, [idx for idx, _ in batch.pages], batch.last))
+
+    assert seen == [(pdfs[0], [0, 1], False), (pdfs[0], [2, 3], False), (pdfs[0], [4], True),
+                    (pdfs[1], [0], True), (pdfs[2], [0, 1], False), (pdfs[2], [2], True)]
+    assert (pipeline.stats["batches"], pipeline.stats["pages"]) == (6, 9)
+
+
+def test_pdf_without_pages_gets_one_empty_last_batch(tmp_path, monkeypatch):
+    pdfs = [_pdf(tmp_path / "empty.pdf", 1), _pdf(tmp_path / "b.pdf", 1)]
+    # PyMuPDF cannot save a PDF with no pages, so report none for the first.
+    monkeypatch.setattr(pipeline_module, "page_count", lambda path: 0 if path == pdfs[0] else 1)
+
+    batches = list(_pipeline(StandInProcessor(), batch_size=4, workers=1).run(pdfs))
+
+    assert [(b.pdf_path, b.pages, b.inputs, b.last) for b in batches[:1]] == [(pdfs[0], [], [], True)]
+    assert [(b.pdf_path, len(b.pages), b.last) for b in batches[1:]] == [(pdfs[1], 1, True)]
+
+
+def test_batches_are_prepared_ahead_of_a_slow_engine(tmp_path):
+    pipeline = _pipeline(StandInProcessor(), batch_size=1, workers=1, queue_size=2)
+    engine = StubEngine(pipeline, seconds=0.1)
+
+    for batch in pipeline.run([_pdf(tmp_path / "a.pdf", 6)]):
+        engine.generate(batch.inputs)
+
+    # While the engine ran, the next batches were prepared, but never more than the queue holds.
+    assert engine.queued[:4] == [2, 2, 2, 2]
+    assert pipeline.stats["max_queued"] <= 2
+
+
+def test_stopping_early_stops_the_producer(tmp_path):
+    processor = StandInProcessor()
+    pipeline = _pipeline(processor, batch_size=1, workers=1, queue_size=1)
+
+    batches = pipeline.run([_pdf(tmp_path / "a.pdf", 12)])
+    first = next(batches)
+    batches.close()
+
+    assert first.pages[0][0] == 0
+    assert pipeline.queued() == 0
+    assert not any(thread.name == "ocr-preprocess" for thread in threading.enumerate())
+    # Only the batch handed out and the few prepared behind it were tokenized.
+    assert processor.calls <= 3
+
+
+def test_preprocessing_errors_reach_the_consumer_in_order(tmp_path):
+    pdfs = [_pdf(tmp_path / "a.pdf", 2), _pdf(tmp_path / "b.pdf", 3)]
+    # Page 3 of b.pdf is the only page 216 points wide; at 20 DPI it renders 60 pixels wide.
+    pipeline = _pipeline(StandInProcessor(fail_on=(60, 80)), batch_size=2, workers=2)
+
+    received = []
+    with pytest.raises(ValueError, match="cannot tokenize"):
+        for batch in pipeline.run(pdfs):
+            received.append((batch.pdf_path, [idx for idx, _ in batch.pages]))
+    assert received == [(pdfs[0], [0, 1]), (pdfs[1], [0, 1])]
+
+    # Opening a missing PDF fails in the producer and surfaces here too.
+    with pytest.raises(RuntimeError, match="no such file"):
+        list(_pipeline(StandInProcessor(), batch_size=2, workers=1).run([str(tmp_path / "missing.pdf")]))
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("transformers")
+from PIL import Image  # noqa: E402
+
+try:
+    # Importing the processor loads the DeepSeek-OCR tokenizer from the Hugging Face cache or hub.
+    from ldf.deepseek.ocr import process
+except OSError as e:
+    pytest.skip(f"DeepSeek-OCR tokenizer unavailable: {e}", allow_module_level=True)
+
+from benchmarks.bench_preprocess import legacy_preprocess  # noqa: E402
+from ldf.deepseek.config import IMAGE_SIZE, PROMPT  # noqa: E402
+
+# (width, height): pages small enough for the global view alone, then A4 at 144 DPI both ways and a wide strip.
+SMALL_PAGES = [(600, 500), (640, 640)]
+TILED_PAGES = [(1190, 1684), (1684, 1190), (3000, 700)]
+
+
+def _page(size, seed=0):
+    width, height = size
+    return Image.fromarray(np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return process.DeepseekOCRProcessor()
+
+
+@pytest.mark.parametrize("size", TILED_PAGES)
+def test_tiles_match_the_per_tile_crops(size):
+    image = _page(size)
+    crops, ratio = process.dynamic_preprocess(image, image_size=IMAGE_SIZE)
+
+    tiles = process.tile_image(image, ratio, image_size=IMAGE_SIZE)
+
+    assert tiles.dtype == torch.uint8
+    assert torch.equal(tiles, torch.stack([process.image_to_uint8(crop) for crop in crops]))
+
+
+def test_from_uint8_matches_the_transform_of_each_image():
+    transform = process.ImageTransform()
+    images = [_page((64, 48), seed) for seed in range(3)]
+
+    stacked = transform.from_uint8(torch.stack([process.image_to_uint8(image) for image in images]))
+
+    assert torch.equal(stacked, torch.stack([transform(image) for image in images]))
+
+
+@pytest.mark.parametrize("size", SMALL_PAGES + TILED_PAGES)
+def test_tokenize_with_images_matches_the_previous_preprocessing(processor, size):
+    image = _page(size)
+    pixel_values, images_crop, num_tokens = legacy_preprocess(processor, image)
+
+    input_ids, current_pixel_values, current_images_crop, images_seq_mask, images_spatial_crop, num_image_tokens, \
+        image_shapes = processor.tokenize_with_images(images=[image], bos=True, eos=True, cropping=True)[0]
+
+    assert torch.equal(current_pixel_values, pixel_values)
+    assert torch.equal(current_images_crop, images_crop)
+    assert num_image_tokens == [num_tokens]
+    assert image_shapes == [size]
+    ratio = [1, 1] if size in SMALL_PAGES else list(process.count_tiles(*size, image_size=IMAGE_SIZE))
+    assert images_spatial_crop.tolist() == [ratio]
+
+    # BOS, the prompt text before <image>, the image tokens, then the text after it; the EOS is dropped.
+    before, after = PROMPT.split(processor.image_token)
+    expected = ([processor.bos_id] + processor.encode(before, bos=False)
+                + [processor.image_token_id] * num_tokens + processor.encode(after, bos=False))
+    assert input_ids.tolist() == [expected]
+    assert images_seq_mask.tolist() == [token == processor.image_token_id for token in expected]
@@ -0,0 +1,68 @@
+import io
+import sys
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+from PIL import Image  # noqa: E402
+
+from ldf.deepseek import raster  # noqa: E402
+
+DPI = 50
+
+
+def _pdf(path, pages):
+    with fitz.open() as doc:
+        for idx in range(pages):
+            page = doc.new_page(width=200 + 10 * idx, height=280)
+            page.insert_text((20, 40), f"Gazette page {idx + 1}", fontsize=14)
+            page.draw_rect(fitz.Rect(20, 60, 120, 120), color=(0.8, 0.1, 0.1), fill=(0.1, 0.4, 0.9 - idx / 20))
+        doc.save(path)
+    return str(path)
+
+
+def _png_round_trip(pdf_path, dpi):
+    """The conversion the rasterizer replaced: render, encode to PNG and decode again."""
+    matrix = fitz.Matrix(dpi / 72.0, dpi / 72.0)
+    with fitz.open(pdf_path) as doc:
+        return [Image.open(io.BytesIO(page.get_pixmap(matrix=matrix, alpha=False).tobytes("png"))).convert("RGB")
+                for page in doc]
+
+
+def _assert_same_pixels(pages, expected):
+    assert [idx for idx, _ in pages] == list(range(len(expected)))
+    for (_, image), old in zip(pages, expected):
+        assert (image.mode, image.size) == (old.mode, old.size)
+        assert image.tobytes() == old.tobytes()
+
+
+@pytest.mark.parametrize("workers", [1, 2], ids=["serial", "pooled"])
+def test_pages_match_the_png_round_trip(tmp_path, workers):
+    # Enough pages for the pooled run to go through the process pool in several chunks.
+    pdf_path = _pdf(tmp_path / "gazette.pdf", raster.PARALLEL_MIN_PAGES + 1)
+
+    pages = list(raster.iter_pdf_pages(pdf_path, dpi=DPI, workers=workers))
+
+    _assert_same_pixels(pages, _png_round_trip(pdf_path, DPI))
+
+
+def test_a_page_subset_comes_back_in_the_requested_order(tmp_path):
+    pdf_path = _pdf(tmp_path / "gazette.pdf", 3)
+    expected = _png_round_trip(pdf_path, DPI)
+
+    pages = list(raster.iter_pdf_pages(pdf_path, pages=[2, 0], dpi=DPI, workers=1))
+
+    assert [idx for idx, _ in pages] == [2, 0]
+    assert [image.tobytes() for _, image in pages] == [expected[2].tobytes(), expected[0].tobytes()]
+
+
+def _loaded_packages():
+    return sorted(name for name in sys.modules if name.startswith(("ldf", "vllm", "torch")))
+
+
+def test_pool_workers_only_load_the_rasterizer(tmp_path):
+    list(raster.iter_pdf_pages(_pdf(tmp_path / "gazette.pdf", raster.PARALLEL_MIN_PAGES), dpi=DPI, workers=2))
+
+    # Unpickling `_render_range` in a spawned worker must not pull in vLLM or the model via ldf.deepseek.ocr.
+    loaded = raster._get_pool(2).submit(_loaded_packages).result(timeout=60)
+    assert loaded == ["ldf", "ldf.deepseek", "ldf.deepseek.raster"]